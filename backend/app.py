@@ -1,17 +1,46 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import List, Literal, Optional
 # Reload trigger
 from fastapi.middleware.cors import CORSMiddleware
 import sys
 import os
+import json
+import threading
 
 # Add current directory to sys.path to ensure we can import src
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.main import analyze_algorithm
+from src.main import analyze_source, iter_analysis_events, preload_engine
+from src.execution.AnalysisExecutor import AnalysisExecutor, QueueFullError
+from src.execution.BatchRunner import get_batch_runner
+from src.execution.ProcessBackend import get_process_backend
+from src.execution.IncrementalSession import get_session
+from src.cache.ResultCache import get_result_cache
+from src.llm_integration.ResponseCache import get_response_cache
+from src.llm_integration.CircuitBreaker import get_circuit_breaker
+from src.llm_integration.RateLimiter import get_rate_limiter
+from src.llm_integration.StageScheduler import get_stage_scheduler
+from src.llm_integration.LLM_Client import get_llm_client
+from src.parsing.ParseDriver import warm_up, prepare_thread, parser_pool_stats
+from src.parsing.ParseCache import get_parse_cache
+from src.analysis.SymbolicBudget import watchdog_stats
 
 app = FastAPI()
 
+# "thread": /analyze corre completo en el pool de hilos. "process": la parte
+# estática (parsing + SymPy) va a un pool de procesos y usa todos los núcleos.
+ANALYSIS_BACKEND = os.getenv("ANALYSIS_BACKEND", "thread")
+
+# Límite de análisis simultáneos (parsing + SymPy + LLM corren fuera del event loop)
+# y de peticiones en espera antes de responder 429.
+analysis_executor = AnalysisExecutor(
+    max_concurrent=int(os.getenv("MAX_CONCURRENT_ANALYSES", "4")),
+    max_queued=int(os.getenv("MAX_QUEUED_ANALYSES", "16")),
+    initializer=prepare_thread,
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -19,38 +48,194 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"], # El frontend lo lee en las respuestas 429
 )
 
+@app.on_event("startup")
+def warm_parser():
+    # Pobla el caché DFA de ANTLR antes de aceptar peticiones: la primera
+    # petición real ya no paga el calentamiento del parser.
+    elapsed_ms = warm_up()
+    print(f"Parser precalentado en {elapsed_ms:.0f} ms")
+
+@app.on_event("startup")
+def start_process_backend():
+    # Los workers arrancan (y se calientan) en segundo plano
+    if ANALYSIS_BACKEND == "process":
+        get_process_backend().start()
+
+@app.on_event("startup")
+def warm_engine():
+    # SymPy y el motor de costos se importan en segundo plano: el servidor
+    # acepta peticiones sin esperar esos ~0.5 s (la primera que los necesite
+    # espera solo lo que falte del import)
+    threading.Thread(target=lambda: print(f"Motor de análisis cargado en {preload_engine():.0f} ms"),
+                     name="preload-engine", daemon=True).start()
+
+@app.on_event("startup")
+def warm_llm_client():
+    # El descubrimiento de modelos va en segundo plano: el arranque no espera a la red
+    get_llm_client().resolve_model_async()
+
 class AnalysisRequest(BaseModel):
     code: str
     translate: bool = False
+    # "static": solo ANTLR + MathEngine, sin llamadas al LLM (funciona sin conexión)
+    mode: Literal["full", "static"] = "full"
+    # Incluye "timings" (spans de cada etapa, en ms) en el resultado
+    timings: bool = False
+
+def _check_mode(request):
+    if request.mode == "static" and request.translate:
+        raise HTTPException(status_code=400, detail="El modo estático no admite traducción (requiere el LLM).")
 
 @app.post("/analyze")
 async def analyze(request: AnalysisRequest):
+    _check_mode(request)
     try:
-        # analyze_algorithm expects a filepath, but we have the code in memory.
-        # We can write to a temp file or modify analyze_algorithm to accept string.
-        # Modifying analyze_algorithm is better, but for now to minimize changes,
-        # I'll write to a temp file as the original code did.
-        
-        temp_filename = "temp_api_input.txt"
-        with open(temp_filename, "w", encoding="utf-8") as f:
-            f.write(request.code)
-            
-        # Call the analysis function
-        result = analyze_algorithm(temp_filename, translate_mode=request.translate)
+        # El análisis se hace en memoria: sin archivos temporales compartidos
+        # entre peticiones concurrentes.
+        if ANALYSIS_BACKEND == "process" and not request.translate:
+            result = await analysis_executor.submit(get_process_backend().analyze_source, request.code,
+                                                    mode=request.mode, timings=request.timings)
+        else:
+            result = await analysis_executor.submit(analyze_source, request.code,
+                                                    translate_mode=request.translate, mode=request.mode,
+                                                    timings=request.timings)
         
         print("DEBUG RESPONSE:", result) # Add this line
         
-        # Clean up temp file (optional, maybe keep for debugging)
-        # os.remove(temp_filename)
-        
         return result
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados análisis en curso. Intenta de nuevo más tarde.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analyze/stream")
+async def analyze_stream(request: AnalysisRequest):
+    """
+    Igual que /analyze, pero responde en NDJSON: una línea
+    {"event": ..., "data": {...}} por etapa, en cuanto termina (parse,
+    line_by_line, complexity, stages, etapas LLM y finalmente done).
+    """
+    _check_mode(request)
+    try:
+        events = analysis_executor.stream(iter_analysis_events, request.code,
+                                          translate_mode=request.translate, mode=request.mode,
+                                          timings=request.timings)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados análisis en curso. Intenta de nuevo más tarde.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    async def ndjson():
+        try:
+            async for event, data in events:
+                yield json.dumps({"event": event, "data": data}, ensure_ascii=False, default=str) + "\n"
+        finally:
+            await events.aclose() # Libera el cupo aunque el cliente corte la conexión
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+class LiveRequest(BaseModel):
+    code: str
+    session_id: Optional[str] = None
+
+def _live_update(session_id, code):
+    session_id, session = get_session(session_id)
+    summary = session.update(code)
+    summary["session_id"] = session_id
+    return summary
+
+@app.post("/analyze/live")
+async def analyze_live(request: LiveRequest):
+    """
+    Análisis estático incremental para retroalimentación mientras se escribe.
+    El cliente reenvía el código completo con el `session_id` de la respuesta
+    anterior; el servidor re-parsea solo la sentencia editada y recalcula solo
+    sus ancestros. Sin `session_id` (o si venció) se abre una sesión nueva.
+    """
+    try:
+        return await analysis_executor.submit(_live_update, request.session_id, request.code)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados análisis en curso. Intenta de nuevo más tarde.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+class BatchItem(BaseModel):
+    id: str
+    code: str
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    llm: bool = True
+
+# Tamaño máximo de un lote por petición
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "5000"))
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchRequest):
+    """
+    Analiza un lote de fuentes (duplicados una sola vez, estático en un pool
+    de procesos, LLM con límite de llamadas). Responde en NDJSON, una línea
+    {"id", "key", "cached", "result"} por elemento en cuanto termina.
+    """
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"El lote supera el máximo de {BATCH_MAX_ITEMS} elementos.")
+
+    items = [(item.id, item.code) for item in request.items]
+    try:
+        records = analysis_executor.stream(get_batch_runner().run, items, use_llm=request.llm)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados análisis en curso. Intenta de nuevo más tarde.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    async def ndjson():
+        try:
+            async for record in records:
+                yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        finally:
+            await records.aclose()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+def _recurrence_cache_stats():
+    # Sin importar SymPy si el motor todavía no se cargó
+    if "src.analysis.RecurrenceSolver" not in sys.modules:
+        return None
+    from src.analysis.RecurrenceSolver import get_recurrence_solver
+    return get_recurrence_solver().stats()
+
+@app.get("/metrics")
+def metrics():
+    parse_cache = get_parse_cache()
+    return {
+        "executor": analysis_executor.stats(),
+        "result_cache": get_result_cache().stats(),
+        "llm_cache": get_response_cache().stats(),
+        "llm_breaker": get_circuit_breaker().stats(),
+        "llm_rate_limit": get_rate_limiter().stats(),
+        "llm_stages": get_stage_scheduler().stats(),
+        "parser": parser_pool_stats(),
+        "parse_cache": parse_cache.stats() if parse_cache is not None else None,
+        "recurrence_cache": _recurrence_cache_stats(),
+        "symbolic_budget": watchdog_stats(),
+        "process_backend": get_process_backend().stats() if ANALYSIS_BACKEND == "process" else None,
+    }
+
 @app.get("/")
 def read_root():
     return {"message": "Algorithm Complexity Analyzer API is running"}
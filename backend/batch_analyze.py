@@ -0,0 +1,64 @@
+"""
+Análisis por lotes: califica una carpeta completa de entregas en un solo proceso.
+
+Uso:
+    python batch_analyze.py entregas/ --output resultados.jsonl
+    python batch_analyze.py "entregas/**/*.txt" --workers 8 --rate-limit 60
+    python batch_analyze.py fuentes.jsonl --no-llm
+"""
+import sys
+import os
+import json
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.execution.BatchRunner import BatchRunner, load_sources
+from src.llm_integration.LLM_Client import LLMClient
+from src.llm_integration.RateLimiter import RateLimiter
+
+def main():
+    parser = argparse.ArgumentParser(description="Analiza en lote un directorio, glob o JSONL de pseudocódigos.")
+    parser.add_argument("target", help="Directorio, patrón glob o archivo .jsonl ({\"id\", \"code\"} por línea)")
+    parser.add_argument("--output", "-o", default="batch_results.jsonl", help="Archivo JSONL de salida (un resultado por línea)")
+    parser.add_argument("--pattern", default="*.txt", help="Patrón de archivos al recorrer un directorio")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para el análisis estático (default: núcleos)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Análisis con etapas LLM en paralelo")
+    parser.add_argument("--rate-limit", type=float, default=float(os.getenv("LLM_RATE_LIMIT", "0")),
+                        help="Máximo de llamadas al LLM por minuto (0 = sin límite)")
+    parser.add_argument("--no-llm", "--static", dest="no_llm", action="store_true",
+                        help="Solo análisis estático (sin validación, pasos, árbol ni traza)")
+    args = parser.parse_args()
+
+    items = load_sources(args.target, pattern=args.pattern)
+    if not items:
+        print(f"No se encontraron fuentes en {args.target}", file=sys.stderr)
+        sys.exit(1)
+
+    llm_client = None
+    if not args.no_llm:
+        llm_client = LLMClient(rate_limiter=RateLimiter(rate_per_minute=args.rate_limit))
+
+    runner = BatchRunner(workers=args.workers, llm_concurrency=args.llm_concurrency,
+                         use_llm=not args.no_llm, llm_client=llm_client)
+    start = time.monotonic()
+    unique = len({code for _, code in items})
+    print(f"Analizando {len(items)} fuentes ({unique} distintas)...", file=sys.stderr)
+
+    done = 0
+    try:
+        with open(args.output, "w", encoding="utf-8") as out:
+            for record in runner.run(items):
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                done += 1
+                if done % 50 == 0 or done == len(items):
+                    print(f" > {done}/{len(items)} ({time.monotonic() - start:.1f}s)", file=sys.stderr)
+    finally:
+        runner.close()
+
+    print(f"Listo: {done} resultados en {args.output} ({time.monotonic() - start:.1f}s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark del parsing: LL completo (como se hacía antes) contra el
+ParseDriver de dos etapas (SLL + BailErrorStrategy, respaldo a LL).
+
+Uso:
+    python benchmarks/bench_parse.py [--repeat 20]
+
+Se parsean los programas de ejemplo de tests/ y un programa sintético con
+muchas expresiones largas; se informa el mejor tiempo de cada modo.
+"""
+import sys
+import os
+import glob
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from antlr4 import CommonTokenStream, InputStream
+from src.parsing.PseudoCodeAnalyzerLexer import PseudoCodeAnalyzerLexer
+from src.parsing.PseudoCodeAnalyzerParser import PseudoCodeAnalyzerParser
+from src.parsing.ParseDriver import parse_program
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests'))
+
+def parse_ll(source):
+    """Parsing tal como lo hacía main.py: predicción LL por defecto."""
+    parser = PseudoCodeAnalyzerParser(CommonTokenStream(PseudoCodeAnalyzerLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    parser.program()
+    return parser.getNumberOfSyntaxErrors()
+
+def parse_driver(source):
+    """ParseDriver sin ParseCache: con caché las repeticiones no parsearían."""
+    return parse_program(source, use_cache=False)
+
+def synthetic_program(statements=200):
+    """Programa con muchas expresiones anidadas (el caso caro de la regla `expression`)."""
+    body = "\n".join(
+        f"        x <- ((a + {i}) * (b - c) / (d + e * (f - {i}))) + floor(n / 2) - (g * h + i * j);"
+        for i in range(statements)
+    )
+    return f"SINTETICO(n)\nbegin\n    for i <- 1 to n do\n    begin\n{body}\n    end;\nend"
+
+def load_corpus():
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(TESTS_DIR, "*.txt")) + glob.glob(os.path.join(TESTS_DIR, "*.TXT"))):
+        if os.path.basename(path).startswith("test_"):
+            continue
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            corpus.append((os.path.basename(path), f.read()))
+    corpus.append(("SINTETICO (200 expresiones)", synthetic_program()))
+    return corpus
+
+def best_of(fn, source, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(source)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus()
+    # Calentamiento: el caché DFA de ANTLR es compartido por clase
+    for _, source in corpus:
+        parse_ll(source)
+        parse_driver(source)
+
+    print(f"{'Programa':<30} | {'LL (ms)':>9} | {'SLL->LL (ms)':>12} | {'Modo':>4} | {'Speedup':>7}")
+    print("-" * 75)
+    total_ll = total_driver = 0.0
+    for name, source in corpus:
+        ll = best_of(parse_ll, source, args.repeat)
+        driver = best_of(parse_driver, source, args.repeat)
+        mode = parse_driver(source).mode
+        total_ll += ll
+        total_driver += driver
+        print(f"{name:<30} | {ll * 1000:>9.2f} | {driver * 1000:>12.2f} | {mode:>4} | {ll / driver:>6.2f}x")
+    print("-" * 75)
+    print(f"{'TOTAL':<30} | {total_ll * 1000:>9.2f} | {total_driver * 1000:>12.2f} | {'':>4} | {total_ll / total_driver:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
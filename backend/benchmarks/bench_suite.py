@@ -0,0 +1,265 @@
+"""
+Suite de benchmarks del pipeline: lexing, parsing, CostCalculator.visit,
+MathEngine.solve_recurrence y el análisis completo (analyze_source en modo
+"full" con un cliente LLM falso, sin red), sobre un corpus de programas de
+tamaño y anidamiento crecientes.
+
+Uso:
+    python benchmarks/bench_suite.py                 # compara con baselines.json
+    python benchmarks/bench_suite.py --update        # regraba la línea base
+    python benchmarks/bench_suite.py --stages parse,cost --repeat 10
+
+Cada medición es el mejor tiempo de `--repeat` ejecuciones. Para comparar
+entre máquinas, los tiempos se escalan por una carga de calibración (Python
+puro) medida junto con la línea base. Sale con código 1 si alguna medición
+supera la línea base en más de `--tolerance` (más un margen absoluto para
+las mediciones muy cortas). Las etapas ruidosas tienen una tolerancia mínima
+propia (MIN_TOLERANCE).
+"""
+import sys
+import os
+import io
+import json
+import time
+import argparse
+import platform
+import contextlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from antlr4 import CommonTokenStream, InputStream
+from src import main
+from src.parsing.PseudoCodeAnalyzerLexer import PseudoCodeAnalyzerLexer
+from src.parsing.ParseDriver import parse_program
+from src.analysis.CostCalculator import CostCalculator
+from src.analysis.MathEngine import MathEngine
+from src.analysis.RecurrenceSolver import RecurrenceSolver
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests'))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+STAGES = ("lex", "parse", "cost", "solve", "e2e")
+
+# Programas de ejemplo de tests/ incluidos en el corpus
+CORPUS_FILES = ("FIBONACCI_TEST.txt", "HANOI.txt", "MATRIZ_TEST.txt", "MERGE_SORT.txt")
+
+# Margen absoluto (ms): por debajo de esto la variación es ruido del sistema
+MIN_SLACK_MS = 0.5
+
+# Tolerancia relativa mínima por etapa. e2e pasa por el pool de etapas LLM, las
+# cachés y el GC: entre corridas (y al escalar por la calibración de Python
+# puro) varía hasta ~2x incluso en programas de ~20 ms, donde MIN_SLACK_MS no alcanza.
+MIN_TOLERANCE = {"e2e": 2.0}
+
+class FakeLLMClient:
+    """Cliente LLM sin red: respuestas fijas e inmediatas."""
+    def validate_complexity(self, code):
+        return '{"complexity": "O(n)", "method": "Benchmark", "reasoning": ["Respuesta fija"]}'
+
+    def solve_recurrence_steps(self, eq):
+        return "T(n) = ..."
+
+    def generate_recursion_tree(self, code):
+        return '{"root": {"label": "f(n)", "children": []}}'
+
+    def generate_trace_table(self, code):
+        return "| Paso | Nivel_Pila | Función | Variables |"
+
+    def translate_to_pseudocode(self, code):
+        return code
+
+def deep_loops(depth, statements=4):
+    """Ciclos for anidados `depth` niveles; cada cota depende de la variable externa."""
+    names = [f"i{level}" for level in range(1, depth + 1)]
+    lines = [f"PROFUNDO{depth}(A, n)", "begin"]
+    indent = "    "
+    for level, name in enumerate(names):
+        start = "1" if level == 0 else names[level - 1]
+        lines += [f"{indent}for {name} <- {start} to n do", f"{indent}begin"]
+        indent += "    "
+    for k in range(statements):
+        lines.append(f"{indent}x <- x + A[{names[-1]}] * {k + 1};")
+    for _ in names:
+        indent = indent[:-4]
+        lines.append(f"{indent}end;")
+    lines.append("end")
+    return "\n".join(lines)
+
+def long_body(statements):
+    """Un ciclo con muchas sentencias de expresiones largas (tamaño, no anidamiento)."""
+    body = "\n".join(
+        f"        x <- ((a + {i}) * (b - c) / (d + e * (f - {i}))) + floor(n / 2) - (g * h + i * j);"
+        for i in range(statements)
+    )
+    return f"LARGO{statements}(n)\nbegin\n    for i <- 1 to n do\n    begin\n{body}\n    end;\nend"
+
+def load_corpus():
+    """Lista de (nombre, código) ordenada de menor a mayor tamaño/anidamiento."""
+    corpus = []
+    for name in CORPUS_FILES:
+        with open(os.path.join(TESTS_DIR, name), "r", encoding="utf-8") as f:
+            corpus.append((os.path.splitext(name)[0], f.read()))
+    corpus += [(f"PROFUNDO_{depth}", deep_loops(depth)) for depth in (2, 4, 6)]
+    corpus += [(f"LARGO_{size}", long_body(size)) for size in (50, 200)]
+    return corpus
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def calibrate(repeat=5):
+    """ms de una carga fija de Python puro: referencia de la velocidad de la máquina."""
+    def workload():
+        total = 0
+        for i in range(200000):
+            total += i * i % 7
+        return total
+    return best_of(workload, repeat)
+
+def _lex(source):
+    stream = CommonTokenStream(PseudoCodeAnalyzerLexer(InputStream(source)))
+    stream.fill()
+
+def _cost(parsed):
+    CostCalculator(lines=parsed.lines).visit(parsed.ast)
+
+def _recurrence(parsed):
+    """Costo total del cuerpo (con términos T(...)) o None si el programa no es recursivo."""
+    calculator = CostCalculator(lines=parsed.lines)
+    calculator.current_algorithm_name = parsed.ast.algorithm.name
+    total = calculator.visit(parsed.ast.algorithm.body)
+    return total if calculator.is_recursive else None
+
+def _solve(expr):
+    engine = MathEngine()
+    engine.recurrences = RecurrenceSolver() # Sin la caché compartida: se mide la resolución
+    engine.solve_recurrence(expr)
+
+def _e2e(source):
+    main.analyze_source(source, mode="full", use_cache=False)
+
+def run_suite(corpus, repeat=5, stages=STAGES):
+    """{etapa: {programa: ms}} para las etapas pedidas."""
+    results = {stage: {} for stage in stages}
+    fake_client = FakeLLMClient()
+    real_get_llm_client = main.get_llm_client
+    main.get_llm_client = lambda: fake_client
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, source in corpus:
+                parsed = parse_program(source, use_cache=False)
+                _cost(parsed) # Calentamiento (caché DFA de ANTLR, cachés de SymPy)
+                if "lex" in results:
+                    results["lex"][name] = best_of(lambda: _lex(source), repeat)
+                if "parse" in results:
+                    results["parse"][name] = best_of(lambda: parse_program(source, use_cache=False), repeat)
+                if "cost" in results:
+                    results["cost"][name] = best_of(lambda: _cost(parsed), repeat)
+                if "solve" in results:
+                    expr = _recurrence(parsed)
+                    if expr is not None:
+                        results["solve"][name] = best_of(lambda: _solve(expr), repeat)
+                if "e2e" in results:
+                    results["e2e"][name] = best_of(lambda: _e2e(source), repeat)
+    finally:
+        main.get_llm_client = real_get_llm_client
+    return results
+
+def compare(results, baseline, calibration_ms, tolerance=1.0):
+    """
+    Lista de regresiones (etapa, programa, ms, límite). La línea base se
+    escala por la calibración de esta máquina respecto a la de la línea base;
+    cada etapa usa al menos su MIN_TOLERANCE.
+    """
+    scale = calibration_ms / baseline["calibration_ms"] if baseline.get("calibration_ms") else 1.0
+    regressions = []
+    for stage, timings in results.items():
+        stage_tolerance = max(tolerance, MIN_TOLERANCE.get(stage, 0.0))
+        for name, elapsed in timings.items():
+            base = baseline.get("results", {}).get(stage, {}).get(name)
+            if base is None:
+                continue
+            limit = base * scale * (1 + stage_tolerance) + MIN_SLACK_MS
+            if elapsed > limit:
+                regressions.append((stage, name, elapsed, limit))
+    return regressions
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_baseline(results, calibration_ms, path=BASELINE_PATH):
+    data = {
+        "calibration_ms": round(calibration_ms, 3),
+        "python": platform.python_version(),
+        "results": {stage: {name: round(ms, 3) for name, ms in timings.items()} for stage, timings in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+def print_table(results, baseline=None, scale=1.0):
+    names = list(dict.fromkeys(name for timings in results.values() for name in timings))
+    stages = list(results)
+    print(f"{'Programa':<16} | " + " | ".join(f"{stage + ' (ms)':>12}" for stage in stages))
+    print("-" * (19 + 15 * len(stages)))
+    for name in names:
+        cells = []
+        for stage in stages:
+            elapsed = results[stage].get(name)
+            base = (baseline or {}).get("results", {}).get(stage, {}).get(name)
+            if elapsed is None:
+                cells.append(f"{'-':>12}")
+            elif base:
+                cells.append(f"{elapsed:>7.2f} {elapsed / (base * scale):>3.1f}x")
+            else:
+                cells.append(f"{elapsed:>12.2f}")
+        print(f"{name:<16} | " + " | ".join(cells))
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--stages", default=",".join(STAGES), help=f"Etapas separadas por coma ({', '.join(STAGES)})")
+    arg_parser.add_argument("--tolerance", type=float, default=1.0, help="Aumento relativo permitido (1.0 = el doble)")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH)
+    arg_parser.add_argument("--update", action="store_true", help="Guarda los resultados como nueva línea base")
+    args = arg_parser.parse_args()
+
+    stages = tuple(stage.strip() for stage in args.stages.split(",") if stage.strip())
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        arg_parser.error(f"Etapas desconocidas: {', '.join(sorted(unknown))}")
+
+    calibration_ms = calibrate()
+    results = run_suite(load_corpus(), repeat=args.repeat, stages=stages)
+
+    baseline = None if args.update else load_baseline(args.baseline)
+    scale = calibration_ms / baseline["calibration_ms"] if baseline else 1.0
+    print(f"Calibración: {calibration_ms:.2f} ms" + (f" (x{scale:.2f} respecto a la línea base)" if baseline else ""))
+    print_table(results, baseline, scale)
+
+    if args.update:
+        save_baseline(results, calibration_ms, args.baseline)
+        print(f"\nLínea base guardada en {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\nSin línea base en {args.baseline}: ejecutar con --update para crearla.")
+        return 0
+
+    regressions = compare(results, baseline, calibration_ms, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regresiones (tolerancia {args.tolerance:.0%}):")
+        for stage, name, elapsed, limit in regressions:
+            print(f" - {stage} / {name}: {elapsed:.2f} ms (límite {limit:.2f} ms)")
+        return 1
+    print("\nSin regresiones.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
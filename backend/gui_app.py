@@ -4,10 +4,9 @@ import threading
 import sys
 import os
 from io import StringIO
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
 import re
+# matplotlib y numpy se importan al dibujar la primera gráfica (plot_complexity,
+# TreeVisualizerWindow): abrir la ventana no paga su importación.
 
 # --- IMPORTACIÓN ROBUSTA ---
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -16,7 +15,11 @@ if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 # ¡¡ IMPORTANTE: DEJA SOLO ESTA LÍNEA SIN TRY/EXCEPT !!
-from src.main import analyze_algorithm
+from src.main import analyze_source
+
+# Igual que en app.py: "process" lleva la parte estática a un pool de procesos
+# (fuera del GIL de la interfaz). La traducción sigue en el hilo de análisis.
+ANALYSIS_BACKEND = os.getenv("ANALYSIS_BACKEND", "thread")
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
@@ -44,6 +47,14 @@ class AlgorithmAnalyzerApp(ctk.CTk):
         self.grid_rowconfigure(0, weight=1)
         self.current_file_path = None
         self._init_ui()
+        if ANALYSIS_BACKEND == "process":
+            # Los workers (spawn + calentamiento) arrancan sin bloquear la ventana
+            threading.Thread(target=lambda: self._process_backend().start(), daemon=True).start()
+
+    @staticmethod
+    def _process_backend():
+        from src.execution.ProcessBackend import get_process_backend
+        return get_process_backend()
 
     def _init_ui(self):
         # --- PANEL IZQUIERDO ---
@@ -72,13 +83,17 @@ end"""
         self.code_input.insert("0.0", default_code)
 
         self.translate_switch = ctk.CTkSwitch(self.sidebar, text="Traducir Lenguaje Natural")
-        self.translate_switch.grid(row=4, padx=20, pady=10)
+        self.translate_switch.grid(row=4, padx=20, pady=(10, 0))
+
+        # Solo ANTLR + MathEngine: sin IA, funciona sin conexión
+        self.static_switch = ctk.CTkSwitch(self.sidebar, text="Solo Análisis Estático")
+        self.static_switch.grid(row=5, padx=20, pady=10)
 
         self.analyze_btn = ctk.CTkButton(self.sidebar, text="EJECUTAR ANÁLISIS", fg_color="green", hover_color="darkgreen", command=self.start_analysis)
-        self.analyze_btn.grid(row=5, padx=20, pady=20)
+        self.analyze_btn.grid(row=6, padx=20, pady=20)
         
-        ctk.CTkButton(self.sidebar, text="Ver Pila Recursión", fg_color="#E04F5F", hover_color="#C03545", command=self.open_visualizer).grid(row=6, padx=20, pady=10)
-        ctk.CTkButton(self.sidebar, text="Visualizar Árbol", fg_color="#2CC985", hover_color="#24A46D", command=self.open_tree_visualizer).grid(row=7, padx=20, pady=10)
+        ctk.CTkButton(self.sidebar, text="Ver Pila Recursión", fg_color="#E04F5F", hover_color="#C03545", command=self.open_visualizer).grid(row=7, padx=20, pady=10)
+        ctk.CTkButton(self.sidebar, text="Visualizar Árbol", fg_color="#2CC985", hover_color="#24A46D", command=self.open_tree_visualizer).grid(row=8, padx=20, pady=10)
 
         # --- PANEL DERECHO ---
         self.right_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
@@ -134,17 +149,19 @@ end"""
             self.after(0, lambda: self.analyze_btn.configure(state="normal", text="EJECUTAR ANÁLISIS"))
             return
 
-        try:
-            with open("temp_input.txt", "w", encoding="utf-8") as f: f.write(code)
-        except: pass
-
         # Captura de stdout
         old_stdout = sys.stdout
         sys.stdout = OutputRedirector(self.txt_logs)
 
         try:
-            translate = bool(self.translate_switch.get())
-            data = analyze_algorithm("temp_input.txt", translate_mode=translate)
+            static = bool(self.static_switch.get())
+            translate = bool(self.translate_switch.get()) and not static
+            mode = "static" if static else "full"
+            if ANALYSIS_BACKEND == "process" and not translate:
+                print(" > Parte estática en el pool de procesos (su log no se muestra aquí).")
+                data = self._process_backend().analyze_source(code, mode=mode)
+            else:
+                data = analyze_source(code, translate_mode=translate, mode=mode)
             
             # Actualización segura en el hilo principal
             self.after(0, lambda: self.update_results(data))
@@ -201,6 +218,10 @@ end"""
 
 
     def plot_complexity(self, complexity):
+        import numpy as np
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         for w in self.plot_frame.winfo_children(): w.destroy()
         
         fig, ax = plt.subplots(figsize=(5, 2.5), dpi=100)
@@ -351,6 +372,9 @@ class TreeVisualizerWindow(ctk.CTkToplevel):
         self.draw_tree()
 
     def draw_tree(self):
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         try:
             mt_data = self.analysis_data.get("master_theorem_data", {})
             if not mt_data: mt_data = {}
@@ -406,6 +430,7 @@ class TreeVisualizerWindow(ctk.CTkToplevel):
             self.destroy()
 
     def _plot_recursive(self, ax, x, y, level, max_depth, branching_factor, label, cost_label, mode="div", param=1):
+        import matplotlib.pyplot as plt # Ya cargado por draw_tree
         # --- COSTOS LATERALES ---
         # Inicializar level_costs en el root
         if not hasattr(self, 'level_costs'): self.level_costs = {}
@@ -497,6 +522,7 @@ class TreeVisualizerWindow(ctk.CTkToplevel):
                 self._plot_recursive(ax, child_x, child_y, level + 1, max_depth, branching_factor, "", cost_label, mode, param)
 
     def _plot_characteristic(self, ax, x, y, level, max_depth, lags, label):
+        import matplotlib.pyplot as plt # Ya cargado por draw_tree
         # --- COSTOS LATERALES ---
         if not hasattr(self, 'level_costs'): self.level_costs = {}
         if x == 0 and y == 0: self.level_costs = {}
@@ -7,7 +7,7 @@ from io import StringIO
 
 # Importamos la lógica de tu main.py
 # Asegúrate de que estás ejecutando esto desde la raíz del proyecto
-from .main import analyze_algorithm
+from .main import analyze_source
 
 class AlgorithmAnalyzerApp(ctk.CTk):
     def __init__(self):
@@ -47,11 +47,16 @@ class AlgorithmAnalyzerApp(ctk.CTk):
         # Opciones
         self.switch_translate_var = ctk.StringVar(value="off")
         self.switch_translate = ctk.CTkSwitch(self.left_frame, text="Traducir Lenguaje Natural", variable=self.switch_translate_var, onvalue="on", offvalue="off")
-        self.switch_translate.grid(row=4, column=0, padx=20, pady=10)
+        self.switch_translate.grid(row=4, column=0, padx=20, pady=(10, 0))
+
+        # Solo ANTLR + MathEngine: sin IA, funciona sin conexión
+        self.switch_static_var = ctk.StringVar(value="off")
+        self.switch_static = ctk.CTkSwitch(self.left_frame, text="Solo Análisis Estático", variable=self.switch_static_var, onvalue="on", offvalue="off")
+        self.switch_static.grid(row=5, column=0, padx=20, pady=10)
 
         # Botón de Acción Principal
         self.btn_analyze = ctk.CTkButton(self.left_frame, text="EJECUTAR ANÁLISIS", fg_color="green", hover_color="darkgreen", command=self.start_analysis_thread)
-        self.btn_analyze.grid(row=5, column=0, padx=20, pady=20)
+        self.btn_analyze.grid(row=6, column=0, padx=20, pady=20)
 
         # --- Panel Derecho (Resultados) ---
         self.right_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
@@ -98,12 +103,8 @@ class AlgorithmAnalyzerApp(ctk.CTk):
             messagebox.showwarning("Advertencia", "Por favor carga un archivo o escribe código.")
             return
         
-        # Guardar temporalmente lo que hay en el editor por si el usuario lo editó
-        temp_path = "temp_gui_input.txt"
-        with open(temp_path, "w", encoding="utf-8") as f:
-            f.write(self.code_editor.get("0.0", "end"))
-        
-        self.current_file_path = temp_path
+        # Capturamos el código en el hilo de la GUI; el análisis se hace en memoria
+        self.pending_code = self.code_editor.get("0.0", "end")
         
         self.btn_analyze.configure(state="disabled", text="Analizando...")
         threading.Thread(target=self.run_analysis).start()
@@ -114,10 +115,11 @@ class AlgorithmAnalyzerApp(ctk.CTk):
         sys.stdout = mystdout = StringIO()
 
         try:
-            translate_mode = self.switch_translate_var.get() == "on"
+            static = self.switch_static_var.get() == "on"
+            translate_mode = self.switch_translate_var.get() == "on" and not static
             
             # Llamamos a la función de tu main.py
-            analyze_algorithm(self.current_file_path, translate_mode=translate_mode)
+            analyze_source(self.pending_code, translate_mode=translate_mode, mode="static" if static else "full")
             
             # Obtenemos el texto capturado
             output_text = mystdout.getvalue()
@@ -0,0 +1,179 @@
+# src/analysis/AsymptoticCost.py
+
+from fractions import Fraction
+
+from sympy import (Add, Mul, Pow, Integer, Symbol, Max, Min, exp, log, floor, ceiling, harmonic,
+                   symbols, sympify)
+
+# Misma variable de tamaño que MathEngine
+N = symbols('n', integer=True, positive=True)
+
+class AsymptoticCost:
+    """
+    Costo reducido a su término dominante c * n^a * log(n)^b * k^n.
+
+    Se guarda como la tupla normalizada (c, a, b, k): suma, producto, máximo y
+    multiplicación por un número de iteraciones son O(1) y nunca crean árboles
+    de SymPy. Entre dos términos domina el de mayor (k, a, b); con la misma
+    clase se suman (o se toma el mayor) los coeficientes. El costo 0 tiene c = 0.
+
+    `from_expr` convierte una expresión exacta de SymPy al mismo dominio: es lo
+    que se usa para validar contra el motor exacto y para convertir cotas de
+    ciclos. Lanza ValueError ante lo que no se puede representar (T(...), Sum,
+    variables distintas de n).
+    """
+    __slots__ = ("c", "a", "b", "k", "_key")
+
+    def __init__(self, c, a=0, b=0, k=1):
+        c = sympify(c)
+        if c == 0:
+            a, b, k = 0, 0, Integer(1)
+        self.c = c # Coeficiente (número de SymPy: puede llevar log(2), sqrt(5)...)
+        self.a = Fraction(a) # Exponente de n
+        self.b = Fraction(b) # Exponente de log(n)
+        self.k = sympify(k) # Base del término exponencial k^n
+        self._key = (float(self.k), self.a, self.b) if c != 0 else None
+
+    def is_zero(self):
+        return self._key is None
+
+    def same_class(self, other):
+        """Mismo orden de crecimiento (Θ), sin mirar el coeficiente."""
+        return self._key == other._key
+
+    def __bool__(self):
+        return not self.is_zero()
+
+    def __eq__(self, other):
+        if not isinstance(other, AsymptoticCost):
+            return NotImplemented
+        return self.same_class(other) and self.c == other.c
+
+    def __hash__(self):
+        return hash((self._key, self.c))
+
+    def __add__(self, other):
+        other = _coerce(other)
+        if self.is_zero(): return other
+        if other.is_zero(): return self
+        if self._key == other._key:
+            return AsymptoticCost(self.c + other.c, self.a, self.b, self.k)
+        return self if self._key > other._key else other
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        other = _coerce(other)
+        if self.is_zero() or other.is_zero():
+            return ZERO
+        return AsymptoticCost(self.c * other.c, self.a + other.a, self.b + other.b, self.k * other.k)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, e):
+        e = Fraction(e)
+        if self.is_zero():
+            return ZERO
+        return AsymptoticCost(self.c ** sympify(e), self.a * e, self.b * e, self.k ** sympify(e))
+
+    def max(self, other):
+        """Máximo de dos costos (ramas de un if)."""
+        other = _coerce(other)
+        if self.is_zero(): return other
+        if other.is_zero(): return self
+        if self._key == other._key:
+            return self if float(self.c) >= float(other.c) else other
+        return self if self._key > other._key else other
+
+    def min(self, other):
+        other = _coerce(other)
+        if self._key == other._key:
+            return self if float(self.c) <= float(other.c) else other
+        return other if self.max(other) is self else self
+
+    def is_positive(self):
+        return not self.is_zero() and float(self.c) > 0
+
+    def as_expr(self, n=N):
+        """Término dominante como expresión de SymPy."""
+        expr = self.c * n ** _number(self.a) * log(n) ** _number(self.b)
+        if self.k != 1:
+            expr *= self.k ** n
+        return expr
+
+    def __str__(self):
+        return str(self.as_expr())
+
+    def __repr__(self):
+        return f"AsymptoticCost({self.c}, a={self.a}, b={self.b}, k={self.k})"
+
+    @classmethod
+    def from_expr(cls, expr, n=N):
+        """Término dominante de una expresión exacta de SymPy."""
+        expr = sympify(expr)
+        if expr.is_number:
+            return cls(expr)
+        if expr == n:
+            return cls(1, a=1)
+        if isinstance(expr, Symbol):
+            raise ValueError(f"Variable sin cota respecto a n: {expr}")
+        if isinstance(expr, Add):
+            total = ZERO
+            for arg in expr.args:
+                total += cls.from_expr(arg, n)
+            return total
+        if isinstance(expr, Mul):
+            total = ONE
+            for arg in expr.args:
+                total *= cls.from_expr(arg, n)
+            return total
+        if isinstance(expr, (Pow, exp)):
+            base, e = expr.as_base_exp()
+            if not base.has(n) and e.has(n):
+                # base^(s*n + d) = base^d * (base^s)^n
+                d, sn = e.as_independent(n, as_Add=True)
+                slope = sn / n
+                if slope.has(n):
+                    raise ValueError(f"Exponente no lineal en n: {expr}")
+                return cls(base ** d, k=base ** slope)
+            if e.is_Rational:
+                return cls.from_expr(base, n) ** Fraction(int(e.p), int(e.q))
+            raise ValueError(f"Potencia no soportada: {expr}")
+        if isinstance(expr, log):
+            # log(x, 2) ya llega como log(x)/log(2)
+            inner = cls.from_expr(expr.args[0], n)
+            if inner.k != 1 and float(inner.k) > 1:
+                return cls(log(inner.k), a=1)
+            if inner.a > 0:
+                return cls(_number(inner.a), b=1)
+            if inner.a == 0 and inner.b == 0 and inner.k == 1:
+                return cls(log(inner.c))
+            raise ValueError(f"Logaritmo no soportado: {expr}")
+        if isinstance(expr, (floor, ceiling)):
+            return cls.from_expr(expr.args[0], n)
+        if isinstance(expr, Max):
+            total = cls.from_expr(expr.args[0], n)
+            for arg in expr.args[1:]:
+                total = total.max(cls.from_expr(arg, n))
+            return total
+        if isinstance(expr, Min):
+            total = cls.from_expr(expr.args[0], n)
+            for arg in expr.args[1:]:
+                total = total.min(cls.from_expr(arg, n))
+            return total
+        if isinstance(expr, harmonic) and len(expr.args) == 1:
+            inner = cls.from_expr(expr.args[0], n)
+            if inner.a > 0 and inner.k == 1:
+                return cls(_number(inner.a), b=1)
+        raise ValueError(f"Expresión no soportada: {expr}")
+
+def _number(fraction):
+    return Integer(fraction.numerator) if fraction.denominator == 1 else sympify(fraction)
+
+def _coerce(value):
+    if isinstance(value, AsymptoticCost):
+        return value
+    return AsymptoticCost.from_expr(value)
+
+ZERO = AsymptoticCost(0)
+ONE = AsymptoticCost(1)
@@ -0,0 +1,161 @@
+# src/analysis/AsymptoticCostCalculator.py
+
+from sympy import Symbol, log
+
+from ..parsing import AstNodes as ast
+from .CostCalculator import CostCalculator
+from .AsymptoticCost import AsymptoticCost, ZERO
+
+class _ExactRequired(Exception):
+    """El algoritmo necesita el motor exacto (recursión, cotas fuera del dominio)."""
+
+class AsymptoticCostCalculator(CostCalculator):
+    """
+    CostCalculator que lleva los costos como AsymptoticCost (solo el término
+    dominante) en lugar de expresiones exactas de SymPy. Sumas, máximos de
+    ramas y ciclos son O(1) y no se llama a simplify: en un if las ramas se
+    comparan por su término dominante.
+
+    Los valores (cotas de ciclos, variables, tamaños) siguen siendo exactos;
+    el número de iteraciones de un ciclo se acota reemplazando las variables
+    de los ciclos que lo contienen por sus extremos. Eso da la misma clase que
+    la suma exacta para cotas polinómicas (sum_{i<=n} i^a = Θ(n^(a+1))),
+    aunque el coeficiente puede no coincidir.
+
+    Las recurrencias necesitan los términos T(...) exactos: si el algoritmo
+    es recursivo, o alguna cota no se puede expresar en función de n, se
+    repite el análisis con el motor exacto (`fallback` queda en True).
+    """
+    def __init__(self, lines=None):
+        super().__init__(lines=lines)
+        self.asymptotic = True
+        self.fallback = False
+        self._ranges = [] # (variable, inicio, fin) de los ciclos for abiertos
+
+    def stats(self):
+        stats = super().stats()
+        stats["domain"] = "asymptotic" if self.asymptotic else "exact"
+        return stats
+
+    def visitAlgorithm(self, node:ast.Algorithm):
+        self.asymptotic = True
+        self._ranges = []
+        try:
+            return super().visitAlgorithm(node)
+        except _ExactRequired:
+            self.asymptotic, self.fallback = False, True
+            return super().visitAlgorithm(node)
+
+    def _iterative_result(self, total_cost):
+        if self.asymptotic:
+            total_cost = total_cost.as_expr(self.math.n)
+        return super()._iterative_result(total_cost)
+
+    def _to_cost(self, expr):
+        try:
+            return AsymptoticCost.from_expr(expr, self.math.n)
+        except ValueError:
+            raise _ExactRequired()
+
+    def _visit_body(self, body):
+        if not self.asymptotic:
+            return super()._visit_body(body)
+        cost = ZERO
+        for stmt in body:
+            c = self.visit(stmt)
+            if c: cost += c
+        return cost
+
+    # --- CONTROL DE FLUJO ---
+    def visitFor(self, node:ast.For):
+        if not self.asymptotic:
+            return super().visitFor(node)
+        var = node.var
+        start = self.visit(node.start)
+        end = self.visit(node.end)
+        self._ranges.append((var, start, end))
+        try:
+            body_cost = self.visit(node.body)
+        finally:
+            self._ranges.pop()
+        iters = self._iterations(end - start + 1)
+        total = body_cost * iters
+        self.loops += 1
+
+        details = f"Sum({var}={start}..{end}) [{iters} iter] * ({body_cost})"
+        self._log_step(node, total, details=details)
+        return total
+
+    def _iterations(self, count):
+        """Término dominante del número de iteraciones, con las variables de los ciclos externos en sus extremos."""
+        candidates = [count]
+        for var, start, end in reversed(self._ranges): # Del más interno (sus cotas pueden usar los externos)
+            sym = Symbol(var)
+            expanded = []
+            for candidate in candidates:
+                if hasattr(candidate, "has") and candidate.has(sym):
+                    expanded += [candidate.subs(sym, start), candidate.subs(sym, end)]
+                else:
+                    expanded.append(candidate)
+            candidates = expanded
+
+        iters = ZERO
+        for candidate in candidates:
+            cost = self._to_cost(candidate)
+            if cost.is_positive():
+                iters = iters.max(cost)
+        return iters
+
+    def visitWhile(self, node:ast.While):
+        if not self.asymptotic:
+            return super().visitWhile(node)
+        body_str = node.body_text
+        iters = self.math.n
+        if "*" in body_str or "/" in body_str or "div" in body_str:
+            iters = log(self.math.n, 2)
+        iters = self._to_cost(iters)
+
+        body_cost = self.visit(node.body)
+        total = body_cost * iters + iters + 1
+
+        details = f"{iters} iter * ({body_cost}) + Header"
+        self._log_step(node, total, details=details)
+        return total
+
+    def visitIf(self, node:ast.If):
+        if not self.asymptotic:
+            return super().visitIf(node)
+        cond = self._count_ops_in_expr(node.cond)
+        then_c = self.visit(node.then_body)
+        else_c = self.visit(node.else_body) if node.else_body is not None else ZERO
+
+        # Ramas distintas: el resultado es cota superior (O)
+        if then_c != else_c:
+            self.is_exact = False
+
+        # Sin recursión no hay casos base que registrar
+        total = then_c.max(else_c) + cond
+        self._log_step(node, total, details=f"Max({then_c}, {else_c}) + {cond}")
+        return total
+
+    def visitReturn(self, node:ast.Return):
+        cost = super().visitReturn(node)
+        return self._to_cost(cost) if self.asymptotic else cost
+
+    def visitAssign(self, node:ast.Assign):
+        cost = super().visitAssign(node)
+        return self._to_cost(cost) if self.asymptotic else cost
+
+    def visitCall(self, node:ast.Call):
+        cost = super().visitCall(node)
+        if not self.asymptotic:
+            return cost
+        if self.is_recursive:
+            raise _ExactRequired()
+        return self._to_cost(cost)
+
+    def visitFuncCall(self, node:ast.FuncCall):
+        value = super().visitFuncCall(node)
+        if self.asymptotic and self.is_recursive:
+            raise _ExactRequired()
+        return value
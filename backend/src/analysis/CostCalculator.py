@@ -1,21 +1,36 @@
 # src/analysis/CostCalculator.py
 
-from ..parsing.PseudoCodeAnalyzerVisitor import PseudoCodeAnalyzerVisitor
-from ..parsing.PseudoCodeAnalyzerParser import PseudoCodeAnalyzerParser
+from antlr4 import ParserRuleContext
+from ..parsing import AstNodes as ast
+from ..parsing.AstBuilder import build_ast
 from .MathEngine import MathEngine
-from sympy import Integer, Symbol, Max, ceiling, floor, simplify
+from ..execution.Tracing import span
+from collections import Counter
+from sympy import Add, Integer, Symbol, Max, ceiling, floor, simplify
+
+# Nodos cuyo valor se memoiza: expresiones (sin efectos sobre line_logs)
+_MEMO_NODES = (ast.Number, ast.Var, ast.FuncCall, ast.Unary, ast.BinOp)
 
 class AnalysisResult:
-    def __init__(self, worst_case=None, line_analysis=None, recurrence_eq=None, master_theorem_data=None, explanation=None):
+    def __init__(self, worst_case=None, line_analysis=None, recurrence_eq=None, master_theorem_data=None, explanation=None,
+                 approximate=False):
         self.worst_case = worst_case
         self.line_analysis = line_analysis if line_analysis else []
         self.recurrence_eq = recurrence_eq
         self.master_theorem_data = master_theorem_data
         self.explanation = explanation
+        self.approximate = approximate # Alguna operación simbólica agotó el presupuesto
 
-class CostCalculator(PseudoCodeAnalyzerVisitor):
-    def __init__(self):
+class CostCalculator:
+    """
+    Calcula costos sobre el AST compacto (AstNodes). `visit` también acepta
+    el árbol de ANTLR y lo baja al AST antes de recorrerlo.
+    """
+    def __init__(self, lines=None):
         self.math = MathEngine()
+        # Línea de cada token por índice. Con un AST de la ParseCache las
+        # líneas guardadas en sus nodos pueden ser de otra versión de la fuente.
+        self.lines = lines
         self.variables = {} 
         self.current_algorithm_name = None 
         self.is_recursive = False
@@ -25,15 +40,72 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
         self.explanation = None
         self.base_conditions = [] 
         self.is_exact = True # Default to exact bound (Theta)
+        self.loops = 0 # Ciclos for sumados (la explicación ya no los ve como Sum)
+        self.visit_counts = Counter() # Nodos evaluados por tipo
+        self.memo_hits = 0
+        self._reset_memo()
+
+    def _reset_memo(self):
+        # Memoización por nodo dentro de un análisis (el AST puede ser compartido:
+        # se indexa por id y se descarta con cada algoritmo)
+        self._values = {} # id(nodo) -> valor simbólico
+        self._ops = {} # id(nodo) -> operaciones elementales
+        self._simplified = {} # expresión -> simplify(expresión)
+        self._sums = {} # (cuerpo, variable, inicio, fin) -> sum_loop
+
+    def stats(self):
+        """Nodos evaluados por tipo y aciertos de la memoización."""
+        return {"visits": dict(self.visit_counts), "memo_hits": self.memo_hits,
+                "symbolic_timeouts": list(self.math.budget.degraded)}
         
-    def visit(self, tree):
-        """Override visit to handle None trees gracefully (e.g. syntax errors)."""
-        if tree is None:
+    def visit(self, node):
+        """Despacha por tipo de nodo. None (p. ej. errores de sintaxis) cuesta 0."""
+        if node is None:
             return Integer(0)
-        return super().visit(tree)
+        if isinstance(node, ParserRuleContext):
+            node = build_ast(node)
+        if isinstance(node, tuple): # Lista de sentencias
+            return self._visit_body(node)
+        if isinstance(node, _MEMO_NODES):
+            value = self._values.get(id(node))
+            if value is not None:
+                self.memo_hits += 1
+                return value
+            value = self._values[id(node)] = self._dispatch(node)
+            return value
+        return self._dispatch(node)
+
+    def _dispatch(self, node):
+        name = type(node).__name__
+        self.visit_counts[name] += 1
+        return getattr(self, "visit" + name)(node)
 
-    def _log_step(self, ctx, cost, details=None):
-        if hasattr(ctx, 'start'):
+    def _simplify(self, expr):
+        result = self._simplified.get(expr)
+        if result is None:
+            # Sin presupuesto se compara la diferencia sin simplificar (cota O)
+            result = self._simplified[expr] = self.math.budget.run("simplify", lambda: simplify(expr), lambda: expr)
+        else:
+            self.memo_hits += 1
+        return result
+
+    def _sum_loop(self, body_cost, var, start, end):
+        # Ciclos con el mismo cuerpo y cotas (p. ej. hermanos idénticos) se suman una vez
+        key = (body_cost, var, start, end)
+        result = self._sums.get(key)
+        if result is None:
+            result = self._sums[key] = self.math.sum_loop(body_cost, var, start, end)
+        else:
+            self.memo_hits += 1
+        return result
+
+    def _line(self, node):
+        if self.lines is not None and node.token is not None and 0 <= node.token < len(self.lines):
+            return self.lines[node.token]
+        return node.line
+
+    def _log_step(self, node, cost, details=None):
+        if node.line is not None:
             cost_str = str(cost).replace("**", "^")
             if details:
                 # Limpieza visual
@@ -41,11 +113,15 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
                 log_entry = f"OE: {details} -> {cost_str}"
             else:
                 log_entry = f"OE: {cost_str} -> {cost_str}"
-            self.line_logs.append({"line": ctx.start.line, "cost": log_entry})
+            self.line_logs.append({"line": self._line(node), "cost": log_entry})
 
-    def visitProgram(self, ctx:PseudoCodeAnalyzerParser.ProgramContext):
-        algo_ctx = ctx.algorithm_definition()
-        complexity_result = self.visit(algo_ctx)
+    def visitProgram(self, node:ast.Program):
+        # Un presupuesto de tiempo simbólico por análisis
+        self.math.budget.start()
+        complexity_result = self.visit(node.algorithm)
+        approximate = self.math.budget.approximate
+        if approximate:
+            self.is_exact = False # Resultado aproximado: solo cota superior
         
         final_str = str(complexity_result)
         if hasattr(self.math, 'format_complexity'):
@@ -60,16 +136,23 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
             # Solo mostrar formatted_str para mantener la estética limpia
             final_str = formatted_str
 
+        approximate = self.math.budget.approximate
+        if approximate and self.explanation:
+            self.explanation += ("\n\n> **Nota:** El cálculo simbólico superó el tiempo disponible "
+                                 f"({', '.join(self.math.budget.degraded)}); el resultado es una aproximación "
+                                 "basada en el término dominante.")
+
         return AnalysisResult(
             worst_case=final_str, 
             line_analysis=self.line_logs,
             recurrence_eq=self.raw_equation,
             master_theorem_data=self.temp_master_data,
-            explanation=self.explanation
+            explanation=self.explanation,
+            approximate=approximate
         )
 
-    def visitAlgorithm_definition(self, ctx:PseudoCodeAnalyzerParser.Algorithm_definitionContext):
-        self.current_algorithm_name = ctx.ID().getText()
+    def visitAlgorithm(self, node:ast.Algorithm):
+        self.current_algorithm_name = node.name
         print(f"Analizando: {self.current_algorithm_name}")
         
         self.variables = {}
@@ -80,10 +163,12 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
         self.explanation = None
         self.base_conditions = [] 
         self.is_exact = True # Reset for new algorithm
+        self.loops = 0
+        self._reset_memo()
         
         total_cost = Integer(0)
-        if ctx.statement_list():
-            total_cost = self.visit(ctx.statement_list())
+        if node.body:
+            total_cost = self.visit(node.body)
             
         if self.is_recursive:
             # Split cost into recursive and base parts
@@ -128,7 +213,10 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
             self.raw_equation = eq_str
             
             # Resolver recurrencia
-            solved_data = self.math.solve_recurrence(total_cost)
+            with span("solve") as solve_span:
+                solved_data = self.math.solve_recurrence(total_cost)
+                if isinstance(solved_data, dict):
+                    solve_span.set(type=(solved_data.get("details") or {}).get("type", "unknown"))
             
             # Generar explicacion
             self.explanation = self.math.explain_recurrence(solved_data, eq_str)
@@ -140,53 +228,63 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
             
             return complexity
         else:
-            # Iterative explanation
-            self.explanation = self.math.explain_iterative(total_cost)
-            return total_cost
+            return self._iterative_result(total_cost)
 
-    def visitStatement_list(self, ctx:PseudoCodeAnalyzerParser.Statement_listContext):
+    def _iterative_result(self, total_cost):
+        # Iterative explanation
+        self.explanation = self.math.explain_iterative(total_cost, loops=self.loops)
+        return total_cost
+
+    def _visit_body(self, body):
         cost = Integer(0)
-        for stmt in ctx.statement():
+        for stmt in body:
             c = self.visit(stmt)
             if c: cost += c
         return cost
 
     # --- CONTROL DE FLUJO ---
-    def visitFor_loop(self, ctx:PseudoCodeAnalyzerParser.For_loopContext):
-        var = ctx.ID().getText()
-        start = self.visit(ctx.expression(0))
-        end = self.visit(ctx.expression(1))
-        body_cost = self.visit(ctx.statement_list())
-        total = self.math.sum_loop(body_cost, var, start, end)
+    def visitFor(self, node:ast.For):
+        var = node.var
+        start = self.visit(node.start)
+        end = self.visit(node.end)
+        body_cost = self.visit(node.body)
+        total = self._sum_loop(body_cost, var, start, end)
+        self.loops += 1
         
         # OE: Iteraciones * Cuerpo
         iters = (end - start + 1)
         details = f"Sum({var}={start}..{end}) [{iters} iter] * ({body_cost})"
-        self._log_step(ctx, total, details=details)
+        self._log_step(node, total, details=details)
         return total
 
-    def visitWhile_loop(self, ctx:PseudoCodeAnalyzerParser.While_loopContext):
-        body_str = ctx.statement_list().getText()
+    def visitWhile(self, node:ast.While):
+        body_str = node.body_text
         iters = self.math.n 
         if "*" in body_str or "/" in body_str or "div" in body_str:
             from sympy import log
             iters = log(self.math.n, 2)
         
         header_cost = iters + 1
-        body_cost = self.visit(ctx.statement_list())
+        body_cost = self.visit(node.body)
         total = (body_cost * iters) + header_cost
         
         details = f"{iters} iter * ({body_cost}) + Header"
-        self._log_step(ctx, total, details=details)
+        self._log_step(node, total, details=details)
         return total
 
-    def visitIf_statement(self, ctx:PseudoCodeAnalyzerParser.If_statementContext):
-        cond = self._count_ops_in_expr(ctx.expression())
-        then_c = self.visit(ctx.statement_list(0))
-        else_c = self.visit(ctx.statement_list(1)) if ctx.ELSE() else Integer(0)
+    def visitRepeat(self, node:ast.Repeat):
+        # Sin costo propio: solo se recorren cuerpo y condición (líneas y recursión)
+        self.visit(node.body)
+        self.visit(node.cond)
+        return None
+
+    def visitIf(self, node:ast.If):
+        cond = self._count_ops_in_expr(node.cond)
+        then_c = self.visit(node.then_body)
+        else_c = self.visit(node.else_body) if node.else_body is not None else Integer(0)
         
         # Detect branching difference
-        diff = simplify(then_c - else_c)
+        diff = self._simplify(then_c - else_c)
         if diff != 0:
             self.is_exact = False # Branching detected, result is Upper Bound (O)
         
@@ -198,60 +296,60 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
              if not then_has_T:
                  # Potential base case
                  # Check if it looks like a base case check (involves n)
-                 if "n" in ctx.expression().getText():
-                     self.base_conditions.append(ctx.expression().getText())
+                 if "n" in node.cond_text:
+                     self.base_conditions.append(node.cond_text)
 
         total = cond + Max(then_c, else_c)
-        self._log_step(ctx, total, details=f"Max({then_c}, {else_c}) + {cond}")
+        self._log_step(node, total, details=f"Max({then_c}, {else_c}) + {cond}")
         return total
 
-    def visitReturn_statement(self, ctx:PseudoCodeAnalyzerParser.Return_statementContext):
+    def visitReturn(self, node:ast.Return):
         # Visitamos la expresión para ver si hay recursión T(n) dentro
-        val = self.visit(ctx.expression())
+        val = self.visit(node.value)
         
         # Si el valor retornado contiene un costo recursivo T(...), retornamos ese costo
         if hasattr(val, 'has') and val.has(self.math.T):
             # Costo = calcular recursión + 1 retorno
             total = val + 1
-            self._log_step(ctx, total, details=f"Return Recursion: {val} + 1")
+            self._log_step(node, total, details=f"Return Recursion: {val} + 1")
             return total
             
         # Si es un valor simple (n), el costo es O(1) + operaciones
-        cost = self._count_ops_in_expr(ctx.expression()) + 1
-        self._log_step(ctx, cost)
+        cost = self._count_ops_in_expr(node.value) + 1
+        self._log_step(node, cost)
         return cost
 
-    def visitAssignment(self, ctx:PseudoCodeAnalyzerParser.AssignmentContext):
-        val = self.visit(ctx.expression())
-        var = ctx.target_var().getText()
+    def visitAssign(self, node:ast.Assign):
+        val = self.visit(node.value)
+        var = node.target
         if "[" not in var: self.variables[var] = val
         
         # Si la expresión contiene una llamada recursiva T(...), el costo es esa recursión + asignación
         if hasattr(val, 'has') and val.has(self.math.T):
             cost = val + 1
-            self._log_step(ctx, cost, details=f"Assign Recursion: {val} + 1")
+            self._log_step(node, cost, details=f"Assign Recursion: {val} + 1")
             return cost
 
-        cost = self._count_ops_in_expr(ctx.expression()) + 1
-        self._log_step(ctx, cost)
+        cost = self._count_ops_in_expr(node.value) + 1
+        self._log_step(node, cost)
         return cost
 
-    def visitCall_statement(self, ctx:PseudoCodeAnalyzerParser.Call_statementContext):
-        func_name = ctx.ID().getText()
+    def visitCall(self, node:ast.Call):
+        func_name = node.name
         
         # Check for recursion
         if func_name == self.current_algorithm_name:
             self.is_recursive = True
             
             # Get argument
-            args = ctx.expression()
+            args = node.args
             new_size = self.math.n
             
             # Heuristic: Find the argument that looks like a size (contains n or numbers)
             found_size = False
             if args:
                 for arg in args:
-                    val = self.visit(arg)
+                    val = self.visit(arg) # Memoizado: el respaldo de abajo no re-evalúa
                     # Check if val depends on n or is a number
                     if hasattr(val, 'free_symbols') and self.math.n in val.free_symbols:
                         new_size = val
@@ -266,86 +364,77 @@ class CostCalculator(PseudoCodeAnalyzerVisitor):
                      new_size = self.visit(args[0])
             
             cost = self.math.T(new_size)
-            self._log_step(ctx, cost, details=f"Recurrencia: T({new_size})")
+            self._log_step(node, cost, details=f"Recurrencia: T({new_size})")
             return cost
         
         # External call cost
         cost = Integer(1)
-        self._log_step(ctx, cost, details="External Call")
+        self._log_step(node, cost, details="External Call")
         return cost
 
     # --- VISITORS DE EXPRESIONES ---
     
-    def visitExprAtom(self, ctx:PseudoCodeAnalyzerParser.ExprAtomContext):
-        # Verificamos si es una llamada a función: ID ( ... )
-        atom_ctx = ctx.atom()
-        
-        # ANTLR guarda tokens hijos. Si hay LPAREN, es llamada o acceso.
-        if atom_ctx.LPAREN():
-            func_name = atom_ctx.ID().getText()
+    def visitFuncCall(self, node:ast.FuncCall):
+        # DETECCIÓN DE RECURSIÓN EN EXPRESIÓN (Fibonacci + Fibonacci)
+        if node.name == self.current_algorithm_name:
+            self.is_recursive = True
             
-            # DETECCIÓN DE RECURSIÓN EN EXPRESIÓN (Fibonacci + Fibonacci)
-            if func_name == self.current_algorithm_name:
-                self.is_recursive = True
-                
-                # Obtener argumento. La gramática es: ID LPAREN (expr (, expr)*)? RPAREN
-                # atom context tiene el método expression() que devuelve lista
-                args = atom_ctx.expression()
-                new_size = self.math.n
-                if args:
-                    # Visitamos el primer argumento para resolver variables (ej: n-1)
-                    new_size = self.visit(args[0])
-                
-                return self.math.T(new_size)
+            new_size = self.math.n
+            if node.args:
+                # Visitamos el primer argumento para resolver variables (ej: n-1)
+                new_size = self.visit(node.args[0])
             
-            # Si es otra función, asumimos costo 1 por ahora
-            return Integer(1)
+            return self.math.T(new_size)
+        
+        # Si es otra función, asumimos costo 1 por ahora
+        return Integer(1)
+
+    def visitNumber(self, node:ast.Number): return Integer(node.value)
 
-        # Si no es función, es variable o número
-        txt = atom_ctx.getText()
-        if txt.isdigit(): return Integer(int(txt))
+    def visitVar(self, node:ast.Var):
+        txt = node.text
         if txt == 'n': return self.math.n
         if txt in self.variables: return self.variables[txt]
         return Symbol(txt.split('[')[0])
 
-    def visitExprParen(self, ctx): return self.visit(ctx.expression())
-    
-    def visitExprAddSub(self, ctx):
-        try:
-            e0 = ctx.expression(0)
-            e1 = ctx.expression(1)
-            if e0 is None or e1 is None:
-                return Integer(0)
-                
-            l = self.visit(e0)
-            r = self.visit(e1)
+    def visitUnary(self, node:ast.Unary):
+        if node.op == "not": return Integer(1)
+        val = self.visit(node.operand)
+        if node.op == "ceil": return ceiling(val)
+        if node.op == "floor": return floor(val)
+        return val
+
+    def visitBinOp(self, node:ast.BinOp):
+        op = node.op
+        if op in ("+", "-"):
             # Si alguno es un costo recursivo T(...), sumamos los costos
             # Si son valores, operamos aritméticamente
-            return l + r if ctx.OP_ADD() else l - r
-        except Exception as e:
-            print(f"Error in visitExprAddSub: {e}")
-            raise e
-        
-    def visitExprMulDiv(self, ctx):
-        l, r = self.visit(ctx.expression(0)), self.visit(ctx.expression(1))
-        if ctx.OP_MUL(): return l * r
-        if ctx.OP_DIV_REAL(): return l / r
-        return floor(l / r)
-
-    def visitExprCeil(self, ctx): return ceiling(self.visit(ctx.expression()))
-    def visitExprFloor(self, ctx): return floor(self.visit(ctx.expression()))
-    def visitExprRelational(self, ctx): return Integer(1)
-    def visitExprAnd(self, ctx): return Integer(1)
-    def visitExprOr(self, ctx): return Integer(1)
-    def visitExprNot(self, ctx): return Integer(1)
-
-    def _count_ops_in_expr(self, expr_ctx):
-        if expr_ctx is None: return Integer(0)
+            if node.left is None or node.right is None:
+                return Integer(0)
+            l, r = self.visit(node.left), self.visit(node.right)
+            return l + r if op == "+" else l - r
+        if op in ("*", "/", "mod", "div"):
+            l, r = self.visit(node.left), self.visit(node.right)
+            recursive = [v for v in (l, r) if hasattr(v, 'has') and v.has(self.math.T)]
+            if recursive:
+                # n * F(n-1): el otro operando es un valor, no escala el costo de la llamada
+                return Add(*recursive) + 1
+            if op == "*": return l * r
+            if op == "/": return l / r
+            return floor(l / r)
+        # Relacionales y lógicos
+        return Integer(1)
+
+    def _count_ops_in_expr(self, node):
+        if node is None: return Integer(0)
+        count = self._ops.get(id(node))
+        if count is not None:
+            self.memo_hits += 1
+            return count
         count = 0
-        if hasattr(expr_ctx, 'expression'):
-            exprs = expr_ctx.expression()
-            if isinstance(exprs, list):
-                for e in exprs: count += self._count_ops_in_expr(e)
-            elif exprs: count += self._count_ops_in_expr(exprs)
-        if expr_ctx.getChildCount() > 1: count += 1
-        return Integer(max(1, count))
\ No newline at end of file
+        if isinstance(node, ast.BinOp):
+            count += self._count_ops_in_expr(node.left) + self._count_ops_in_expr(node.right) + 1
+        elif isinstance(node, ast.Unary):
+            count += self._count_ops_in_expr(node.operand) + 1
+        count = self._ops[id(node)] = Integer(max(1, count))
+        return count
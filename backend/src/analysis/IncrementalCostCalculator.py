@@ -0,0 +1,137 @@
+# src/analysis/IncrementalCostCalculator.py
+
+from ..parsing import AstNodes as ast
+from .CostCalculator import CostCalculator
+
+_STATEMENT_NODES = (ast.For, ast.While, ast.Repeat, ast.If, ast.Call, ast.Return, ast.Assign)
+
+# Métodos de MathEngine que solo dependen de sus argumentos
+_MEMO_MATH = ("solve_recurrence", "explain_recurrence", "explain_iterative", "format_complexity",
+              "get_recursive_part", "get_base_part")
+
+class _MemoMath:
+    """MathEngine con memoización de los pasos finales, compartida entre análisis de una sesión."""
+    def __init__(self, engine, memo):
+        self._engine = engine
+        self._memo = memo # MemoryCache
+
+    def __getattr__(self, name):
+        attr = getattr(self._engine, name)
+        if name not in _MEMO_MATH:
+            return attr
+
+        def memoized(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError: # Argumentos no hashables (p. ej. el dict de solve_recurrence)
+                return attr(*args, **kwargs)
+            result = self._memo.get(key, _MISSING)
+            if result is _MISSING:
+                degraded = len(self._engine.budget.degraded)
+                result = attr(*args, **kwargs)
+                if len(self._engine.budget.degraded) == degraded: # Los resultados aproximados no se reutilizan
+                    self._memo.put(key, result)
+            return result
+        return memoized
+
+_MISSING = object()
+
+class IncrementalCostCalculator(CostCalculator):
+    """
+    CostCalculator que reutiliza el costo de las sentencias que no cambiaron
+    desde análisis anteriores de la misma sesión.
+
+    Cada sentencia se indexa por su texto (tokens), el nombre del algoritmo y
+    el valor de las variables que menciona, que es todo el estado que lee. Si
+    la clave está en la tabla se reproduce su efecto (costo, líneas del log,
+    variables, recursión, casos base, ciclos) sin recorrerla; si no, se calcula y se
+    guarda. Tras una edición solo se recalculan la sentencia editada, sus
+    ancestros en el anidamiento de ciclos/condicionales y las sentencias que
+    leen una variable cuyo valor cambió.
+    """
+    def __init__(self, texts, lines, statement_table, math_memo):
+        super().__init__(lines=lines)
+        self.math = _MemoMath(self.math, math_memo)
+        self._texts = texts # Texto de cada token del stream actual
+        self.statement_table = statement_table # MemoryCache compartida por la sesión
+        self._log_tokens = [] # Índice de token de cada entrada de line_logs
+        self.reused = 0
+        self.recomputed = 0
+
+    def _log_step(self, node, cost, details=None):
+        before = len(self.line_logs)
+        super()._log_step(node, cost, details)
+        if len(self.line_logs) > before:
+            self._log_tokens.append(node.token)
+
+    def visitAlgorithm(self, node):
+        self._log_tokens = []
+        return super().visitAlgorithm(node)
+
+    def _key(self, node):
+        if node.token is None or node.stop is None:
+            return None
+        tokens = self._texts[node.token:node.stop + 1]
+        names = set(tokens)
+        # Solo las variables que la sentencia menciona ("p.valor" se guarda con su punto)
+        variables = frozenset((name, value) for name, value in self.variables.items()
+                              if all(part in names for part in name.split(".")))
+        return ("\x1f".join(tokens), self.current_algorithm_name, variables)
+
+    def visit(self, node):
+        if not isinstance(node, _STATEMENT_NODES):
+            return super().visit(node)
+        key = self._key(node)
+        if key is None:
+            return super().visit(node)
+
+        delta = self.statement_table.get(key)
+        if delta is not None:
+            self.reused += 1
+            return self._replay(node, delta)
+
+        self.recomputed += 1
+        variables = dict(self.variables)
+        logs = len(self.line_logs)
+        conditions = len(self.base_conditions)
+        loops = self.loops
+        degraded = len(self.math.budget.degraded)
+        # Las banderas no forman parte de la clave: se registra lo que la
+        # sentencia activa por sí misma, sin importar el estado previo
+        was_recursive, was_exact = self.is_recursive, self.is_exact
+        self.is_recursive, self.is_exact = False, True
+
+        cost = super().visit(node)
+
+        made_recursive, made_inexact = self.is_recursive, not self.is_exact
+        self.is_recursive = was_recursive or made_recursive
+        self.is_exact = was_exact and not made_inexact
+        if len(self.math.budget.degraded) != degraded:
+            return cost # Calculada con respaldos aproximados: no se guarda
+        self.statement_table.put(key, {
+            "cost": cost,
+            "logs": [(token - node.token, entry["cost"])
+                     for token, entry in zip(self._log_tokens[logs:], self.line_logs[logs:])],
+            "variables": {k: v for k, v in self.variables.items() if k not in variables or variables[k] != v},
+            "recursive": made_recursive,
+            "inexact": made_inexact,
+            "base_conditions": self.base_conditions[conditions:],
+            "loops": self.loops - loops,
+        })
+        return cost
+
+    def _replay(self, node, delta):
+        for offset, entry in delta["logs"]:
+            token = node.token + offset
+            line = self.lines[token] if self.lines is not None and token < len(self.lines) else node.line
+            self.line_logs.append({"line": line, "cost": entry})
+            self._log_tokens.append(token)
+        self.variables.update(delta["variables"])
+        if delta["recursive"]:
+            self.is_recursive = True
+        if delta["inexact"]:
+            self.is_exact = False
+        self.base_conditions.extend(delta["base_conditions"])
+        self.loops += delta["loops"]
+        return delta["cost"]
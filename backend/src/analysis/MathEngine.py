@@ -1,11 +1,20 @@
 import re
-import math
 from sympy import symbols, Function, sympify, solve, roots, degree, O, oo, limit, simplify, log, Sum, Add, Mul, Max, Wild
+from .SummationEngine import SummationEngine
+from .RecurrenceSolver import get_recurrence_solver, dominant_root, format_root
+from .SymbolicBudget import SymbolicBudget
+from .AsymptoticCost import AsymptoticCost, ONE
+
+# Hasta este grado se muestran además las raíces exactas (roots() de SymPy)
+EXACT_ROOTS_MAX_DEGREE = 4
 
 class MathEngine:
     def __init__(self):
         self.n = symbols('n', integer=True, positive=True)
         self.T = Function('T')
+        self.summation = SummationEngine()
+        self.recurrences = get_recurrence_solver()
+        self.budget = SymbolicBudget()
 
     def _clean_expression(self, expr):
         """
@@ -81,7 +90,13 @@ class MathEngine:
     def solve_recurrence(self, total_cost):
         """
         Analyzes the total cost expression to determine complexity.
+        Canonical forms (a*T(n/b) + f(n), sum of c*T(n-k)) go through the
+        RecurrenceSolver table/cache; anything else uses the generic path below.
         """
+        form = self.recurrences.canonicalize(total_cost, self.n, self.T) if hasattr(total_cost, 'has') else None
+        if form is not None:
+            return self._solve_canonical(form)
+
         # 1. Extract terms
         # Assume total_cost is like T(n/b) + f(n) or T(n-1) + ...
         
@@ -141,14 +156,14 @@ class MathEngine:
                     
                     # Manual check
                     # arg = n * (1/b)
-                    ratio = simplify(self.n / arg)
+                    ratio = self._simplify(self.n / arg)
                     if ratio.is_constant() and ratio > 1:
                         b = ratio
                         a += coeff
                         is_master = True
                 
                 # n-k
-                diff = simplify(self.n - arg)
+                diff = self._simplify(self.n - arg)
                 if diff.is_constant() and diff > 0:
                     is_linear = True
                     # We collect these for characteristic equation
@@ -164,6 +179,61 @@ class MathEngine:
 
         return {"complexity": total_cost, "details": {"type": "unknown"}}
 
+    def _solve_canonical(self, form):
+        if form[0] == "linear":
+            _, lags, f_n = form
+            terms = [coeff * self.T(self.n - lag) for lag, coeff in lags]
+            return self.recurrences.solve_linear(lags, f_n, self.n, lambda: self._solve_characteristic_equation(terms))
+
+        _, a, b, f_n = form
+        solved = self.recurrences.master_case(a, b, f_n, self.n)
+        if solved is None:
+            return self.recurrences.solve_exact(form, lambda: self._master_theorem(a, b, f_n))
+
+        case, log_val, log_power = solved
+        n_log = self.n ** log_val
+        details = {
+            "type": "master_theorem",
+            "a": str(a),
+            "b": str(b),
+            "f_n": str(f_n),
+            "log_val": str(log_val),
+            "case": case
+        }
+        if case == 1:
+            return {"complexity": n_log, "details": details}
+        if case == 2:
+            if log_power:
+                details["log_power"] = str(log_power)
+            return {"complexity": n_log * log(self.n, 2)**(log_power + 1), "details": details}
+        return {"complexity": f_n, "details": details}
+
+    def _simplify(self, expr):
+        """simplify under the analysis budget; on timeout the expression is returned as is."""
+        return self.budget.run("simplify", lambda: simplify(expr), lambda: expr)
+
+    def _dominant_limit(self, ratio):
+        """
+        Cheap stand-in for limit(ratio, n, oo): compares the dominant term of
+        the ratio with 1 (0, a positive constant or oo).
+        """
+        cost = AsymptoticCost.from_expr(ratio, self.n)
+        if cost.is_zero():
+            return 0
+        if cost.same_class(ONE):
+            return cost.c
+        return oo if cost.max(ONE) is cost else 0
+
+    def _log_power(self, ratio):
+        """k if ratio is Θ(log^k n) with k > 0, else None."""
+        try:
+            cost = AsymptoticCost.from_expr(ratio, self.n)
+        except ValueError:
+            return None
+        if cost.is_positive() and cost.a == 0 and cost.k == 1 and cost.b > 0:
+            return int(cost.b) if cost.b.denominator == 1 else cost.b
+        return None
+
     def _master_theorem(self, a, b, f_n):
         try:
             log_val = log(a, b)
@@ -182,8 +252,10 @@ class MathEngine:
             if n_log == 0: 
                 return {"complexity": f_n, "details": details}
             
-            ratio = simplify(f_n / n_log)
-            limit_val = ratio.limit(self.n, oo)
+            limit_val = self.budget.run("limit", lambda: simplify(f_n / n_log).limit(self.n, oo),
+                                        lambda: self._dominant_limit(f_n / n_log))
+            if self.budget.approximate:
+                details["approximate"] = True
             
             # Caso 1: f(n) es polinómicamente menor que n^log_b(a)
             # Si f(n) / n^log_b(a) -> 0, entonces f(n) es O(n^{log_b a - epsilon})
@@ -191,6 +263,14 @@ class MathEngine:
                 details["case"] = 1
                 return {"complexity": n_log, "details": details}
             
+            # f(n) = n^log_b(a) * log^k n (k > 0): el límite es oo pero es el caso 2 extendido
+            if limit_val == oo:
+                log_power = self._log_power(f_n / n_log)
+                if log_power:
+                    details["case"] = 2
+                    details["log_power"] = str(log_power)
+                    return {"complexity": n_log * log(self.n, 2)**(log_power + 1), "details": details}
+
             # Caso 3: f(n) es Omega(n^{log_b a + epsilon})
             # Si el límite es infinito
             if limit_val == oo:
@@ -228,7 +308,7 @@ class MathEngine:
                 t_calls = [atom for atom in term.atoms(Function) if atom.name == 'T']
                 if t_calls:
                     arg = t_calls[0].args[0]
-                    diff = simplify(self.n - arg)
+                    diff = self._simplify(self.n - arg)
                     if diff.is_constant() and diff > 0:
                         lag = int(diff)
                         lags.append(lag)
@@ -243,70 +323,49 @@ class MathEngine:
             if not lags: return {"complexity": "Unknown", "details": None}
             
             max_lag = max(lags)
-            r = symbols('r')
-            
-            # Polinomio: r^max_lag - sum(coeff * r^(max_lag - lag))
-            poly = r**max_lag
-            for lag, coeff in coeffs.items():
-                poly -= coeff * r**(max_lag - lag)
-                
-            # Resolver raíces
-            poly_roots = roots(poly)
-            print(f"DEBUG: Roots found: {poly_roots}")
-            
-            # Encontrar la raíz dominante
-            max_root = 0
-            max_abs_val = -1
-            
-            for root in poly_roots:
-                try:
-                    val = root.evalf()
-                    abs_val = abs(complex(val))
-                except:
-                    abs_val = 0
-                
-                if abs_val > max_abs_val:
-                    max_abs_val = abs_val
-                    max_root = root
-            
-            print(f"DEBUG: Max root: {max_root}")
-            
-            # Detectar Golden Ratio
-            if "sqrt(5)" in str(max_root):
-                res_str = "Θ(1.618^n)"
+
+            # Polinomio: r^max_lag - sum(coeff * r^(max_lag - lag)), coeficientes de mayor a menor grado
+            coefficients = [1] + [-coeffs.get(lag, 0) for lag in range(1, max_lag + 1)]
+
+            # Raíz dominante numérica (matriz compañera): determinista y sin radicales
+            dominant, multiplicity, numeric_roots, (exact_root, base) = dominant_root(coefficients)
+            print(f"DEBUG: Dominant root: {dominant} (multiplicity {multiplicity})")
+
+            poly_roots = None
+            if max_lag <= EXACT_ROOTS_MAX_DEGREE:
+                # Grado bajo: raíces exactas para la explicación (radicales legibles).
+                # Sin presupuesto quedan las numéricas.
+                r = symbols('r')
+                poly = r**max_lag
+                for lag, coeff in coeffs.items():
+                    poly -= coeff * r**(max_lag - lag)
+                poly_roots = self.budget.run("roots", lambda: list(roots(poly)), lambda: None)
+            if poly_roots:
+                roots_list = [str(root) for root in poly_roots]
+                max_root = min(poly_roots, key=lambda root: abs(complex(root.evalf()) - dominant))
             else:
-                big_o = O(max_root**self.n, (self.n, oo))
-                res_str = str(big_o)
-                
-                res_str = res_str.replace(", (n, oo)", "")
-                res_str = res_str.replace("O(", "Θ(")
-                res_str = res_str.replace("**", "^")
-                res_str = res_str.replace("log(1/n)", "log(n)") 
-                res_str = res_str.replace("log(n)/log(2)", "log n")
-            
-            # Limpieza de Exponenciales
-            if "exp(" in res_str:
-                match_log = re.search(r'exp\((?:[0-9\.]+\*)?n\*log\(([0-9]+)\)\)', res_str)
-                if match_log:
-                    base = match_log.group(1)
-                    res_str = f"Θ({base}^n)"
-                
-                match_num = re.search(r'exp\(([0-9\.]+)\*n\)', res_str)
-                if match_num:
-                    val = float(match_num.group(1))
-                    base = round(math.exp(val), 2)
-                    if base.is_integer(): base = int(base)
-                    res_str = f"Θ({base}^n)"
-            
-            return {
-                "complexity": res_str,
-                "details": {
-                    "type": "characteristic_equation",
-                    "lags": lags,
-                    "roots": [str(r) for r in poly_roots],
-                    "dominant_root": str(max_root)
-                }
+                roots_list = [format_root(root) for root in numeric_roots]
+                max_root = exact_root if exact_root is not None else base
+
+            # Multiplicidad m: factor n^(m-1)
+            poly_factor = "" if multiplicity == 1 else ("n" if multiplicity == 2 else f"n^{multiplicity - 1}")
+            if base == "1":
+                res_str = f"Θ({poly_factor or 1})"
+            elif poly_factor:
+                res_str = f"Θ({poly_factor}*{base}^n)"
+            else:
+                res_str = f"Θ({base}^n)"
+
+            details = {
+                "type": "characteristic_equation",
+                "lags": lags,
+                "roots": roots_list,
+                "dominant_root": str(max_root),
+                "multiplicity": multiplicity
             }
+            if self.budget.approximate:
+                details["approximate"] = True
+            return {"complexity": res_str, "details": details}
         except Exception as e: 
             print(f"DEBUG: Error in characteristic equation: {e}")
             return {"complexity": "Unknown Recurrence", "details": None}
@@ -315,8 +374,8 @@ class MathEngine:
         """Formatea la complejidad para que sea legible."""
         try:
             if hasattr(complexity, 'free_symbols') and self.n in complexity.free_symbols:
-                 big_o = O(complexity, (self.n, oo))
-                 complexity = big_o
+                 expr = complexity
+                 complexity = self.budget.run("O", lambda: O(expr, (self.n, oo)), lambda: self._dominant_term(expr))
         except: pass
 
         s = str(complexity)
@@ -326,6 +385,7 @@ class MathEngine:
         s = s.replace("Θ(", "Theta(") 
 
         s = s.replace("log(n)/log(2)", "log n")
+        s = s.replace("log(1/n)", "log n") # O(...) en oo sustituye n -> 1/n
         s = s.replace("log(n)", "log n")
         
         match_exp = re.search(r'exp\(n\s*\*\s*log\((.+?)\)\)', s)
@@ -358,6 +418,11 @@ class MathEngine:
             
         return s
 
+    def _dominant_term(self, expr):
+        """Dominant term without its coefficient (approximate O(...) when the budget runs out)."""
+        cost = AsymptoticCost.from_expr(expr, self.n)
+        return AsymptoticCost(1, cost.a, cost.b, cost.k).as_expr(self.n)
+
     def explain_recurrence(self, complexity_data, recurrence_eq_str):
         """
         Generates a didactic explanation for the solved recurrence.
@@ -409,7 +474,11 @@ class MathEngine:
             elif case == 2:
                 explanation.append(f"**Caso 2:** `f(n)` es similar a `n^log_b(a)`.")
                 explanation.append(f"El costo es uniforme en todos los niveles del árbol de recursión.")
-                explanation.append(f"Multiplicamos por un factor logarítmico `log n`.")
+                log_power = details.get("log_power")
+                if log_power:
+                    explanation.append(f"Como `f(n) = Θ(n^log_b(a) · log^{log_power} n)` (caso 2 extendido), el resultado es `n^log_b(a) · log^({log_power}+1) n`.")
+                else:
+                    explanation.append(f"Multiplicamos por un factor logarítmico `log n`.")
             elif case == 3:
                 explanation.append(f"**Caso 3:** `f(n)` es polinómicamente mayor que `n^log_b(a)`.")
                 explanation.append(f"El costo en la raíz domina sobre los subproblemas.")
@@ -441,7 +510,15 @@ class MathEngine:
             explanation.append(f"- Encontramos las raíces del polinomio: {', '.join(roots_list)}.")
             if dom_root:
                 explanation.append(f"- La **raíz dominante** es `{dom_root}`.")
+            multiplicity = details.get("multiplicity", 1)
+            if multiplicity > 1:
+                explanation.append(f"- La raíz dominante tiene **multiplicidad {multiplicity}**, lo que agrega un factor `n^{multiplicity - 1}`.")
             explanation.append("- Esta raíz dicta la base del crecimiento exponencial.")
+            dominated_by = details.get("dominated_by")
+            if dominated_by == "f_n":
+                explanation.append(f"- La parte no recursiva `f(n) = Θ({details.get('f_n')})` crece más rápido que la raíz dominante, así que domina.")
+            elif dominated_by == "both":
+                explanation.append(f"- La parte no recursiva `f(n) = Θ({details.get('f_n')})` crece al ritmo de la raíz dominante: cada uno de los ~n niveles aporta `f(n)`, lo que agrega un factor `n`.")
             
             # Check for Phi
             if any("sqrt(5)" in r for r in roots_list):
@@ -474,9 +551,11 @@ class MathEngine:
             
         return "\n".join(explanation)
 
-    def explain_iterative(self, complexity_expr):
+    def explain_iterative(self, complexity_expr, loops=0):
         """
         Generates a didactic explanation for iterative algorithms (loops).
+        `loops` is the number of for loops summed; sums solved in closed form
+        no longer show up as "Sum" in the expression.
         """
         explanation = []
         explanation.append(f"### Análisis Iterativo\n")
@@ -484,11 +563,10 @@ class MathEngine:
         s_expr = str(complexity_expr)
         
         explanation.append("#### 1. Desglose de Operaciones")
-        if "Sum" in s_expr:
+        count_sum = loops or s_expr.count("Sum")
+        if count_sum:
             explanation.append("El algoritmo contiene **ciclos** (bucles) que se modelan matemáticamente como sumatorias.")
             
-            # Simple heuristic to detect nesting
-            count_sum = s_expr.count("Sum")
             if count_sum > 1:
                 explanation.append(f"- Se detectaron **{count_sum} ciclos anidados** (o secuenciales complejos).")
                 explanation.append("- Esto generalmente implica multiplicar las iteraciones de cada nivel.")
@@ -506,10 +584,11 @@ class MathEngine:
         
         # Try to simplify/expand if it's a Sum
         try:
-            if hasattr(complexity_expr, 'doit'):
-                expanded = complexity_expr.doit()
-                explanation.append(f"Al resolver las sumatorias, obtenemos:")
-                explanation.append(f"`{expanded}`")
+            if hasattr(complexity_expr, 'has') and complexity_expr.has(Sum):
+                expanded = self.budget.run("doit", complexity_expr.doit, lambda: None)
+                if expanded is not None:
+                    explanation.append(f"Al resolver las sumatorias, obtenemos:")
+                    explanation.append(f"`{expanded}`")
         except: pass
 
         explanation.append("")
@@ -521,14 +600,7 @@ class MathEngine:
     def sum_loop(self, body_cost, var, start, end):
         """
         Calculates the summation of body_cost from start to end.
+        Polynomial, harmonic and geometric bodies are summed in closed form
+        (SummationEngine); other terms are left as a SymPy Sum.
         """
-        # Ensure symbols are correct
-        # var is string, convert to symbol
-        k = symbols(var, integer=True)
-        
-        # body_cost might contain k
-        # If body_cost is Integer or constant, sum is count * body
-        
-        # We use SymPy Sum
-        s = Sum(body_cost, (k, start, end))
-        return s
\ No newline at end of file
+        return self.summation.sum_loop(body_cost, var, start, end)
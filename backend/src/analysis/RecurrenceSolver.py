@@ -0,0 +1,407 @@
+# src/analysis/RecurrenceSolver.py
+
+import os
+import copy
+import math
+import cmath
+import threading
+from fractions import Fraction
+from collections import OrderedDict
+
+from sympy import Add, Max, Integer, sqrt, log
+
+from .AsymptoticCost import AsymptoticCost
+
+# Formas conocidas del Teorema Maestro: (a, b, grado de f(n), potencia de log en f(n)) -> caso.
+# Con f(n) = n^log_b(a) * log^k n es el caso 2 extendido: Θ(n^log_b(a) * log^(k+1) n).
+KNOWN_MASTER = {
+    (1, 2, 0, 0): 2, # Búsqueda binaria
+    (2, 2, 1, 0): 2, # Merge sort
+    (2, 2, 0, 0): 1, # Recorrido de árbol binario
+    (3, 2, 1, 0): 1, # Karatsuba
+    (4, 2, 1, 0): 1,
+    (4, 2, 2, 0): 2,
+    (7, 2, 2, 0): 1, # Strassen
+    (8, 2, 2, 0): 1, # Multiplicación de matrices por bloques
+    (2, 2, 2, 0): 3,
+    (1, 2, 1, 0): 3, # Selección (mediana de medianas, promedio)
+    (2, 2, 1, 1): 2, # Θ(n log² n)
+    (3, 3, 1, 0): 2,
+    (9, 3, 2, 0): 2,
+    (2, 4, 0, 0): 1,
+    (4, 4, 1, 0): 2,
+}
+
+# Recurrencias lineales homogéneas conocidas: ((retraso, coeficiente), ...) -> resultado
+# (el mismo que da la ecuación característica). Es solo la parte homogénea:
+# f(n) se combina después (solve_linear), así T(n-1) + c no queda en Θ(1).
+KNOWN_LINEAR = {
+    ((1, 1),): {
+        "complexity": "Θ(1)",
+        "details": {"type": "characteristic_equation", "lags": [1], "roots": ["1"], "dominant_root": "1", "multiplicity": 1},
+    },
+    ((1, 2),): {
+        "complexity": "Θ(2^n)", # Hanoi
+        "details": {"type": "characteristic_equation", "lags": [1], "roots": ["2"], "dominant_root": "2", "multiplicity": 1},
+    },
+    ((1, 3),): {
+        "complexity": "Θ(3^n)",
+        "details": {"type": "characteristic_equation", "lags": [1], "roots": ["3"], "dominant_root": "3", "multiplicity": 1},
+    },
+    ((1, 1), (2, 1)): {
+        "complexity": "Θ(1.618^n)", # Fibonacci
+        "details": {"type": "characteristic_equation", "lags": [1, 2],
+                    "roots": ["1/2 - sqrt(5)/2", "1/2 + sqrt(5)/2"], "dominant_root": "1/2 + sqrt(5)/2", "multiplicity": 1},
+    },
+}
+
+class RecurrenceSolver:
+    """
+    Resuelve recurrencias a partir de una forma canónica hashable:
+
+    - ("master", a, b, f(n)) para T(n) = a T(n/b) + f(n). El caso solo depende
+      de (a, b) y de la clase de f(n) (grado y potencia de log, vía
+      AsymptoticCost), así que esa es la clave: no hace falta simplify ni
+      limit. Si f(n) no se puede clasificar se usa el cálculo exacto,
+      memoizado con f(n) completo.
+    - ("linear", ((retraso, coeficiente), ...), f(n)) para
+      T(n) = sum c_i T(n - i) + f(n). La parte homogénea sale de la ecuación
+      característica (raíz dominante r, multiplicidad m) y se combina con la
+      clase de f(n) = n^a log^b n k^n: si k < r domina la homogénea, si
+      k > r domina f(n) y si k = r queda Θ(n^m f(n)) (con r = 1: T(n-1) + n
+      es Θ(n^2)).
+
+    Las formas conocidas (KNOWN_MASTER, KNOWN_LINEAR) se responden sin
+    calcular nada; las demás se resuelven una vez con MathEngine y quedan en
+    una caché LRU compartida por todo el proceso. (LRU propia y no
+    MemoryCache: el paquete analysis se importa también por separado, como en
+    tests/test_master_theorem.py.)
+    """
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        with self._lock:
+            result = self._memo.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._memo.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def _put(self, key, result):
+        with self._lock:
+            self._memo[key] = result
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+
+    @staticmethod
+    def canonicalize(expr, n, T):
+        """
+        Forma canónica del costo total, o None si no encaja (varias reducciones
+        mezcladas, argumentos no lineales, coeficientes simbólicos).
+        """
+        # Rama recursiva de cada Max: el caso base no entra en la recurrencia
+        expr = expr.replace(lambda e: isinstance(e, Max) and e.has(T),
+                            lambda e: next(arg for arg in e.args if arg.has(T)))
+        t_terms, other_terms = [], []
+        for term in Add.make_args(expr.expand()):
+            (t_terms if term.has(T) else other_terms).append(term)
+        if not t_terms:
+            return None
+
+        ratios, lags = {}, {}
+        for term in t_terms:
+            coeff, call = term.as_coeff_Mul()
+            if not (isinstance(call, T) and coeff.is_Rational and coeff > 0):
+                return None
+            arg = call.args[0]
+            lag, ratio = n - arg, n / arg
+            if lag.is_Integer and lag > 0:
+                lags[int(lag)] = lags.get(int(lag), 0) + coeff
+            elif ratio.is_Rational and ratio > 1:
+                ratios[ratio] = ratios.get(ratio, 0) + coeff
+            else:
+                return None
+
+        if lags and not ratios:
+            return ("linear", tuple(sorted(lags.items())), Add(*other_terms))
+        if len(ratios) == 1 and not lags:
+            (b, a), = ratios.items()
+            return ("master", a, b, Add(*other_terms))
+        return None
+
+    def master_case(self, a, b, f_n, n):
+        """
+        (caso, log_b(a), k) de la forma canónica, o None si f(n) no se puede
+        clasificar. k es la potencia de log(n) de f(n) en el caso 2 (0 en los demás).
+        """
+        try:
+            f_class = AsymptoticCost.from_expr(f_n, n)
+        except ValueError:
+            return None
+        if f_class.is_zero():
+            key = ("master", a, b, None)
+        elif f_class.is_positive():
+            key = ("master", a, b, f_class.a, f_class.b, f_class.k)
+        else:
+            return None
+
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        log_val = log(a, b)
+        known = KNOWN_MASTER.get((a, b, f_class.a, f_class.b)) if f_class and f_class.k == 1 else None
+        case = known or self._classify(f_class, float(log_val))
+        log_power = _number(f_class.b) if case == 2 and f_class else 0
+        result = (case, log_val, log_power)
+        self._put(key, result)
+        return result
+
+    @staticmethod
+    def _classify(f_class, critical):
+        """Caso del Teorema Maestro comparando f(n) con n^log_b(a) (mismo criterio que el límite)."""
+        if not f_class:
+            return 1
+        if f_class.k != 1:
+            return 3 if float(f_class.k) > 1 else 1
+        if abs(float(f_class.a) - critical) > 1e-9:
+            return 1 if f_class.a < critical else 3
+        # Mismo grado: n^c log^k n con k >= 0 es el caso 2 extendido
+        return 2 if f_class.b >= 0 else 1
+
+    def solve_linear(self, lags, f_n, n, solver):
+        """
+        Resultado para T(n) = sum c_i T(n - i) + f(n). `solver` calcula la
+        parte homogénea (ecuación característica) si no está en KNOWN_LINEAR
+        ni en la caché. Si f(n) no se puede clasificar se devuelve solo la
+        parte homogénea.
+        """
+        try:
+            f_class = AsymptoticCost.from_expr(f_n, n)
+        except ValueError:
+            f_class = None
+        if f_class is None or not (f_class.is_zero() or f_class.is_positive()):
+            return _copy_result(self._homogeneous(lags, solver))
+
+        key = ("linear", lags, None if f_class.is_zero() else (f_class.a, f_class.b, f_class.k))
+        result = self._get(key)
+        if result is None:
+            result = _with_f(self._homogeneous(lags, solver), lags, f_class, n)
+            if not _is_approximate(result):
+                self._put(key, result)
+        return _copy_result(result)
+
+    def _homogeneous(self, lags, solver):
+        result = KNOWN_LINEAR.get(lags)
+        if result is None:
+            result = self._get(("linear", lags))
+        if result is None:
+            result = solver()
+            if not _is_approximate(result):
+                self._put(("linear", lags), result)
+        return result
+
+    def solve_exact(self, key, solver):
+        """Memoiza un cálculo exacto (p. ej. Teorema Maestro con f(n) no clasificable)."""
+        try:
+            hash(key)
+        except TypeError:
+            return solver()
+        result = self._get(key)
+        if result is None:
+            result = solver()
+            if not _is_approximate(result):
+                self._put(key, result)
+        return _copy_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._memo), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses}
+
+# Tolerancias de la parte numérica: agrupar raíces múltiples (el error de una raíz
+# de multiplicidad m es del orden de eps^(1/m)) y reconocer formas exactas
+_ROOT_CLUSTER_TOL = 1e-4
+_ROOT_MATCH_TOL = 1e-3 # Cercanía para probar una forma exacta (luego se verifica exactamente)
+_ROOT_SNAP_TOL = 1e-9
+_PHI = (1 + math.sqrt(5)) / 2
+
+def polynomial_roots(coefficients):
+    """
+    Raíces (complejas) del polinomio con coeficientes de mayor a menor grado.
+    Con NumPy son los valores propios de la matriz compañera (np.roots); sin
+    NumPy se usa el método de Aberth en Python puro (grados chicos: basta).
+    """
+    coefficients = [float(c) for c in coefficients]
+    while coefficients and coefficients[0] == 0:
+        coefficients.pop(0)
+    try:
+        import numpy as np
+    except ImportError:
+        return _aberth_roots(coefficients)
+    return [complex(r) for r in np.roots(coefficients)]
+
+def _aberth_roots(coefficients, max_iterations=500):
+    degree = len(coefficients) - 1
+    if degree < 1:
+        return []
+    monic = [c / coefficients[0] for c in coefficients]
+    derivative = [c * (degree - i) for i, c in enumerate(monic[:-1])]
+
+    def horner(poly, z):
+        value = 0j
+        for c in poly:
+            value = value * z + c
+        return value
+
+    # Aproximaciones iniciales en un círculo que contiene a todas las raíces (cota de Cauchy)
+    radius = 1 + max(abs(c) for c in monic[1:])
+    roots = [radius * cmath.exp(1j * (2 * math.pi * k / degree + 0.4)) for k in range(degree)]
+    for _ in range(max_iterations):
+        largest_step = 0.0
+        for i, z in enumerate(roots):
+            value = horner(monic, z)
+            if value == 0:
+                continue
+            ratio = value / horner(derivative, z)
+            repulsion = sum(1 / (z - w) for j, w in enumerate(roots) if j != i and z != w)
+            step = ratio / (1 - ratio * repulsion)
+            roots[i] = z - step
+            largest_step = max(largest_step, abs(step) / (1 + abs(z)))
+        if largest_step < 1e-15:
+            break
+    return roots
+
+def dominant_root(coefficients):
+    """
+    Raíz dominante del polinomio característico: (raíz, multiplicidad, raíces,
+    (forma exacta o None, etiqueta)). La dominante es la de mayor módulo; ante
+    empate de módulo (p. ej. ±1) se prefiere la real positiva, que es la que
+    da el crecimiento.
+
+    Si la raíz está cerca de un entero, de φ o de la raíz cuadrada de un
+    entero, se comprueba con aritmética exacta (división de polinomios) y de
+    ahí sale también la multiplicidad exacta.
+    """
+    found = polynomial_roots(coefficients)
+    if not found:
+        return None, 0, found, (None, "1")
+    largest = max(abs(r) for r in found)
+    tolerance = _ROOT_CLUSTER_TOL * max(1.0, largest)
+    tied = [r for r in found if abs(abs(r) - largest) <= tolerance]
+    positive = [r for r in tied if abs(r.imag) <= tolerance and r.real > 0]
+    root = max(positive, key=lambda r: r.real) if positive else max(tied, key=lambda r: (r.real, r.imag))
+
+    # Una raíz múltiple sale como un racimo de aproximaciones: su promedio es mucho más preciso
+    cluster = [r for r in found if abs(r - root) <= tolerance] or [root]
+    root = sum(cluster) / len(cluster)
+    if positive:
+        root = complex(root.real, 0.0)
+        exact = _snap_root(coefficients, root.real)
+        if exact is not None:
+            value, multiplicity, expr, label = exact
+            return complex(value, 0.0), multiplicity, found, (expr, label)
+    label = f"{abs(root):.3f}" if abs(root.imag) > _ROOT_SNAP_TOL else f"{root.real:.3f}"
+    return root, len(cluster), found, (None, label)
+
+def _snap_root(coefficients, value):
+    """(valor, multiplicidad, expresión, etiqueta) si `value` es una raíz exacta reconocible."""
+    poly = [_fraction(c) for c in coefficients]
+    candidates = []
+    nearest = round(value)
+    # (polinomio mínimo, valor, forma exacta, etiqueta)
+    candidates.append(((Fraction(1), Fraction(-nearest)), float(nearest), lambda: Integer(nearest), str(nearest)))
+    candidates.append(((Fraction(1), Fraction(-1), Fraction(-1)), _PHI, lambda: (1 + sqrt(5)) / 2, "1.618"))
+    square = round(value * value)
+    if value > 0 and math.isqrt(square) ** 2 != square:
+        candidates.append(((Fraction(1), Fraction(0), Fraction(-square)), math.sqrt(square), lambda: sqrt(square),
+                           f"√{square}"))
+
+    for divisor, exact_value, expr, label in candidates:
+        if abs(exact_value - value) > _ROOT_MATCH_TOL * max(1.0, abs(value)):
+            continue
+        multiplicity = _division_count(poly, divisor)
+        if multiplicity:
+            return exact_value, multiplicity, expr(), label
+    return None
+
+def _fraction(value):
+    if hasattr(value, "p") and hasattr(value, "q"): # Rational de SymPy
+        return Fraction(int(value.p), int(value.q))
+    return Fraction(value)
+
+def _division_count(poly, divisor):
+    """Veces que el polinomio mónico `divisor` divide exactamente a `poly` (coeficientes Fraction)."""
+    count = 0
+    while len(poly) >= len(divisor):
+        quotient = list(poly)
+        for i in range(len(poly) - len(divisor) + 1):
+            factor = quotient[i]
+            if factor:
+                for j in range(1, len(divisor)):
+                    quotient[i + j] -= factor * divisor[j]
+        remainder = quotient[len(poly) - len(divisor) + 1:]
+        if any(remainder):
+            break
+        poly = quotient[:len(poly) - len(divisor) + 1]
+        count += 1
+    return count
+
+def format_root(value):
+    """Raíz numérica como texto para la explicación."""
+    if abs(value.imag) <= _ROOT_SNAP_TOL:
+        return f"{value.real:.6g}"
+    return f"{value.real:.4g}{value.imag:+.4g}i"
+
+def _with_f(homogeneous, lags, f_class, n):
+    """Combina la solución homogénea con la clase de f(n) comparando k (de k^n) con la raíz dominante."""
+    details = homogeneous.get("details") if isinstance(homogeneous, dict) else None
+    if f_class.is_zero() or not details:
+        return homogeneous
+    coeffs = dict(lags)
+    root, multiplicity, _, _ = dominant_root([1] + [-coeffs.get(lag, 0) for lag in range(1, max(coeffs) + 1)])
+    if root is None:
+        return homogeneous
+    r, k = abs(root), float(f_class.k)
+    if k < r - _ROOT_CLUSTER_TOL * max(1.0, r):
+        return homogeneous # Domina la parte homogénea (p. ej. Hanoi: 2T(n-1) + 1)
+
+    f_dominant = AsymptoticCost(1, f_class.a, f_class.b, f_class.k).as_expr(n)
+    if k > r + _ROOT_CLUSTER_TOL * max(1.0, r):
+        complexity, dominated_by = f_dominant, "f_n"
+    else:
+        # Misma base: cada una de las n capas aporta f(n) (n^m con raíz de multiplicidad m)
+        complexity, dominated_by = n**multiplicity * f_dominant, "both"
+    return {"complexity": complexity,
+            "details": {**details, "f_n": str(f_dominant), "dominated_by": dominated_by}}
+
+def _number(fraction):
+    return int(fraction) if fraction.denominator == 1 else fraction
+
+def _copy_result(result):
+    # Quien llama puede modificar el dict de detalles; las expresiones de SymPy son inmutables
+    if not isinstance(result, dict):
+        return result
+    return {**result, "details": copy.deepcopy(result.get("details"))}
+
+def _is_approximate(result):
+    # Resultados degradados por el presupuesto simbólico: no se memoizan
+    return isinstance(result, dict) and bool((result.get("details") or {}).get("approximate"))
+
+_recurrence_solver = None
+_recurrence_solver_lock = threading.Lock()
+
+def get_recurrence_solver():
+    """Solver compartido del proceso (RECURRENCE_CACHE_SIZE recurrencias resueltas)."""
+    global _recurrence_solver
+    if _recurrence_solver is None:
+        with _recurrence_solver_lock:
+            if _recurrence_solver is None:
+                _recurrence_solver = RecurrenceSolver(max_entries=int(os.getenv("RECURRENCE_CACHE_SIZE", "1024")))
+    return _recurrence_solver
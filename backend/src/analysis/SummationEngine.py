@@ -0,0 +1,148 @@
+# src/analysis/SummationEngine.py
+
+import threading
+from fractions import Fraction
+from math import comb
+
+from sympy import Sum, Add, Mul, Pow, Integer, Rational, exp, expand, harmonic, symbols
+
+# Grado hasta el que se precalculan los coeficientes de Faulhaber al importar
+# (los cuerpos de ciclo rara vez pasan de k^3; grados mayores se calculan a demanda)
+_PRECOMPUTED_DEGREE = 16
+
+def _bernoulli_plus(count):
+    """Números de Bernoulli B_0..B_{count-1} con la convención B_1 = +1/2."""
+    numbers = []
+    for m in range(count):
+        value = Fraction(1) - sum(Fraction(comb(m, j), m - j + 1) * numbers[j] for j in range(m))
+        numbers.append(value)
+    return numbers
+
+def _faulhaber_row(p, bernoulli):
+    """Coeficientes c_0..c_{p+1} de sum_{k=1}^{m} k^p = sum c_i m^i (fórmula de Faulhaber)."""
+    row = [Fraction(0)] * (p + 2)
+    for j in range(p + 1):
+        row[p + 1 - j] = Fraction(comb(p + 1, j)) * bernoulli[j] / (p + 1)
+    return tuple(row)
+
+_BERNOULLI = _bernoulli_plus(_PRECOMPUTED_DEGREE + 1)
+_FAULHABER = [_faulhaber_row(p, _BERNOULLI) for p in range(_PRECOMPUTED_DEGREE + 1)]
+_table_lock = threading.Lock()
+
+class SummationEngine:
+    """
+    Sumatorias en forma cerrada para los ciclos `for`.
+
+    El cuerpo se expande en términos y cada término se separa en una parte
+    constante respecto a la variable del ciclo (números, n, log(n), T(n/2)...)
+    y una parte c * k^p * r^k:
+
+    - k^p con p >= 0: fórmula de Faulhaber con coeficientes precalculados.
+    - k^-1: números armónicos, H(fin) - H(inicio - 1).
+    - k^p * r^k (r constante distinta de 1): r^k * P(k) con P polinomio de
+      grado p, que se obtiene resolviendo un sistema triangular.
+
+    Los términos que no encajan (log(k), T(k), Max con k, techos/pisos...) se
+    dejan como Sum de SymPy sin evaluar, igual que antes. Los límites se
+    manejan con la convención de Karr de SymPy: sum_{a}^{b} = F(b+1) - F(a).
+    """
+    def __init__(self):
+        self.closed_terms = 0 # Términos resueltos en forma cerrada
+        self.fallback_terms = 0 # Términos que quedaron como Sum
+
+    def sum_loop(self, body_cost, var, start, end):
+        """sum_{var=start}^{end} body_cost, en forma cerrada si es posible."""
+        k = symbols(var, integer=True)
+        # CostCalculator crea las variables sin supuestos (Symbol("i")): se
+        # unifican con la variable entera del ciclo para que la suma las vea
+        body_cost = self._unify(body_cost, var, k)
+        start, end = self._unify(start, var, k), self._unify(end, var, k)
+
+        total = Integer(0)
+        for term in Add.make_args(expand(body_cost)):
+            total += self._sum_term(term, k, start, end)
+        return total
+
+    @staticmethod
+    def _unify(expr, var, k):
+        if not hasattr(expr, "free_symbols"):
+            return expr
+        aliases = {s: k for s in expr.free_symbols if s.name == var and s != k}
+        return expr.xreplace(aliases) if aliases else expr
+
+    def _sum_term(self, term, k, start, end):
+        if not term.has(k):
+            self.closed_terms += 1
+            return term * (end - start + 1)
+
+        coeff, rest = term.as_independent(k, as_Add=False)
+        shape = self._split(rest, k)
+        if shape is not None:
+            power, ratio, scale = shape
+            closed = None
+            if ratio == 1 and power >= 0:
+                closed = self.power_sum(power, end) - self.power_sum(power, start - 1)
+            elif ratio == 1 and power == -1:
+                closed = harmonic(end) - harmonic(start - 1)
+            elif ratio != 1 and power >= 0:
+                closed = self.geometric_sum(power, ratio, start, end)
+            if closed is not None:
+                self.closed_terms += 1
+                return expand(coeff * scale * closed)
+
+        self.fallback_terms += 1
+        return Sum(term, (k, start, end))
+
+    @staticmethod
+    def _split(expr, k):
+        """expr = scale * k^power * ratio^k. Devuelve (power, ratio, scale) o None."""
+        power, ratio, scale = 0, Integer(1), Integer(1)
+        for factor in Mul.make_args(expr):
+            if factor == k:
+                power += 1
+            elif isinstance(factor, Pow) and factor.base == k and factor.exp.is_Integer:
+                power += int(factor.exp)
+            elif isinstance(factor, (Pow, exp)):
+                base, exponent = factor.as_base_exp()
+                if base.has(k):
+                    return None
+                # Exponente lineal en k: base^(a*k + b) = base^b * (base^a)^k
+                a, b = exponent.as_independent(k, as_Add=True)[::-1]
+                slope = (a / k) if a.has(k) else None
+                if slope is None or slope.has(k):
+                    return None
+                ratio *= base ** slope
+                scale *= base ** b
+            else:
+                return None
+        return power, ratio, scale
+
+    @staticmethod
+    def faulhaber(p):
+        """Coeficientes (Fraction) de sum_{k=1}^{m} k^p como polinomio en m, de m^0 a m^(p+1)."""
+        if p >= len(_FAULHABER):
+            with _table_lock:
+                # Fuera de la tabla: se amplía (los Bernoulli anteriores no cambian)
+                if p >= len(_BERNOULLI):
+                    _BERNOULLI[:] = _bernoulli_plus(2 * p + 1)
+                while p >= len(_FAULHABER):
+                    _FAULHABER.append(_faulhaber_row(len(_FAULHABER), _BERNOULLI))
+        return _FAULHABER[p]
+
+    def power_sum(self, p, m):
+        """sum_{k=1}^{m} k^p (m puede ser simbólico)."""
+        return Add(*[Rational(c.numerator, c.denominator) * m ** i
+                     for i, c in enumerate(self.faulhaber(p)) if c])
+
+    @staticmethod
+    def geometric_sum(p, r, start, end):
+        """sum_{k=start}^{end} k^p r^k para r != 1, como F(end + 1) - F(start) con F(k) = r^k P(k)."""
+        # r P(k+1) - P(k) = k^p, coeficiente a coeficiente desde el grado mayor
+        c = [Integer(0)] * (p + 1)
+        for j in range(p, -1, -1):
+            carry = sum((comb(i, j) * c[i] for i in range(j + 1, p + 1)), Integer(0))
+            c[j] = ((1 if j == p else 0) - r * carry) / (r - 1)
+
+        def F(x):
+            return r ** x * Add(*[c[j] * x ** j for j in range(p + 1)])
+        return F(end + 1) - F(start)
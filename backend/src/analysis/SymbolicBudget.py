@@ -0,0 +1,132 @@
+# src/analysis/SymbolicBudget.py
+
+import ctypes
+import heapq
+import itertools
+import os
+import threading
+import time
+
+# Segundos de SymPy por análisis (simplify, limit, roots, doit, O). 0 = sin límite.
+SYMBOLIC_BUDGET = float(os.getenv("SYMBOLIC_BUDGET", "5"))
+
+class SymbolicTimeout(BaseException):
+    """
+    Se inyecta en el hilo del análisis cuando una operación agota el
+    presupuesto. Hereda de BaseException para que los `except Exception`
+    de SymPy (y los del propio MathEngine) no la atrapen a mitad de camino.
+    """
+
+def _raise_in_thread(thread_id, exc):
+    """Programa `exc` en el hilo `thread_id` (None cancela una pendiente)."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id),
+                                               ctypes.py_object(exc) if exc is not None else None)
+
+class _Watchdog:
+    """
+    Hilo único que vigila los plazos de las operaciones en curso de todos los
+    análisis. Al vencer uno lanza SymbolicTimeout de forma asíncrona en el hilo
+    que la ejecuta: SymPy es Python puro, así que la excepción llega entre dos
+    instrucciones y desenrolla la operación sin matar al worker.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = [] # (plazo, guardia); las guardias desarmadas se descartan al llegar arriba
+        self._active = {} # guardia -> id del hilo
+        self._ids = itertools.count()
+        self._thread = None
+        self.fired = 0
+
+    def arm(self, deadline):
+        with self._cond:
+            guard = next(self._ids)
+            self._active[guard] = threading.get_ident()
+            heapq.heappush(self._heap, (deadline, guard))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="symbolic-watchdog", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return guard
+
+    def disarm(self, guard):
+        """True si la guardia seguía activa; False si ya se disparó."""
+        with self._cond:
+            return self._active.pop(guard, None) is not None
+
+    def _run(self):
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][1] not in self._active:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, guard = self._heap[0]
+                wait = deadline - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+                self.fired += 1
+                _raise_in_thread(self._active.pop(guard), SymbolicTimeout)
+
+_watchdog = _Watchdog()
+
+class SymbolicBudget:
+    """
+    Presupuesto de tiempo para las operaciones simbólicas de un análisis.
+
+    `start()` fija el plazo (lo llama CostCalculator al empezar cada
+    algoritmo) y `run(label, fn, fallback)` ejecuta `fn` con lo que queda.
+    Si el plazo vence durante `fn`, el watchdog la interrumpe y se devuelve
+    `fallback()`, un resultado aproximado y barato (la expresión sin
+    simplificar, el término dominante, las raíces numéricas...). Una vez
+    vencido, las operaciones siguientes van directo al respaldo, así que la
+    latencia del análisis queda acotada por el presupuesto más el costo de
+    los respaldos. `degraded` lista las operaciones aproximadas para marcar
+    el resultado.
+
+    Sin `start()` no hay límite (MathEngine usado por separado, tests).
+    """
+    def __init__(self, seconds=None):
+        self.seconds = SYMBOLIC_BUDGET if seconds is None else seconds
+        self.degraded = []
+        self._deadline = None
+
+    def start(self):
+        self.degraded = []
+        self._deadline = time.monotonic() + self.seconds if self.seconds > 0 else None
+
+    @property
+    def approximate(self):
+        return bool(self.degraded)
+
+    def remaining(self):
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def run(self, label, fn, fallback):
+        if self._deadline is None:
+            return fn()
+        if time.monotonic() >= self._deadline:
+            return self._degrade(label, fallback)
+
+        guard = _watchdog.arm(self._deadline)
+        try:
+            try:
+                return fn()
+            finally:
+                if not _watchdog.disarm(guard):
+                    # Disparada justo al terminar: se cancela la excepción pendiente
+                    _raise_in_thread(threading.get_ident(), None)
+        except SymbolicTimeout:
+            return self._degrade(label, fallback)
+
+    def _degrade(self, label, fallback):
+        print(f"DEBUG: Presupuesto simbólico agotado en {label}: resultado aproximado")
+        self.degraded.append(label)
+        return fallback()
+
+def watchdog_stats():
+    return {"budget_seconds": SYMBOLIC_BUDGET, "timeouts": _watchdog.fired}
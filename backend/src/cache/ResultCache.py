@@ -0,0 +1,82 @@
+# src/cache/ResultCache.py
+
+import os
+import copy
+import hashlib
+import threading
+
+from .MemoryCache import MemoryCache
+from .SQLiteCache import SQLiteCache
+
+def normalize_source(code):
+    """
+    Normaliza el pseudocódigo para la clave de caché: saltos de línea,
+    espacios al final de cada línea y líneas vacías finales. No se tocan las
+    líneas iniciales para no alterar los números de línea del análisis.
+    """
+    lines = (code or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    lines = [line.rstrip() for line in lines]
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines)
+
+class ResultCache:
+    """
+    Caché de análisis completos (analysis_summary) en dos niveles: memoria
+    (LRU/TTL) y, opcionalmente, SQLite en disco para sobrevivir reinicios.
+    """
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    @staticmethod
+    def make_key(code, translate_mode, version):
+        """Hash del código normalizado + modo de traducción + versión de prompts/modelo."""
+        raw = f"{version}\0{int(bool(translate_mode))}\0{normalize_source(code)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        summary = self.memory.get(key)
+        if summary is None and self.disk is not None:
+            summary = self.disk.get(key)
+            if summary is not None:
+                self.memory.put(key, summary)
+        # Copia: quien reciba el resultado puede modificarlo sin tocar la caché
+        return copy.deepcopy(summary) if summary is not None else None
+
+    def put(self, key, summary):
+        summary = copy.deepcopy(summary)
+        self.memory.put(key, summary)
+        if self.disk is not None:
+            self.disk.put(key, summary)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """
+    Caché compartida del proceso. Se configura con RESULT_CACHE_SIZE,
+    RESULT_CACHE_TTL (segundos, 0 = sin expiración) y RESULT_CACHE_DB (ruta
+    del archivo SQLite; vacío = solo memoria).
+    """
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                ttl = float(os.getenv("RESULT_CACHE_TTL", "86400")) or None
+                memory = MemoryCache(max_entries=int(os.getenv("RESULT_CACHE_SIZE", "512")), ttl=ttl)
+                db_path = os.getenv("RESULT_CACHE_DB", "")
+                disk = SQLiteCache(db_path, table="analysis_results", ttl=ttl) if db_path else None
+                _result_cache = ResultCache(memory, disk)
+    return _result_cache
@@ -0,0 +1,179 @@
+# src/execution/AnalysisExecutor.py
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class QueueFullError(Exception):
+    """Se lanza cuando ya hay demasiados análisis en curso o en espera."""
+    def __init__(self, retry_after):
+        super().__init__(f"Cola de análisis llena. Reintentar en {retry_after}s.")
+        self.retry_after = retry_after
+
+class _AdmittedStream:
+    """
+    Generador async de `AnalysisExecutor.stream` que ya ocupa un cupo. Si se
+    cierra (o se descarta) antes de pedir el primer elemento, el `finally` del
+    generador nunca corre: en ese caso el cupo se libera aquí.
+    """
+    def __init__(self, executor, call):
+        self._executor = executor
+        self._state = {"started": False}
+        self._events = executor._iter_stream(call, self._state)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self._events.__anext__()
+
+    async def aclose(self):
+        self._release_unstarted()
+        await self._events.aclose()
+
+    def _release_unstarted(self):
+        if not self._state["started"]:
+            self._state["started"] = True # Una sola vez
+            self._executor._release()
+
+    def __del__(self):
+        self._release_unstarted()
+
+class AnalysisExecutor:
+    """
+    Ejecuta análisis (parsing + SymPy + LLM) fuera del event loop, en un pool
+    acotado de hilos. Como máximo `max_concurrent` análisis corren a la vez y
+    `max_queued` esperan turno; por encima de eso se rechaza con QueueFullError
+    para que la API responda 429 en lugar de acumular trabajo.
+    """
+    def __init__(self, max_concurrent=4, max_queued=16, initializer=None):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        # `initializer` corre una vez en cada hilo nuevo (ej. preparar el parser)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="analysis",
+                                            initializer=initializer)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._avg_duration = None # Media móvil (segundos) para estimar Retry-After
+
+    def _retry_after(self):
+        avg = self._avg_duration or 1.0
+        waves = max(1, self._in_flight - self.max_concurrent + 1) / self.max_concurrent
+        return max(1, math.ceil(avg * waves))
+
+    def _record_duration(self, elapsed):
+        with self._lock:
+            if self._avg_duration is None:
+                self._avg_duration = elapsed
+            else:
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
+
+    def _run_timed(self, fn):
+        start = time.monotonic()
+        try:
+            return fn()
+        finally:
+            self._record_duration(time.monotonic() - start)
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight >= self.max_concurrent + self.max_queued:
+                self._rejected += 1
+                raise QueueFullError(self._retry_after())
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def submit(self, fn, *args, **kwargs):
+        """Encola `fn(*args, **kwargs)` y espera su resultado sin bloquear el event loop."""
+        self._admit()
+        try:
+            future = self._executor.submit(self._run_timed, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # El cupo se libera cuando el hilo termina, no cuando se deja de esperar:
+        # si el cliente se desconecta el análisis sigue ocupando el pool
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stream(self, fn, *args, **kwargs):
+        """
+        Variante de submit para generadores: `fn(*args, **kwargs)` se recorre
+        en el pool y cada elemento se entrega (async) en cuanto se produce.
+
+        La admisión se decide al llamar, así que QueueFullError se lanza antes
+        de empezar a responder. El cupo se devuelve al terminar, al cerrar el
+        stream (aclose) o al descartarlo sin haberlo recorrido.
+        """
+        self._admit()
+        return _AdmittedStream(self, functools.partial(fn, *args, **kwargs))
+
+    async def _iter_stream(self, call, state):
+        # Sin await antes del try: una vez arrancado, el finally libera el cupo
+        state["started"] = True
+        done = object()
+        start = time.monotonic()
+        holder = {} # "iterator" una vez creado en el pool
+        step = None # Último trabajo enviado al pool (crear el iterador o un next)
+
+        def create():
+            holder["iterator"] = iter(call())
+
+        try:
+            step = self._executor.submit(create)
+            await asyncio.wrap_future(step)
+            while True:
+                step = self._executor.submit(next, holder["iterator"], done)
+                item = await asyncio.wrap_future(step)
+                if item is done:
+                    holder.pop("iterator") # Agotado: no hay nada que cerrar
+                    break
+                yield item
+        finally:
+            self._finish_stream(step, holder, start)
+
+    def _finish_stream(self, step, holder, start):
+        """
+        Cierra el generador del pipeline (si el cliente se desconectó, GeneratorExit
+        detiene sus etapas LLM pendientes) y libera el cupo. Se hace en el pool y
+        después del último paso: un next() en curso no se puede interrumpir y el
+        generador no admite close() mientras se ejecuta.
+        """
+        def close():
+            try:
+                iterator = holder.get("iterator")
+                if hasattr(iterator, "close"):
+                    iterator.close()
+            finally:
+                self._release()
+                self._record_duration(time.monotonic() - start)
+
+        def schedule(_=None):
+            try:
+                self._executor.submit(close)
+            except RuntimeError: # Pool cerrado (apagado del servidor)
+                close()
+
+        if "iterator" not in holder and (step is None or step.done()):
+            close() # Terminó normalmente (o nunca arrancó): nada que esperar
+        elif not step.done():
+            step.add_done_callback(schedule)
+        else:
+            schedule()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "rejected": self._rejected,
+                "avg_duration": self._avg_duration,
+            }
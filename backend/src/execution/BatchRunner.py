@@ -0,0 +1,199 @@
+# src/execution/BatchRunner.py
+
+import os
+import sys
+import glob
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from ..main import analyze_static, complete_llm_stages, result_cache_key, _is_cacheable
+from ..cache.ResultCache import get_result_cache
+from ..llm_integration.StageScheduler import StageScheduler
+from ..parsing.ParseDriver import warm_up
+
+def load_sources(target, pattern="*.txt"):
+    """
+    Devuelve una lista de (id, código) a partir de:
+    - un archivo .jsonl con un objeto {"id": ..., "code": ...} por línea,
+    - un directorio (se recorre recursivamente buscando `pattern`),
+    - o un patrón glob (ej. "entregas/**/*.txt").
+    Los ids de archivos son rutas relativas al directorio (o la ruta tal cual).
+    """
+    if os.path.isfile(target) and target.endswith(".jsonl"):
+        items = []
+        with open(target, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                items.append((str(record.get("id", number)), record["code"]))
+        return items
+
+    if os.path.isdir(target):
+        paths = glob.glob(os.path.join(target, "**", pattern), recursive=True)
+        base = target
+    else:
+        paths = glob.glob(target, recursive=True)
+        base = None
+
+    items = []
+    for path in sorted(p for p in paths if os.path.isfile(p)):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            items.append((os.path.relpath(path, base) if base else path, f.read()))
+    return items
+
+def _init_worker():
+    # Los workers no imprimen el log del pipeline (miles de análisis por lote)
+    sys.stdout = open(os.devnull, "w")
+    # Proceso nuevo (spawn): el caché DFA de ANTLR empieza vacío
+    warm_up()
+
+def _static_worker(code):
+    return analyze_static(code)
+
+class BatchRunner:
+    """
+    Analiza lotes de pseudocódigo (ej. todas las entregas de una tarea):
+
+    - Fuentes idénticas (tras normalizar) se analizan una sola vez.
+    - La parte estática (ANTLR + SymPy) corre en un pool de procesos.
+    - Las etapas LLM corren en un pool de hilos acotado (`llm_concurrency`
+      análisis a la vez) y pasan por el RateLimiter del LLMClient.
+    - Los resultados se entregan por elemento, en orden de finalización.
+
+    El código con errores de sintaxis no se auto-repara: se informa
+    `syntax_errors` en el resultado, que es lo que interesa al calificar.
+    """
+    def __init__(self, workers=None, llm_concurrency=4, use_llm=True, llm_client=None, result_cache=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.llm_concurrency = llm_concurrency
+        self.use_llm = use_llm
+        self.llm_client = llm_client
+        self.result_cache = result_cache
+        self._lock = threading.Lock()
+        self._process_pool = None
+        self._llm_pool = None
+        self._scheduler = None
+
+    def _pools(self):
+        with self._lock:
+            if self._process_pool is None:
+                # spawn: los workers no heredan hilos ni locks del servidor
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            if self._llm_pool is None:
+                self._llm_pool = ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="batch-llm")
+                # Scheduler propio: el lote no ocupa los hilos de las peticiones interactivas
+                self._scheduler = StageScheduler(max_workers=self.llm_concurrency * 4)
+            return self._process_pool, self._llm_pool
+
+    def _discard_process_pool(self, pool):
+        """Un worker murió (OOM, segfault): el pool queda roto y el próximo lote crea otro."""
+        with self._lock:
+            if self._process_pool is pool:
+                self._process_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _cache(self, use_llm):
+        if not use_llm:
+            return None # Los resultados solo-estáticos no se cachean ni se leen
+        return self.result_cache if self.result_cache is not None else get_result_cache()
+
+    def run(self, items, use_llm=None):
+        """
+        Generador: por cada (id, código) entrega un registro
+        {"id", "key", "cached", "result"} en cuanto su análisis termina.
+        `use_llm` permite desactivar las etapas LLM solo para este lote.
+        """
+        use_llm = self.use_llm if use_llm is None else use_llm
+        groups = {}
+        sources = {}
+        for item_id, code in items:
+            # Misma clave que /analyze en modo completo (incluye COST_DOMAIN)
+            key = result_cache_key(code, False, "full")
+            groups.setdefault(key, []).append(item_id)
+            sources.setdefault(key, code)
+
+        cache = self._cache(use_llm)
+        pending_keys = []
+        for key in groups:
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                yield from self._records(key, groups[key], cached, cached=True)
+            else:
+                pending_keys.append(key)
+
+        if not pending_keys:
+            return
+
+        process_pool, llm_pool = self._pools()
+        try:
+            futures = {process_pool.submit(_static_worker, sources[key]): ("static", key) for key in pending_keys}
+        except BrokenProcessPool:
+            # Roto desde un lote anterior (p. ej. en medio de otro lote): se reemplaza
+            self._discard_process_pool(process_pool)
+            process_pool, llm_pool = self._pools()
+            futures = {process_pool.submit(_static_worker, sources[key]): ("static", key) for key in pending_keys}
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key = futures.pop(future)
+                    try:
+                        summary = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            self._discard_process_pool(process_pool)
+                        summary = {"algorithm_name": "Desconocido", "error": f"{type(e).__name__}: {e}"}
+                        yield from self._records(key, groups[key], summary)
+                        continue
+
+                    if stage == "static" and use_llm:
+                        llm_future = llm_pool.submit(
+                            complete_llm_stages, sources[key], summary, self.llm_client, self._scheduler)
+                        futures[llm_future] = ("llm", key)
+                        continue
+
+                    if cache is not None and _is_cacheable(summary) and not summary.get("syntax_errors"):
+                        cache.put(result_cache_key(sources[key], False, "full", model=summary.get("llm_model")), summary)
+                    yield from self._records(key, groups[key], summary)
+        finally:
+            # Lote abandonado (cliente desconectado): lo que aún no empezó no
+            # gasta CPU ni tokens del LLM
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _records(key, item_ids, summary, cached=False):
+        for item_id in item_ids:
+            yield {"id": item_id, "key": key, "cached": cached, "result": summary}
+
+    def close(self):
+        with self._lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+            if self._llm_pool is not None:
+                self._llm_pool.shutdown()
+            self._process_pool = self._llm_pool = self._scheduler = None
+
+_batch_runner = None
+_batch_runner_lock = threading.Lock()
+
+def get_batch_runner():
+    """Runner compartido de la API (BATCH_WORKERS procesos, BATCH_LLM_CONCURRENCY análisis LLM a la vez)."""
+    global _batch_runner
+    if _batch_runner is None:
+        with _batch_runner_lock:
+            if _batch_runner is None:
+                workers = int(os.getenv("BATCH_WORKERS", "0")) or None
+                _batch_runner = BatchRunner(
+                    workers=workers,
+                    llm_concurrency=int(os.getenv("BATCH_LLM_CONCURRENCY", "4")),
+                )
+    return _batch_runner
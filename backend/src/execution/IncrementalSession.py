@@ -0,0 +1,200 @@
+# src/execution/IncrementalSession.py
+
+import os
+import time
+import uuid
+import threading
+
+from ..main import _default_summary, _run_cost_calculator
+from ..cache.MemoryCache import MemoryCache
+from ..parsing import AstNodes as ast
+from ..parsing.ParseDriver import ParseResult, tokenize, parse_tokens, parse_statement
+
+_STATEMENT_NODES = (ast.For, ast.While, ast.Repeat, ast.If, ast.Call, ast.Return, ast.Assign)
+
+# Entradas de las tablas de cada sesión (LRU): costos por sentencia y pasos de MathEngine
+_STATEMENT_TABLE_SIZE = 2048
+_MATH_MEMO_SIZE = 128
+
+def _copy(node, **changes):
+    """Copia superficial de un nodo del AST con algunos campos cambiados (los nodos no se mutan)."""
+    new = object.__new__(type(node))
+    for name in ast.Node.__slots__ + tuple(node.fields()):
+        setattr(new, name, changes[name] if name in changes else getattr(node, name))
+    return new
+
+def _children(node):
+    for name in node.fields():
+        value = getattr(node, name)
+        if isinstance(value, ast.Node):
+            yield value
+        elif isinstance(value, tuple):
+            for item in value:
+                if isinstance(item, ast.Node):
+                    yield item
+
+def _shift(node, delta, lines):
+    """Copia un subárbol posterior a la edición, desplazando sus índices de token."""
+    if isinstance(node, tuple):
+        return tuple(_shift(item, delta, lines) for item in node)
+    if not isinstance(node, ast.Node):
+        return node
+    changes = {name: _shift(getattr(node, name), delta, lines) for name in node.fields()}
+    if node.token is not None:
+        changes["token"] = node.token + delta
+        changes["line"] = lines[node.token + delta]
+    if node.stop is not None:
+        changes["stop"] = node.stop + delta
+    return _copy(node, **changes)
+
+class IncrementalSession:
+    """
+    Sesión de análisis para retroalimentación mientras se escribe (editor,
+    GUI). Conserva el token stream, el AST y la tabla de costos por sentencia
+    del análisis anterior. En cada `update`:
+
+    1. Se re-tokeniza la fuente (lineal y barato) y se compara con los tokens
+       anteriores para ubicar la región editada.
+    2. Se re-parsea solo la sentencia más interna que contiene la edición
+       (parse_statement) y se injerta en el AST: lo anterior a la edición se
+       reutiliza tal cual, lo posterior se copia con los índices desplazados y
+       solo se reconstruyen los ancestros. Si la edición no cabe en una
+       sentencia (cabecera, sentencias nuevas al nivel superior, errores de
+       sintaxis) se parsea todo, pasando por la ParseCache.
+    3. IncrementalCostCalculator recalcula solo la sentencia editada y sus
+       ancestros; el resto reproduce su costo de la tabla.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts = None # Texto de cada token del análisis anterior (incluye EOF)
+        self._ast = None
+        self._syntax_errors = 0
+        self._parse_mode = None
+        self._statements = MemoryCache(max_entries=_STATEMENT_TABLE_SIZE) # Costos por sentencia
+        self._math_memo = MemoryCache(max_entries=_MATH_MEMO_SIZE)
+        self.updates = 0
+
+    def update(self, source):
+        """Analiza `source` reutilizando lo posible del análisis anterior. Devuelve el analysis_summary."""
+        with self._lock:
+            start = time.perf_counter()
+            stream = tokenize(source)
+            texts = [token.text for token in stream.tokens]
+            lines = tuple(token.line for token in stream.tokens)
+
+            program, reparse = None, "full"
+            if self._ast is not None and not self._syntax_errors:
+                if texts == self._texts:
+                    program, reparse = self._ast, "none"
+                else:
+                    program = self._splice(stream, texts, lines)
+                    reparse = "statement" if program is not None else "full"
+
+            if program is None:
+                parsed = parse_tokens(stream)
+                program, syntax_errors, parse_mode = parsed.ast, parsed.syntax_errors, parsed.mode
+            else:
+                syntax_errors, parse_mode = 0, self._parse_mode
+            parse_ms = (time.perf_counter() - start) * 1000
+
+            parsed = ParseResult(None, syntax_errors, parse_mode, parse_ms / 1000, lines, ast=program)
+            from ..analysis.IncrementalCostCalculator import IncrementalCostCalculator # SymPy al primer uso
+            calculator = IncrementalCostCalculator(texts, lines, self._statements, self._math_memo)
+            summary = _default_summary()
+            summary["mode"] = "static"
+            summary["syntax_errors"] = syntax_errors
+            summary["parse_mode"] = parse_mode
+            _run_cost_calculator(parsed, summary, calculator)
+
+            self._texts, self._ast = texts, program
+            self._syntax_errors, self._parse_mode = syntax_errors, parse_mode
+            self.updates += 1
+
+            summary["incremental"] = {
+                "reparse": reparse, # "none", "statement" o "full"
+                "reused_statements": calculator.reused,
+                "recomputed_statements": calculator.recomputed,
+                "parse_ms": round(parse_ms, 2),
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+            return summary
+
+    def _splice(self, stream, texts, lines):
+        """Re-parsea solo la sentencia editada y devuelve el AST nuevo (o None si no se puede)."""
+        old = self._texts
+        limit = min(len(old), len(texts))
+        prefix = 0
+        while prefix < limit and old[prefix] == texts[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == texts[-1 - suffix]:
+            suffix += 1
+        old_end = len(old) - suffix # Tokens editados: [prefix, old_end) antes, [prefix, new_end) ahora
+        delta = len(texts) - len(old)
+
+        # Sentencias que contienen toda la edición (para una inserción pura,
+        # también las que terminan justo antes o empiezan justo después)
+        candidates = []
+        def collect(node, ancestors):
+            if isinstance(node, _STATEMENT_NODES) and node.token is not None and node.stop is not None \
+                    and node.token <= prefix and node.stop >= old_end - 1:
+                candidates.append((node, ancestors))
+            for child in _children(node):
+                collect(child, ancestors + (node,))
+        collect(self._ast, ())
+
+        # De la más interna a la más externa
+        for node, ancestors in sorted(candidates, key=lambda c: c[0].stop - c[0].token):
+            last = node.stop + delta
+            if last < node.token:
+                continue
+            replacement = parse_statement(stream, node.token, last)
+            if replacement is not None:
+                return self._rebuild(self._ast, node, replacement, {id(a) for a in ancestors},
+                                     old_end, delta, texts, lines)
+        return None
+
+    def _rebuild(self, node, target, replacement, ancestors, old_end, delta, texts, lines):
+        if isinstance(node, tuple):
+            return tuple(self._rebuild(item, target, replacement, ancestors, old_end, delta, texts, lines)
+                         for item in node)
+        if not isinstance(node, ast.Node):
+            return node
+        if node is target:
+            return replacement
+        if id(node) not in ancestors:
+            # Fuera de la edición: antes se reutiliza, después se desplaza
+            return _shift(node, delta, lines) if node.token is not None and node.token >= old_end else node
+
+        changes = {name: self._rebuild(getattr(node, name), target, replacement, ancestors,
+                                       old_end, delta, texts, lines)
+                   for name in node.fields()}
+        changes["line"] = lines[node.token]
+        changes["stop"] = node.stop + delta
+        if isinstance(node, ast.While):
+            # El cuerpo cambió: su texto va de después de `) do begin` hasta antes de `end`
+            changes["body_text"] = "".join(texts[node.cond.stop + 4:node.stop + delta])
+        return _copy(node, **changes)
+
+_sessions = None
+_sessions_lock = threading.Lock()
+
+def get_session(session_id=None):
+    """
+    Devuelve (session_id, sesión). Un id desconocido o vencido crea una sesión
+    nueva. Se guardan hasta LIVE_SESSIONS sesiones (LRU) durante
+    LIVE_SESSION_TTL segundos sin uso.
+    """
+    global _sessions
+    if _sessions is None:
+        with _sessions_lock:
+            if _sessions is None:
+                _sessions = MemoryCache(max_entries=int(os.getenv("LIVE_SESSIONS", "64")),
+                                        ttl=float(os.getenv("LIVE_SESSION_TTL", "1800")) or None)
+    with _sessions_lock:
+        session = _sessions.get(session_id) if session_id else None
+        if session is None:
+            session_id, session = uuid.uuid4().hex, IncrementalSession()
+        # Se vuelve a guardar en cada uso para renovar el TTL
+        _sessions.put(session_id, session)
+    return session_id, session
@@ -0,0 +1,158 @@
+# src/execution/ProcessBackend.py
+
+import os
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from ..main import analyze_source, analyze_static, complete_llm_stages, result_cache_key, _is_cacheable
+from ..cache.ResultCache import get_result_cache
+from .Tracing import Trace, activate, span
+from ..parsing.ParseDriver import warm_up
+from ..parsing.WarmupCorpus import WARMUP_PROGRAMS
+
+def _init_worker():
+    # El log del pipeline se queda en el servidor, no en cada worker
+    sys.stdout = open(os.devnull, "w")
+    # Proceso nuevo (spawn): caché DFA de ANTLR vacío y SymPy sin importar.
+    # Un análisis completo deja listos parser, SymPy y sus cachés internas.
+    warm_up()
+    analyze_static(WARMUP_PROGRAMS[0])
+
+def _ready():
+    return os.getpid()
+
+def _static_worker(code):
+    # Solo vuelve el analysis_summary (texto y números): ni AST ni objetos de SymPy
+    return analyze_static(code)
+
+class ProcessAnalysisBackend:
+    """
+    Ejecuta la parte estática del análisis (parsing -> CostCalculator ->
+    MathEngine) en un pool de procesos, para usar todos los núcleos: en hilos
+    el GIL deja al servidor en un solo núcleo.
+
+    - Los workers se crean con spawn (no heredan hilos ni locks del servidor)
+      y se calientan al nacer: parser, SymPy y un análisis de prueba.
+    - `start()` los crea de antemano, así la primera petición no paga el
+      arranque.
+    - Cada worker se reemplaza tras `max_tasks_per_child` análisis, lo que
+      acota el crecimiento de memoria (cachés de SymPy, fragmentación).
+
+    `analyze_source` mantiene el contrato de main.analyze_source (caché de
+    resultados incluida); las etapas LLM, que esperan red y no CPU, corren
+    en el hilo que llama.
+    """
+    def __init__(self, workers=None, max_tasks_per_child=200, result_cache=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.result_cache = result_cache
+        self._lock = threading.Lock()
+        self._pool = None
+        self._submitted = 0
+        self._failed = 0
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    max_tasks_per_child=self.max_tasks_per_child or None,
+                )
+            return self._pool
+
+    def start(self, wait=False):
+        """Crea (y calienta) todos los workers. Con wait=True espera a que estén listos."""
+        pool = self._executor()
+        # Una tarea por worker: el pool solo crea procesos si no hay uno libre
+        futures = [pool.submit(_ready) for _ in range(self.workers)]
+        if wait:
+            for future in futures:
+                future.result()
+
+    def analyze_static(self, code):
+        """analyze_static(code) en un worker. Bloquea el hilo que llama (sin GIL) hasta el resultado."""
+        with self._lock:
+            self._submitted += 1
+        try:
+            return self._executor().submit(_static_worker, code).result()
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+    def analyze_source(self, code, mode="full", use_cache=True, llm_client=None, timings=False):
+        """Como main.analyze_source (sin traducción), con la parte estática en el pool."""
+        trace = Trace.create("analysis", keep=timings, mode=mode, translate=False, backend="process")
+        with activate(trace):
+            summary = self._analyze_source(code, mode, use_cache, llm_client, trace)
+        if trace is not None:
+            trace.finish()
+            if timings:
+                summary = {**summary, "timings": trace.to_dict()}
+        return summary
+
+    def _analyze_source(self, code, mode, use_cache, llm_client, trace):
+        cache = None
+        if use_cache:
+            cache = self.result_cache if self.result_cache is not None else get_result_cache()
+        if cache is not None:
+            cache_key = result_cache_key(code, False, mode)
+            with span("result_cache") as cache_span:
+                cached = cache.get(cache_key)
+                cache_span.set(hit=cached is not None)
+            if cached is not None:
+                return cached
+
+        # Los spans del proceso hijo no vuelven: aquí se mide la parte estática completa
+        with span("static", process=True):
+            summary = self.analyze_static(code)
+        if mode == "full" and summary.get("syntax_errors"):
+            # La auto-reparación pasa por el LLM y re-parsea: pipeline completo en este hilo
+            return analyze_source(code, mode=mode, use_cache=use_cache, trace=trace)
+        summary["mode"] = mode
+        if mode == "full" and code.strip():
+            try:
+                complete_llm_stages(code, summary, llm_client)
+            except Exception as e:
+                print(f"Error conectando con LLM: {e}")
+                summary["validation_details"] = f"Error de conexión: {e}"
+                summary["stage_errors"] = {"llm": str(e)}
+
+        if cache is not None and _is_cacheable(summary):
+            cache.put(result_cache_key(code, False, mode, model=summary.get("llm_model")), summary)
+        return summary
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_tasks_per_child": self.max_tasks_per_child,
+                "started": self._pool is not None,
+                "submitted": self._submitted,
+                "failed": self._failed,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+_process_backend = None
+_process_backend_lock = threading.Lock()
+
+def get_process_backend():
+    """Backend compartido (ANALYSIS_PROCESSES workers, reciclados cada ANALYSIS_MAX_TASKS_PER_CHILD análisis)."""
+    global _process_backend
+    if _process_backend is None:
+        with _process_backend_lock:
+            if _process_backend is None:
+                _process_backend = ProcessAnalysisBackend(
+                    workers=int(os.getenv("ANALYSIS_PROCESSES", "0")) or None,
+                    max_tasks_per_child=int(os.getenv("ANALYSIS_MAX_TASKS_PER_CHILD", "200")),
+                )
+    return _process_backend
@@ -0,0 +1,235 @@
+# src/execution/Tracing.py
+
+import os
+import json
+import time
+import uuid
+import threading
+import contextlib
+import contextvars
+
+# Exportadores activos, separados por coma: "json" (una línea por traza en
+# TRACE_JSON_LOG) y/o "otlp" (OTLP/HTTP JSON a TRACE_OTLP_ENDPOINT). Vacío = no se exporta.
+TRACE_EXPORT = {name.strip() for name in os.getenv("TRACE_EXPORT", "").split(",") if name.strip()}
+TRACE_JSON_LOG = os.getenv("TRACE_JSON_LOG", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "attributes")
+
+    def __init__(self, name, parent_id, attributes):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.attributes = dict(attributes)
+
+    def set(self, **attributes):
+        """Agrega atributos (tokens, aciertos de caché...) al span."""
+        self.attributes.update(attributes)
+
+class _NoopSpan:
+    """Lo que entrega `span` sin traza activa: cualquier atributo se descarta."""
+    def set(self, **attributes):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """
+    Spans de un análisis (lectura, parsing, costos, recurrencia, cada llamada
+    al LLM...). Cada hilo lleva su propia pila de spans abiertos: los spans
+    de un hilo cuelgan del span abierto de ese hilo o, si no hay, de la raíz
+    (así las etapas LLM en paralelo quedan como hijas de la raíz).
+
+    La traza se propaga con un ContextVar: `activate(trace)` la fija en el
+    hilo actual y los pools que copian el contexto (StageScheduler) la
+    heredan. Con `finish()` se cierra la raíz y se exporta.
+    """
+    def __init__(self, name, **attributes):
+        self.trace_id = uuid.uuid4().hex
+        self.start_ns = time.time_ns()
+        self.root = Span(name, None, attributes)
+        self.spans = [self.root]
+        self._stacks = {} # id del hilo -> spans abiertos
+        self._lock = threading.Lock()
+        self._finished = False
+
+    @classmethod
+    def create(cls, name, keep=False, **attributes):
+        """Traza nueva si se pidieron los tiempos (`keep`) o hay exportadores; si no, None."""
+        if keep or TRACE_EXPORT:
+            return cls(name, **attributes)
+        return None
+
+    def open(self, name, attributes):
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        parent = stack[-1] if stack else self.root
+        span = Span(name, parent.span_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        stack.append(span)
+        return span
+
+    def close(self, span):
+        span.end = time.perf_counter()
+        stack = self._stacks.get(threading.get_ident())
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def finish(self):
+        """Cierra la raíz y exporta (una sola vez)."""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        self.root.end = time.perf_counter()
+        export(self)
+
+    def to_dict(self):
+        """Resumen para la respuesta (`timings`): ms relativos al inicio de la traza."""
+        origin = self.root.start
+        now = time.perf_counter()
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace_id": self.trace_id,
+            "total_ms": round(((self.root.end or now) - origin) * 1000, 3),
+            "spans": [{
+                "name": span.name,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "start_ms": round((span.start - origin) * 1000, 3),
+                "duration_ms": round(((span.end or now) - span.start) * 1000, 3),
+                "attributes": span.attributes,
+            } for span in spans[1:]],
+        }
+
+    def to_otlp(self, service_name="analizador-complejidades"):
+        """Payload OTLP/HTTP en JSON (resourceSpans -> scopeSpans -> spans)."""
+        origin = self.root.start
+        with self._lock:
+            spans = list(self.spans)
+
+        def unix_nano(t):
+            return str(self.start_ns + int((t - origin) * 1e9))
+
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{
+                "scope": {"name": "src.execution.Tracing"},
+                "spans": [{
+                    "traceId": self.trace_id,
+                    "spanId": span.span_id,
+                    **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                    "name": span.name,
+                    "kind": 1, # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": unix_nano(span.start),
+                    "endTimeUnixNano": unix_nano(span.end or span.start),
+                    "attributes": _otlp_attributes(span.attributes),
+                    **({"status": {"code": 2, "message": span.attributes["error"]}} if "error" in span.attributes else {}),
+                } for span in spans],
+            }],
+        }]}
+
+def _otlp_attributes(attributes):
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            wrapped = {"boolValue": value}
+        elif isinstance(value, int):
+            wrapped = {"intValue": str(value)}
+        elif isinstance(value, float):
+            wrapped = {"doubleValue": value}
+        else:
+            wrapped = {"stringValue": str(value)}
+        result.append({"key": key, "value": wrapped})
+    return result
+
+@contextlib.contextmanager
+def activate(trace):
+    """Fija `trace` como traza actual del hilo (None = sin traza, no hace nada)."""
+    if trace is None:
+        yield None
+        return
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+def current_trace():
+    return _current_trace.get()
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """Mide el bloque como un span de la traza actual. Sin traza activa solo cuesta un get()."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    current = trace.open(name, attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        trace.close(current)
+
+def traced_events(trace, events):
+    """
+    Recorre un generador de eventos con `trace` activa en cada paso. El
+    generador puede reanudarse en otro hilo (streaming), así que la traza se
+    fija y se retira en cada next() en lugar de una vez para todo el recorrido.
+    """
+    if trace is None:
+        yield from events
+        return
+    iterator = iter(events)
+    try:
+        while True:
+            with activate(trace):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        # Si quien consume abandona el recorrido, el generador interno se cierra con la traza activa
+        if hasattr(iterator, "close"):
+            with activate(trace):
+                iterator.close()
+
+# --- EXPORTACIÓN ---
+
+_json_lock = threading.Lock()
+
+def export(trace):
+    if "json" in TRACE_EXPORT:
+        _export_json(trace)
+    if "otlp" in TRACE_EXPORT:
+        # En segundo plano: un colector caído no demora la respuesta
+        threading.Thread(target=_export_otlp, args=(trace,), name="trace-export", daemon=True).start()
+
+def _export_json(trace):
+    record = {"timestamp": trace.start_ns / 1e9, "name": trace.root.name, **trace.root.attributes, **trace.to_dict()}
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    try:
+        with _json_lock, open(TRACE_JSON_LOG, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"Advertencia: no se pudo escribir la traza en {TRACE_JSON_LOG}: {e}")
+
+def _export_otlp(trace):
+    import urllib.request # Diferido: solo se carga si se exporta a OTLP
+    body = json.dumps(trace.to_otlp(), default=str).encode("utf-8")
+    request = urllib.request.Request(TRACE_OTLP_ENDPOINT, data=body, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=2) as response:
+            response.read()
+    except Exception as e:
+        print(f"Advertencia: no se pudo exportar la traza a {TRACE_OTLP_ENDPOINT}: {e}")
@@ -0,0 +1,90 @@
+# src/llm_integration/CircuitBreaker.py
+
+import os
+import time
+import threading
+
+class CircuitBreaker:
+    """
+    Estado de salud de la conexión con el LLM, compartido por el proceso.
+
+    - CLOSED: las llamadas pasan normalmente.
+    - OPEN: tras `failure_threshold` fallos de conectividad seguidos, las
+      llamadas se rechazan al instante (modo offline) durante `reset_timeout`.
+    - HALF_OPEN: pasado ese tiempo se deja pasar UNA llamada de prueba; si
+      funciona se vuelve a CLOSED, si falla se vuelve a OPEN.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self):
+        """True si la llamada puede salir a la red."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+            }
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+def get_circuit_breaker():
+    """Breaker compartido (LLM_BREAKER_THRESHOLD fallos, LLM_BREAKER_RESET segundos)."""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(
+                    failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "3")),
+                    reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+                )
+    return _breaker
@@ -1,110 +1,252 @@
 # src/llm_integration/LLM_Client.py
 
 import os
-from dotenv import load_dotenv
-import google.generativeai as genai
 import time
-import socket
+import errno
+import threading
+
+from .ResponseCache import get_response_cache
+from .CircuitBreaker import get_circuit_breaker
+from .RateLimiter import get_rate_limiter
+from ..execution.Tracing import span
+
+# Incrementar al modificar cualquier prompt: invalida las cachés de resultados.
+PROMPT_VERSION = "1"
+
+# Orden de preferencia de modelos (el primero disponible es el que se usa)
+PREFERRED_MODELS = ['models/gemini-1.5-flash', 'models/gemini-pro']
+
+# Vigencia (segundos) de la lista de modelos consultada a la API
+MODEL_LIST_TTL = float(os.getenv("LLM_MODEL_LIST_TTL", "3600"))
+
+# Timeout (segundos) de cada llamada a generate_content: acota cuánto puede
+# seguir ocupando un hilo del StageScheduler una etapa que ya expiró
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
+
+# SDK de Gemini: se importa al crear el primer cliente con API key, de modo
+# que importar este módulo (o analizar en modo estático) no lo carga.
+genai = None
+
+def _load_genai():
+    global genai
+    if genai is None:
+        import google.generativeai as sdk
+        genai = sdk
+    return genai
+
+# Fallos de red (no errores de la API en sí), por tipo de excepción. Se
+# compara por nombre de clase en la jerarquía para no importar el SDK, requests
+# ni urllib3: ConnectionError (builtin y el de requests), DNS (gaierror,
+# NameResolutionError) y ServiceUnavailable (gRPC sin conexión).
+CONNECTIVITY_ERROR_TYPES = frozenset((
+    "ConnectionError", "gaierror", "herror", "NewConnectionError", "NameResolutionError", "ServiceUnavailable",
+))
+# Timeouts: el modelo está lento, no la red caída. No abren el breaker
+# (un DeadlineExceeded/504 no debe dejar todo el proceso en modo offline).
+TIMEOUT_ERROR_TYPES = frozenset(("TimeoutError", "timeout", "Timeout", "DeadlineExceeded", "GatewayTimeout"))
+# OSError sin subclase específica: red o host inalcanzable
+NETWORK_ERRNOS = frozenset(code for code in (getattr(errno, name, None) for name in
+                                             ("ENETUNREACH", "ENETDOWN", "EHOSTUNREACH", "EHOSTDOWN")) if code)
+
+def _is_connectivity_error(error):
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if names & TIMEOUT_ERROR_TYPES:
+        return False
+    if names & CONNECTIVITY_ERROR_TYPES:
+        return True
+    return isinstance(error, OSError) and error.errno in NETWORK_ERRNOS
 
 class LLMClient:
-    def __init__(self):
-        # Cargar la clave API del archivo .env
+    def __init__(self, response_cache=None, circuit_breaker=None, rate_limiter=None):
+        # Cargar la clave API del archivo .env (import diferido: solo lo necesita el cliente)
+        from dotenv import load_dotenv
         load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
+        self._api_key = os.getenv("GEMINI_API_KEY")
+        
+        # Caché de respuestas (pluggable); por defecto la compartida del proceso
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        # Salud de la conexión compartida: sustituye al sondeo TCP por llamada
+        self.breaker = circuit_breaker if circuit_breaker is not None else get_circuit_breaker()
+        # Cuota de llamadas por minuto (solo se consume al salir a la red)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.theoretical_context = (
+            "Debes usar ESTRICTAMENTE los siguientes métodos según aplique:\n"
+            "1. TEOREMA MAESTRO: Para T(n) = aT(n/b) + f(n). Verifica regularidad (Caso 3).\n"
+            "2. ECUACIÓN CARACTERÍSTICA: Para lineales homogéneas (ej. Fibonacci T(n) = T(n-1) + T(n-2)). Hallar raíces.\n"
+            "3. MÉTODO DEL ÁRBOL/ITERACIÓN: Si es 'Resta y Vencerás' (T(n) = T(n-1) + C) o irregular.\n"
+            "4. SUMATORIAS: Para ciclos iterativos. Recuerda que la cabecera del FOR se ejecuta n+1 veces."
+        )
         
         self.total_tokens_used = 0
+        # Las etapas LLM corren en paralelo (StageScheduler): protegemos el contador
+        self._tokens_lock = threading.Lock()
         self.model_name = "gemini-1.5-flash" # Default fallback
         self.model = None
+
+        # Descubrimiento de modelos: perezoso (primer uso o en segundo plano) y
+        # con la lista cacheada durante MODEL_LIST_TTL segundos.
+        self.available_models = []
+        self._models_listed_at = None
+        self._resolve_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
         
-        if not api_key:
+        if not self._api_key:
             print("Error: GEMINI_API_KEY no encontrada en .env")
             return
 
         try:
-            # Check connection first to avoid hanging on configure if DNS fails
-            if not self._check_connection():
-                print("Advertencia: Sin conexión a Internet. Modo Offline.")
-                return
-
-            genai.configure(api_key=api_key)
-            
-            # Selección dinámica del modelo
-            available_models = []
-            try:
-                for m in genai.list_models():
-                    if 'generateContent' in m.supported_generation_methods:
-                        available_models.append(m.name)
-            except Exception as e:
-                print(f"Error listando modelos: {e}")
-
-            # Priorizar gemini-1.5-flash, luego gemini-pro, luego el primero que haya
-            if 'models/gemini-1.5-flash' in available_models:
-                self.model_name = 'models/gemini-1.5-flash'
-            elif 'models/gemini-pro' in available_models:
-                self.model_name = 'models/gemini-pro'
-            elif available_models:
-                self.model_name = available_models[0]
-            else:
-                print("Advertencia: No se encontraron modelos disponibles. Intentando default.")
-                self.model_name = 'gemini-1.5-flash'
-
-            print(f"Usando modelo: {self.model_name}")
+            # configure() es local (no hace red); el modelo por defecto queda
+            # listo mientras se consulta la lista real.
+            _load_genai().configure(api_key=self._api_key)
             self.model = genai.GenerativeModel(self.model_name)
-            
-            self.theoretical_context = (
-                "Debes usar ESTRICTAMENTE los siguientes métodos según aplique:\n"
-                "1. TEOREMA MAESTRO: Para T(n) = aT(n/b) + f(n). Verifica regularidad (Caso 3).\n"
-                "2. ECUACIÓN CARACTERÍSTICA: Para lineales homogéneas (ej. Fibonacci T(n) = T(n-1) + T(n-2)). Hallar raíces.\n"
-                "3. MÉTODO DEL ÁRBOL/ITERACIÓN: Si es 'Resta y Vencerás' (T(n) = T(n-1) + C) o irregular.\n"
-                "4. SUMATORIAS: Para ciclos iterativos. Recuerda que la cabecera del FOR se ejecuta n+1 veces."
-            )
         except Exception as e:
             print(f"Error al inicializar el cliente Gemini: {e}")
             self.model = None
 
-    def _check_connection(self):
+    def _list_models(self):
+        """Consulta los modelos disponibles. Devuelve None si no se pudo (offline, error)."""
+        if not self.breaker.allow_request():
+            print("Advertencia: Sin conexión a Internet. Modo Offline.")
+            return None
         try:
-            # Intentar resolver google.com para verificar DNS/Internet
-            socket.create_connection(("www.google.com", 80), timeout=2)
-            return True
-        except OSError:
-            return False
+            available_models = []
+            for m in genai.list_models(request_options={"timeout": 10}):
+                if 'generateContent' in m.supported_generation_methods:
+                    available_models.append(m.name)
+            self.breaker.record_success()
+            return available_models
+        except Exception as e:
+            print(f"Error listando modelos: {e}")
+            if _is_connectivity_error(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return None
 
-    def _send_prompt(self, prompt: str, system_instr: str = None) -> str:
-        """Función interna con lógica de reintento (Exponential Backoff)."""
-        if not self._check_connection():
-            return "Error: Sin conexión a Internet. (Modo Offline)"
+    def _refresh_models(self):
+        """Actualiza la lista de modelos y selecciona el preferido."""
+        available_models = self._list_models()
+        self._models_listed_at = time.monotonic()
+        if available_models is None:
+            return
+        self.available_models = available_models
 
-        if not self.model:
-            return "Error: Cliente LLM no configurado o API Key inválida."
-        
-        max_retries = 3
-        wait_time = 2
-        
-        final_prompt = prompt
-        if system_instr:
-             final_prompt = f"INSTRUCCIÓN DEL SISTEMA: {system_instr}\n\n{prompt}"
+        # Priorizar gemini-1.5-flash, luego gemini-pro, luego el primero que haya
+        preferred = [m for m in PREFERRED_MODELS if m in available_models]
+        if preferred:
+            model_name = preferred[0]
+        elif available_models:
+            model_name = available_models[0]
         else:
-             final_prompt = f"INSTRUCCIÓN DEL SISTEMA: {self.theoretical_context}\n\n{prompt}"
+            print("Advertencia: No se encontraron modelos disponibles. Intentando default.")
+            model_name = 'gemini-1.5-flash'
 
-        for attempt in range(max_retries):
+        if model_name != self.model_name or self.model is None:
             try:
-                response = self.model.generate_content(final_prompt)
+                self.model = genai.GenerativeModel(model_name)
+                self.model_name = model_name
+            except Exception as e:
+                print(f"Error al inicializar el modelo {model_name}: {e}")
+        print(f"Usando modelo: {self.model_name}")
+
+    def _ensure_model(self):
+        """Resuelve el modelo en el primer uso; si la lista caducó, la refresca en segundo plano."""
+        if not self._api_key:
+            return
+        if self._models_listed_at is None:
+            with self._resolve_lock:
+                if self._models_listed_at is None:
+                    self._refresh_models()
+        elif time.monotonic() - self._models_listed_at > MODEL_LIST_TTL:
+            self.resolve_model_async()
+
+    def resolve_model_async(self):
+        """Lanza el descubrimiento de modelos en un hilo, sin bloquear a quien llama."""
+        with self._refresh_lock:
+            if self._refreshing or not self._api_key:
+                return None
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with self._resolve_lock:
+                    self._refresh_models()
+            finally:
+                with self._refresh_lock:
+                    self._refreshing = False
+
+        thread = threading.Thread(target=refresh, name="llm-model-discovery", daemon=True)
+        thread.start()
+        return thread
+
+    def _send_prompt(self, prompt: str, system_instr: str = None) -> str:
+        """Función interna con caché de respuestas y lógica de reintento (Exponential Backoff)."""
+        self._ensure_model()
+        system_text = system_instr if system_instr else self.theoretical_context
+        final_prompt = f"INSTRUCCIÓN DEL SISTEMA: {system_text}\n\n{prompt}"
+
+        with span("llm", model=self.model_name, cache_hit=False) as llm_span:
+            def failed(message):
+                # Los errores se devuelven como texto, no se lanzan: se marcan en el span
+                llm_span.set(error=message)
+                return message
+
+            # Respuestas ya conocidas no gastan tokens ni red (funciona también offline)
+            cache_key = None
+            if self.response_cache is not None:
+                cache_key = self.response_cache.fingerprint(self.model_name, system_text, prompt)
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    llm_span.set(cache_hit=True)
+                    return cached
+
+            if not self.model:
+                return failed("Error: Cliente LLM no configurado o API Key inválida.")
+
+            # Breaker abierto = offline conocido: se responde al instante, sin sondeos
+            if not self.breaker.allow_request():
+                return failed("Error: Sin conexión a Internet. (Modo Offline)")
+        
+            max_retries = 3
+            wait_time = 2
+
+            for attempt in range(max_retries):
+                llm_span.set(attempts=attempt + 1)
+                try:
+                    self.rate_limiter.acquire()
+                    response = self.model.generate_content(final_prompt, request_options={"timeout": REQUEST_TIMEOUT})
                 
-                if hasattr(response, 'usage_metadata'):
-                     self.total_tokens_used += response.usage_metadata.total_token_count
+                    tokens = 0
+                    if hasattr(response, 'usage_metadata'):
+                         usage = response.usage_metadata
+                         tokens = usage.total_token_count
+                         llm_span.set(prompt_tokens=getattr(usage, 'prompt_token_count', 0),
+                                      completion_tokens=getattr(usage, 'candidates_token_count', 0),
+                                      total_tokens=tokens)
+                         with self._tokens_lock:
+                             self.total_tokens_used += tokens
                 
-                return response.text.strip()
+                    self.breaker.record_success()
+                    text = response.text.strip()
+                    if cache_key is not None:
+                        self.response_cache.put(cache_key, text, tokens=tokens)
+                    return text
                 
-            except Exception as e:
-                print(f"  ⚠️ Error API (Intento {attempt+1}/{max_retries}): {e}")
-                if "429" in str(e) or "503" in str(e): # Rate limit o Overload
-                    time.sleep(wait_time)
-                    wait_time *= 2
-                else:
-                    return f"Error API: {e}"
+                except Exception as e:
+                    print(f"  ⚠️ Error API (Intento {attempt+1}/{max_retries}): {e}")
+                    if _is_connectivity_error(e):
+                        self.breaker.record_failure()
+                        return failed(f"Error API: {e}")
+                    # La API respondió (aunque sea con error): la red funciona
+                    self.breaker.record_success()
+                    if "429" in str(e) or "503" in str(e): # Rate limit o Overload
+                        time.sleep(wait_time)
+                        wait_time *= 2
+                    else:
+                        return failed(f"Error API: {e}")
         
-        return "Error: API no disponible tras varios intentos."
+            return failed("Error: API no disponible tras varios intentos.")
 
     def solve_equation(self, equation_type: str, equation_details: str) -> str:
         """
@@ -292,4 +434,26 @@ class LLMClient:
         return cleaned
 
     def get_total_token_cost(self):
-        return self.total_tokens_used
\ No newline at end of file
+        return self.total_tokens_used
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def get_llm_client():
+    """
+    Cliente LLM único del proceso. Se crea en el primer uso (sin llamadas de
+    red); el modelo se resuelve en segundo plano o en la primera petición.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = LLMClient()
+    return _shared_client
+
+def resolved_model_name():
+    """Modelo del cliente compartido si ya se resolvió; None si no hay cliente o aún no se consultó la lista."""
+    client = _shared_client
+    if client is None or client._models_listed_at is None:
+        return None
+    return client.model_name
@@ -0,0 +1,73 @@
+# src/llm_integration/RateLimiter.py
+
+import os
+import time
+import threading
+
+class RateLimiter:
+    """
+    Limitador de tipo token bucket para las llamadas al LLM: como máximo
+    `rate_per_minute` llamadas por minuto, con ráfagas de hasta `burst`.
+    Con rate_per_minute = 0 no limita nada.
+
+    Es compartido por todos los hilos del proceso, así que un lote grande no
+    supera la cuota de la API aunque lance muchas etapas en paralelo.
+    """
+    def __init__(self, rate_per_minute=0, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst if burst is not None else max(1, int(rate_per_minute // 6))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self.acquired = 0
+        self.waited = 0.0
+
+    def _refill(self, now):
+        rate_per_second = self.rate_per_minute / 60.0
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * rate_per_second)
+        self._updated_at = now
+
+    def acquire(self):
+        """Bloquea hasta que haya cupo. Devuelve los segundos esperados."""
+        if not self.rate_per_minute:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.acquired += 1
+                    self.waited += waited
+                    return waited
+                delay = (1 - self._tokens) * 60.0 / self.rate_per_minute
+            self._sleep(delay)
+            waited += delay
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate_per_minute": self.rate_per_minute,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "waited": round(self.waited, 3),
+            }
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter():
+    """Limitador compartido (LLM_RATE_LIMIT llamadas/minuto, 0 = sin límite; ráfaga LLM_RATE_BURST)."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                burst = os.getenv("LLM_RATE_BURST", "")
+                _rate_limiter = RateLimiter(
+                    rate_per_minute=float(os.getenv("LLM_RATE_LIMIT", "0")),
+                    burst=int(burst) if burst else None,
+                )
+    return _rate_limiter
@@ -0,0 +1,84 @@
+# src/llm_integration/ResponseCache.py
+
+import os
+import hashlib
+import threading
+
+from ..cache.MemoryCache import MemoryCache
+from ..cache.SQLiteCache import SQLiteCache
+
+class ResponseCache:
+    """
+    Caché de respuestas del LLM. La clave es la huella (fingerprint) de
+    modelo + instrucción de sistema + prompt, así que sub-prompts repetidos
+    (ej. la misma recurrencia en solve_recurrence_steps) se reutilizan aunque
+    el código fuente completo sea distinto.
+
+    Cualquier objeto con get(key)/put(key, value) sirve como backend.
+    """
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else MemoryCache(max_entries=1024)
+        self.disk = disk
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def fingerprint(model_name, system_instr, prompt):
+        # 'models/gemini-1.5-flash' y 'gemini-1.5-flash' son el mismo modelo
+        model_name = (model_name or "").split("/")[-1]
+        raw = f"{model_name}\0{system_instr or ''}\0{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Devuelve el texto de la respuesta o None."""
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self.memory.put(key, entry)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += entry.get("tokens", 0)
+        return entry["text"]
+
+    def put(self, key, text, tokens=0):
+        entry = {"text": text, "tokens": tokens}
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            self.disk.put(key, entry)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "tokens_saved": self.tokens_saved,
+                "memory": self.memory.stats(),
+                "disk": self.disk.stats() if self.disk is not None else None,
+            }
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """
+    Caché de respuestas compartida del proceso. Se configura con
+    LLM_CACHE_SIZE, LLM_CACHE_TTL (segundos, 0 = sin expiración) y
+    LLM_CACHE_DB (ruta SQLite; vacío = solo memoria).
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                ttl = float(os.getenv("LLM_CACHE_TTL", "604800")) or None
+                memory = MemoryCache(max_entries=int(os.getenv("LLM_CACHE_SIZE", "2048")), ttl=ttl)
+                db_path = os.getenv("LLM_CACHE_DB", "")
+                disk = SQLiteCache(db_path, table="llm_responses", ttl=ttl) if db_path else None
+                _response_cache = ResponseCache(memory, disk)
+    return _response_cache
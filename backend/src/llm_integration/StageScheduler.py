@@ -0,0 +1,181 @@
+# src/llm_integration/StageScheduler.py
+
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_STAGE_TIMEOUT = 60.0
+
+class StageResult:
+    """Resultado de una etapa: valor o error, y el tiempo que tomó."""
+    def __init__(self, name, value=None, error=None, elapsed=0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"StageResult({self.name}, {status}, {self.elapsed:.2f}s)"
+
+class _StageRun:
+    """Estado de una etapa lanzada: su timeout corre desde que un hilo la toma, no desde que se encola."""
+    __slots__ = ("name", "limit", "future", "started_at")
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+        self.future = None
+        self.started_at = None
+
+    def deadline(self):
+        return None if self.started_at is None else self.started_at + self.limit
+
+class StageScheduler:
+    """
+    Ejecuta etapas independientes (llamadas al LLM) en paralelo sobre un
+    pool de hilos. Cada etapa tiene su propio timeout, que empieza a correr
+    cuando la etapa arranca (no mientras espera un hilo libre); si una falla
+    o expira, el resto de resultados se devuelve igual.
+
+    Un hilo no se puede matar: la etapa expirada sigue ocupando su worker
+    hasta que su llamada termine (LLMClient acota cada petición con
+    LLM_REQUEST_TIMEOUT). Si las etapas abandonadas llegan a ocupar la mitad
+    del pool, se crea un pool nuevo para las etapas siguientes y el viejo se
+    cierra en cuanto sus hilos terminen.
+    """
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._abandoned = {} # pool -> etapas expiradas que siguen corriendo en él
+        self._submitted = 0
+        self._timeouts = 0
+        self._replacements = 0
+
+    def _new_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm-stage")
+
+    @staticmethod
+    def _timed(run, fn, changed):
+        with changed:
+            run.started_at = time.monotonic()
+            changed.notify_all()
+        value = fn()
+        return value, time.monotonic() - run.started_at
+
+    def _submit(self, run, fn, changed):
+        with self._lock:
+            executor = self._executor
+            self._submitted += 1
+        # Cada etapa corre con una copia del contexto (traza activa, ver execution/Tracing.py)
+        run.future = executor.submit(contextvars.copy_context().run, self._timed, run, fn, changed)
+        return executor
+
+    def _abandon(self, executor, run):
+        """Registra una etapa expirada; si el pool queda medio ocupado por ellas, lo reemplaza."""
+        run.future.cancel() # Solo surte efecto si aún no había arrancado
+        with self._lock:
+            self._timeouts += 1
+            if run.future.done():
+                return
+            self._abandoned[executor] = self._abandoned.get(executor, 0) + 1
+            if executor is self._executor and self._abandoned[executor] >= max(1, self.max_workers // 2):
+                self._executor = self._new_executor()
+                self._replacements += 1
+                print(f" > Pool de etapas LLM reemplazado: {self._abandoned[executor]} etapas expiradas seguían ocupando hilos")
+                executor.shutdown(wait=False)
+        run.future.add_done_callback(lambda _: self._release(executor))
+
+    def _release(self, executor):
+        with self._lock:
+            self._abandoned[executor] -= 1
+            if not self._abandoned[executor]:
+                del self._abandoned[executor]
+
+    def iter_completed(self, stages, timeouts=None, default_timeout=DEFAULT_STAGE_TIMEOUT):
+        """
+        Lanza todas las etapas y va entregando StageResult en orden de
+        finalización. `stages` es un dict nombre -> callable sin argumentos.
+        """
+        timeouts = timeouts or {}
+        changed = threading.Condition() # Una etapa arrancó o terminó
+
+        def notify(_future):
+            with changed:
+                changed.notify_all()
+
+        runs = []
+        for name, fn in stages.items():
+            run = _StageRun(name, timeouts.get(name, default_timeout))
+            executor = self._submit(run, fn, changed)
+            run.future.add_done_callback(notify)
+            runs.append((run, executor))
+
+        pending = runs
+        try:
+            while pending:
+                with changed:
+                    now = time.monotonic()
+                    done = [(run, ex) for run, ex in pending if run.future.done()]
+                    expired = [(run, ex) for run, ex in pending
+                               if not run.future.done() and run.deadline() is not None and run.deadline() <= now]
+                    if not done and not expired:
+                        # Sin deadline (todas en cola) se espera a que alguna arranque o termine
+                        deadlines = [run.deadline() for run, _ in pending if run.deadline() is not None]
+                        changed.wait(timeout=max(0.0, min(deadlines) - now) if deadlines else None)
+                        continue
+
+                for run, _ in done:
+                    error = run.future.exception()
+                    if error is not None:
+                        elapsed = time.monotonic() - (run.started_at or now)
+                        yield StageResult(run.name, error=f"{type(error).__name__}: {error}", elapsed=elapsed)
+                    else:
+                        value, elapsed = run.future.result()
+                        yield StageResult(run.name, value=value, elapsed=elapsed)
+
+                for run, executor in expired:
+                    self._abandon(executor, run)
+                    yield StageResult(run.name, error=f"Timeout: la etapa superó {run.limit:g}s",
+                                      elapsed=now - run.started_at)
+                finished = {id(run) for run, _ in done + expired}
+                pending = [(run, ex) for run, ex in pending if id(run) not in finished]
+        finally:
+            # Quien consume dejó de iterar (p. ej. cliente desconectado del streaming):
+            # las etapas que aún no arrancaron no llegan a llamar al LLM
+            for run, _ in pending:
+                run.future.cancel()
+
+    def run(self, stages, timeouts=None, default_timeout=DEFAULT_STAGE_TIMEOUT):
+        """Ejecuta las etapas en paralelo y devuelve un dict nombre -> StageResult."""
+        return {r.name: r for r in self.iter_completed(stages, timeouts, default_timeout)}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "submitted": self._submitted,
+                "timeouts": self._timeouts,
+                "abandoned_running": sum(self._abandoned.values()),
+                "pool_replacements": self._replacements,
+            }
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+def get_stage_scheduler():
+    """Scheduler compartido por todo el proceso (se crea en el primer uso)."""
+    global _default_scheduler
+    if _default_scheduler is None:
+        with _default_lock:
+            if _default_scheduler is None:
+                workers = int(os.getenv("LLM_STAGE_WORKERS", "8"))
+                _default_scheduler = StageScheduler(max_workers=workers)
+    return _default_scheduler
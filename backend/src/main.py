@@ -1,22 +1,213 @@
 import sys
 import os
-from antlr4 import FileStream, CommonTokenStream, InputStream
 
-# Imports con puntos (relativos) porque estamos dentro del paquete src
-from .parsing.PseudoCodeAnalyzerLexer import PseudoCodeAnalyzerLexer
-from .parsing.PseudoCodeAnalyzerParser import PseudoCodeAnalyzerParser
-from .analysis.CostCalculator import CostCalculator
-from .llm_integration.LLM_Client import LLMClient
+# Imports con puntos (relativos) porque estamos dentro del paquete src.
+# El parser generado y el motor (SymPy) se importan al usarse por primera vez
+# (ver preload_engine): importar este módulo, un acierto de la caché de
+# resultados o `--help` no los cargan. El SDK de Gemini solo se importa al
+# crear un cliente con API key (LLM_Client), nunca en modo estático.
+from .llm_integration.LLM_Client import get_llm_client, resolved_model_name, PROMPT_VERSION, PREFERRED_MODELS
+from .llm_integration.StageScheduler import get_stage_scheduler
+from .cache.ResultCache import ResultCache, get_result_cache
+from .execution.Tracing import Trace, activate, span, traced_events
+import time
 import traceback
+import json
 import re # Necesario para el parsing del LLM
 
-def analyze_algorithm(filepath, translate_mode=False):
-    print(f"\n{'='*60}")
-    print(f"INICIANDO SISTEMA DE ANALISIS ALGORITMICO")
-    print(f"{'='*60}\n")
+# "full": estático + etapas LLM. "static": solo ANTLR + MathEngine, sin LLM.
+ANALYSIS_MODES = ("full", "static")
+
+# "exact": costos como expresiones de SymPy. "asymptotic": solo el término
+# dominante (AsymptoticCost); los algoritmos recursivos siguen usando el exacto.
+COST_DOMAIN = os.getenv("COST_DOMAIN", "exact")
+
+# Timeout (segundos) de cada etapa LLM. Se puede ajustar con LLM_STAGE_TIMEOUT_<ETAPA>.
+STAGE_TIMEOUTS = {
+    name: float(os.getenv(f"LLM_STAGE_TIMEOUT_{name.upper()}", default))
+    for name, default in {"validation": 60, "steps": 60, "tree": 90, "trace": 90}.items()
+}
+
+# Campos del analysis_summary que completa cada evento del pipeline
+EVENT_FIELDS = {
+    "complexity": ("algorithm_name", "complexity_calculated", "recurrence_relation", "master_theorem_data", "explanation"),
+    "validation": ("complexity_validated", "validation_details", "case_best", "case_average", "case_worst"),
+    "steps": ("recurrence_steps",),
+    "tree": ("recursion_tree",),
+    "trace": ("trace_diagram",),
+}
+
+def _event_data(analysis_summary, event):
+    return {k: analysis_summary[k] for k in EVENT_FIELDS[event] if k in analysis_summary}
+
+def _iter_llm_stages(llm_client, full_pseudocode, analysis_summary, is_recursive, scheduler=None):
+    """
+    Lanza en paralelo las llamadas al LLM. Primero entrega la lista de etapas
+    lanzadas y luego cada StageResult a medida que termina (o expira).
+    """
+    stages = {
+        "validation": lambda: llm_client.validate_complexity(full_pseudocode),
+        "trace": lambda: llm_client.generate_trace_table(full_pseudocode),
+    }
+    if is_recursive:
+        recurrence = analysis_summary.get("recurrence_relation")
+        if recurrence != "N/A":
+            stages["steps"] = lambda: llm_client.solve_recurrence_steps(recurrence)
+        stages["tree"] = lambda: llm_client.generate_recursion_tree(full_pseudocode)
+
+    yield list(stages)
+    stages = {name: _traced_stage(name, call) for name, call in stages.items()}
+    scheduler = scheduler or get_stage_scheduler()
+    for result in scheduler.iter_completed(stages, timeouts=STAGE_TIMEOUTS):
+        status = "OK" if result.ok else result.error
+        print(f" > Etapa '{result.name}' terminada en {result.elapsed:.2f}s ({status})")
+        yield result
+
+def _traced_stage(name, call):
+    """Envuelve una etapa LLM en un span "stage.<nombre>" (la traza llega por el contexto copiado)."""
+    def run():
+        with span(f"stage.{name}"):
+            return call()
+    return run
+
+def _apply_stage(analysis_summary, result):
+    """Vuelca el resultado de una etapa LLM en el analysis_summary."""
+    if result.name == "validation":
+        print("\n--- 3.1. Validación Teórica (LLM) ---")
+        _apply_validation(analysis_summary, _stage_text(result))
+    elif result.name == "steps":
+        analysis_summary["recurrence_steps"] = _stage_text(result)
+    elif result.name == "tree":
+        print("\n--- 5. Árbol de Recursión ---")
+        analysis_summary["recursion_tree"] = _parse_recursion_tree(_stage_text(result))
+    elif result.name == "trace":
+        analysis_summary["trace_diagram"] = _stage_text(result)
+
+def _stage_text(result):
+    """Texto de una etapa; si falló se devuelve un mensaje 'Error: ...' como hace LLMClient."""
+    if result.ok:
+        return result.value
+    return f"Error: {result.error}"
+
+def _parse_recursion_tree(recursion_tree_json):
+    """Intenta parsear el JSON del árbol para asegurar que sea válido antes de enviarlo."""
+    try:
+        clean_tree = recursion_tree_json.replace("```json", "").replace("```", "").strip()
+        with span("json_parse", stage="tree"):
+            tree = json.loads(clean_tree)
+        print(" > Árbol generado correctamente.")
+        return tree
+    except:
+        print(" > Error parseando JSON del árbol. Se enviará como texto crudo (fallback).")
+        return None # O manejarlo en frontend si es null
+
+def _apply_validation(analysis_summary, llm_validation):
+    """Interpreta la respuesta de validate_complexity y completa los casos."""
+    # Intentar parsear JSON
+    try:
+        # Limpiar posibles bloques de código markdown si el LLM los puso
+        clean_json = llm_validation.replace("```json", "").replace("```", "").strip()
+        with span("json_parse", stage="validation"):
+            validation_data = json.loads(clean_json)
+
+        # Extraer campos
+        comp_llm = validation_data.get("complexity", "Desconocida")
+        method_llm = validation_data.get("method", "N/A")
+        reasoning_llm = validation_data.get("reasoning", [])
+
+        # Formatear para visualización (validation_details)
+        formatted_details = f"**Complejidad:** {comp_llm}\n"
+        formatted_details += f"**Método:** {method_llm}\n"
+        formatted_details += "**Razonamiento:**\n"
+        if isinstance(reasoning_llm, list):
+            for r in reasoning_llm:
+                formatted_details += f"- {r}\n"
+        else:
+            formatted_details += f"{reasoning_llm}\n"
+
+        # Comparación Inteligente: Estático vs LLM
+        static_comp = analysis_summary.get("complexity_calculated", "")
+
+        # Normalización simple para comparación
+        def normalize_comp(c):
+            return c.replace("Theta", "").replace("O", "").replace("(", "").replace(")", "").replace("^", "**").strip()
+
+        if "Theta" in static_comp and "O" in comp_llm:
+            try:
+                if normalize_comp(static_comp) == normalize_comp(comp_llm):
+                    # Coinciden en orden, preferimos la precisión de Theta
+                    analysis_summary["complexity_validated"] = static_comp
+                    formatted_details += f"\n**Nota de Consistencia:** El análisis matemático detectó un límite exacto ({static_comp}) que coincide con el límite superior de la IA ({comp_llm}). Se mantiene la notación más precisa."
+                else:
+                    # Discrepan en orden
+                    analysis_summary["complexity_validated"] = comp_llm
+                    formatted_details += f"\n**Discrepancia:** El análisis matemático sugirió {static_comp} pero la IA validó {comp_llm}."
+            except:
+                 analysis_summary["complexity_validated"] = comp_llm
+        elif "O" in static_comp and "Theta" in comp_llm:
+             # Static says O (implies branching/uncertainty), LLM says Theta.
+             try:
+                 if normalize_comp(static_comp) == normalize_comp(comp_llm):
+                      analysis_summary["complexity_validated"] = static_comp # Keep O
+                      formatted_details += f"\n**Nota:** El análisis estático detectó múltiples caminos de ejecución, por lo que se prefiere la notación de límite superior ({static_comp}) sobre la estimación exacta de la IA."
+                 else:
+                      analysis_summary["complexity_validated"] = comp_llm 
+             except:
+                  analysis_summary["complexity_validated"] = comp_llm
+        elif "Theta" in comp_llm:
+            analysis_summary["case_average"] = comp_llm
+            analysis_summary["complexity_validated"] = comp_llm
+        elif "O" in comp_llm:
+            analysis_summary["case_worst"] = comp_llm
+            if analysis_summary["complexity_validated"] == "Desconocida":
+                 analysis_summary["complexity_validated"] = comp_llm
+        elif "Omega" in comp_llm:
+            analysis_summary["case_best"] = comp_llm
+
+        analysis_summary["validation_details"] = formatted_details
+        print(f"JSON Parseado: {comp_llm} via {method_llm}")
+
+    except json.JSONDecodeError:
+        print("Advertencia: No se pudo parsear JSON del LLM. Usando texto plano.")
+        analysis_summary["validation_details"] = llm_validation
+
+        # Fallback a Regex (Lógica Original)
+        complejidades = re.findall(r'(O|Θ|Ω|Theta|Omega)\s*\(([^)]+)\)', llm_validation)
+        for tipo, valor in complejidades:
+            comp_str = f"{tipo}({valor})"
+            comp_str = comp_str.replace('Θ', 'Theta').replace('Ω', 'Omega')
+
+            if "Theta" in comp_str:
+                analysis_summary["case_average"] = comp_str
+                analysis_summary["complexity_validated"] = comp_str
+            elif "O" in tipo:
+                analysis_summary["case_worst"] = comp_str
+                if analysis_summary["complexity_validated"] == "Desconocida":
+                    analysis_summary["complexity_validated"] = comp_str
+            elif "Omega" in comp_str:
+                analysis_summary["case_best"] = comp_str
+
+    # Si el LLM devolvió error, mostrarlo
+    if "Error" in llm_validation and analysis_summary["complexity_validated"] == "Desconocida":
+         analysis_summary["complexity_validated"] = llm_validation
+
+    # Lógica de respaldo para casos (si LLM falla o es inconsistente)
+    # Si tenemos una complejidad calculada y validada fuerte, usémosla
+    final_comp = analysis_summary.get("complexity_validated", "Desconocida")
+    if final_comp == "Desconocida" or "Error" in final_comp:
+        final_comp = analysis_summary.get("complexity_calculated", "Desconocida")
 
-    # Estructura por defecto
-    analysis_summary = {
+    # Si es recursivo (detectado por T(n) o explicación), los casos suelen ser iguales
+    is_recursive = "T(" in str(analysis_summary.get("recurrence_relation", ""))
+    if is_recursive and final_comp != "Desconocida":
+         # Sobreescribir si el LLM dio algo raro (ej: O(n) para Fibonacci)
+         analysis_summary["case_best"] = final_comp
+         analysis_summary["case_average"] = final_comp
+         analysis_summary["case_worst"] = final_comp
+
+def _default_summary():
+    """Estructura por defecto del analysis_summary."""
+    return {
         "algorithm_name": "Desconocido",
         "recurrence_relation": "N/A",
         "complexity_calculated": "Desconocida",
@@ -29,303 +220,382 @@ def analyze_algorithm(filepath, translate_mode=False):
         "case_worst": "N/A"
     }
 
+def preload_engine():
+    """Importa el parser y el motor de costos (SymPy). Devuelve los ms usados (0 si ya estaban)."""
+    start = time.perf_counter()
+    from .parsing import ParseDriver
+    from .analysis import CostCalculator, AsymptoticCostCalculator
+    return (time.perf_counter() - start) * 1000
+
+def _parse_source(source):
+    """Parsea el pseudocódigo (SLL con respaldo a LL, o ParseCache). Devuelve el ParseResult."""
+    from .parsing.ParseDriver import parse_program
+    with span("parse") as parse_span:
+        result = parse_program(source)
+        parse_span.set(mode=result.mode, cached=result.cached, syntax_errors=result.syntax_errors)
+    origin = " (caché)" if result.cached else ""
+    print(f" > Parsing en modo {result.mode}{origin}: {result.elapsed * 1000:.1f} ms, {result.syntax_errors} errores")
+    return result
+
+def _run_cost_calculator(parsed, analysis_summary, calculator=None):
+    """Recorre el AST con CostCalculator y vuelca costos, complejidad y recurrencia."""
+    print("\n--- 2. Cálculo de Costos (Visitor) ---")
+    
+    # MathEngine es interno; las líneas son las de la fuente actual (el AST puede venir de la caché)
+    if calculator is None:
+        from .analysis.CostCalculator import CostCalculator
+        from .analysis.AsymptoticCostCalculator import AsymptoticCostCalculator
+        calculator_class = AsymptoticCostCalculator if COST_DOMAIN == "asymptotic" else CostCalculator
+        calculator = calculator_class(lines=parsed.lines)
+    
     try:
-        # 0. Lectura de Archivo
-        try:
+        # Esto devuelve un objeto AnalysisResult
+        with span("visit", domain=COST_DOMAIN) as visit_span:
+            analysis_result = calculator.visit(parsed.ast)
+            visit_stats = calculator.stats()
+            visit_span.set(visits=sum(visit_stats["visits"].values()), memo_hits=visit_stats["memo_hits"],
+                           symbolic_timeouts=visit_stats.get("symbolic_timeouts", 0))
+        
+        if analysis_result:
+            # Guardar complejidad final (ej: Θ(n))
+            analysis_summary["complexity_calculated"] = analysis_result.worst_case
+            analysis_summary["line_by_line"] = analysis_result.line_analysis
+            
+            if calculator.current_algorithm_name:
+                 analysis_summary["algorithm_name"] = calculator.current_algorithm_name
+            
+            # Usamos el atributo recurrence_eq del objeto AnalysisResult
+            if hasattr(analysis_result, 'recurrence_eq') and analysis_result.recurrence_eq:
+                 analysis_summary["recurrence_relation"] = analysis_result.recurrence_eq
+            elif "T(" in str(analysis_result.worst_case): 
+                 # Fallback por si acaso quedó en el worst_case
+                 analysis_summary["recurrence_relation"] = analysis_result.worst_case
+            else:
+                 analysis_summary["recurrence_relation"] = "Algoritmo Iterativo"
+
+            # Extraer datos del Teorema Maestro si existen
+            if hasattr(analysis_result, 'master_theorem_data') and analysis_result.master_theorem_data:
+                analysis_summary["master_theorem_data"] = analysis_result.master_theorem_data
+                mt_data = analysis_result.master_theorem_data
+            
+            # Guardar explicacion didactica
+            if hasattr(analysis_result, 'explanation') and analysis_result.explanation:
+                analysis_summary["explanation"] = analysis_result.explanation
+
+            if getattr(analysis_result, 'approximate', False):
+                analysis_summary["approximate"] = True
+
+            if hasattr(analysis_result, 'master_theorem_data') and analysis_result.master_theorem_data:
+                mt_data = analysis_result.master_theorem_data
+                print(f"\n--- DETECTOR DEL TEOREMA MAESTRO ---")
+                print(f"Tipo: {mt_data.get('type')}")
+                if mt_data.get('type') == 'master_theorem':
+                    print(f" > a = {mt_data.get('a')}")
+                    print(f" > b = {mt_data.get('b')}")
+                    print(f" > f(n) = {mt_data.get('f_n')}")
+                    print(f" > Caso Detectado: {mt_data.get('case')}")
+                elif mt_data.get('type') == 'linear_recurrence':
+                    print(f" > Subtipo: {mt_data.get('subtype')}")
+                    print(f" > a = {mt_data.get('a')}")
+                elif mt_data.get('type') == 'characteristic_equation':
+                    print(f" > Método: Ecuación Característica")
+                    print(f" > Polinomio: {mt_data.get('polynomial')} = 0")
+                    print(f" > Raíces: {', '.join(mt_data.get('roots'))}")
+                    print(f" > Raíz Dominante: {mt_data.get('dominant_root')}")
+                print("------------------------------------")
+
+    except Exception as e:
+        print(f"Error en Visitor: {e}")
+        traceback.print_exc()
+
+    # Imprimir log en consola
+    if analysis_summary["line_by_line"]:
+        print("\n--- DETALLE DE COSTOS ---")
+        print(f"{'Línea':<8} | {'Costo'}")
+        print("-" * 40)
+        seen = set()
+        for item in sorted(analysis_summary["line_by_line"], key=lambda x: x['line']):
+            if item['line'] not in seen:
+                print(f"{item['line']:<8} | {item['cost']}")
+                seen.add(item['line'])
+        print("="*60)
+
+def _iter_llm_events(llm_client, full_pseudocode, analysis_summary, scheduler=None):
+    """Emite "stages" y luego un evento por cada etapa LLM según termina."""
+    # Validación, pasos, árbol y traza no dependen entre sí,
+    # así que se lanzan en paralelo una vez terminado el análisis estático y
+    # cada una se emite en cuanto termina.
+    is_recursive = "T(" in str(analysis_summary.get("recurrence_relation", ""))
+    print("\n--- 3. Etapas LLM (en paralelo) ---")
+    stages = _iter_llm_stages(llm_client, full_pseudocode, analysis_summary, is_recursive, scheduler)
+    yield "stages", {"pending": next(stages)}
+
+    stage_errors = {}
+    for result in stages:
+        _apply_stage(analysis_summary, result)
+        if not result.ok:
+            stage_errors[result.name] = result.error
+        yield result.name, _event_data(analysis_summary, result.name)
+
+    # Resultados parciales: se informa qué etapas fallaron o expiraron
+    if stage_errors:
+        analysis_summary["stage_errors"] = stage_errors
+    # Modelo que respondió (resuelto durante las etapas): forma parte de la clave de caché
+    model_name = getattr(llm_client, "model_name", None)
+    if model_name:
+        analysis_summary["llm_model"] = model_name
+
+def analyze_static(code: str):
+    """
+    Atajo para analyze_source(code, mode="static") sin caché. Es una función
+    de módulo sin estado compartido, así que puede ejecutarse en un pool de
+    procesos.
+    """
+    return analyze_source(code, mode="static", use_cache=False)
+
+def complete_llm_stages(code: str, analysis_summary, llm_client=None, scheduler=None):
+    """Completa un resultado de analyze_static con las etapas LLM (validación, pasos, árbol, traza)."""
+    llm_client = llm_client or get_llm_client()
+    # analyze_static lo marcó "static"; con las etapas LLM es un análisis completo
+    analysis_summary["mode"] = "full"
+    for _ in _iter_llm_events(llm_client, code, analysis_summary, scheduler):
+        pass
+    return analysis_summary
+
+def analyze_algorithm(filepath, translate_mode=False, mode="full", timings=False):
+    """Lee el pseudocódigo desde un archivo y delega en analyze_source."""
+    trace = Trace.create("analysis", keep=timings, mode=mode, translate=translate_mode)
+    content = ""
+    try:
+        with activate(trace), span("read", path=os.path.basename(filepath)) as read_span:
             with open(filepath, 'r', encoding='utf-8') as f:
                 content = f.read()
-        except Exception as e:
-            print(f"Error leyendo archivo: {e}")
-            return analysis_summary
+            read_span.set(chars=len(content))
+    except Exception as e:
+        print(f"Error leyendo archivo: {e}")
+
+    return analyze_source(content, translate_mode=translate_mode, mode=mode, timings=timings, trace=trace)
+
+def _is_cacheable(analysis_summary):
+    """Solo se guardan análisis completos: sin etapas fallidas ni errores del LLM."""
+    if analysis_summary.get("algorithm_name") == "Desconocido":
+        return False
+    if analysis_summary.get("stage_errors"):
+        return False
+    if analysis_summary.get("approximate"): # Presupuesto simbólico agotado: se recalcula la próxima vez
+        return False
+    return "Error" not in str(analysis_summary.get("complexity_validated", ""))
+
+def result_cache_key(code: str, translate_mode=False, mode="full", model=None):
+    """
+    Clave de la caché de resultados para un análisis. En modo completo
+    incluye la versión de prompts y el modelo: `model` (el que respondió, al
+    guardar) o, al buscar, el que ya resolvió el cliente compartido o el
+    preferido. Así un resultado del modelo de respaldo no se sirve como si
+    fuera del preferido.
+    """
+    # Los resultados estáticos no dependen de los prompts ni del modelo
+    if mode == "full":
+        version = f"{PROMPT_VERSION}|{model or resolved_model_name() or PREFERRED_MODELS[0]}"
+    else:
+        version = "static"
+    if COST_DOMAIN != "exact":
+        version = f"{version}|{COST_DOMAIN}"
+    return ResultCache.make_key(code, translate_mode, version)
+
+def analyze_source(code: str, translate_mode=False, use_cache=True, mode="full", timings=False, trace=None):
+    """
+    Ejecuta el pipeline completo (ANTLR -> CostCalculator -> LLM) sobre el
+    código en memoria. No escribe ni lee archivos temporales, por lo que es
+    seguro llamarlo desde varias peticiones concurrentes.
+
+    Con mode="static" solo se hace el análisis estático (ANTLR + MathEngine):
+    no se crea el cliente LLM ni se importa el SDK de Gemini, así que funciona
+    sin conexión. Los campos del LLM quedan con sus valores por defecto.
 
-        # Inicialización LLM
+    Los resultados completos se guardan en la caché de resultados, indexada
+    por el código normalizado, el modo de traducción y la versión de prompts.
+
+    Con timings=True el resultado incluye "timings": los spans del análisis
+    (parsing, reparación, visitor, recurrencia, cada llamada al LLM...) con
+    su duración en ms. Con TRACE_EXPORT la traza además se exporta (ver
+    execution/Tracing.py). Los tiempos nunca se guardan en la caché.
+    """
+    for event, data in iter_analysis_events(code, translate_mode, use_cache, mode, timings, trace):
+        if event == "done":
+            return data
+
+def iter_analysis_events(code: str, translate_mode=False, use_cache=True, mode="full", timings=False, trace=None):
+    """
+    Igual que analyze_source, pero entrega el análisis por partes como tuplas
+    (evento, datos) a medida que cada etapa termina:
+
+    - "parse": errores de sintaxis (y el pseudocódigo si se tradujo/reparó).
+    - "line_by_line": costos por línea.
+    - "complexity": nombre, complejidad estática, recurrencia y Teorema Maestro.
+    - "stages": etapas LLM lanzadas ({"pending": [...]}).
+    - "validation", "steps", "tree", "trace": cada etapa LLM, en orden de llegada.
+    - "done": el analysis_summary completo (el mismo que devuelve analyze_source).
+
+    En modo estático no hay "stages" ni etapas LLM. Con un acierto de caché
+    solo se emite "done". Con timings=True, "done" incluye "timings".
+    """
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Modo de análisis desconocido: {mode!r} (se esperaba {', '.join(ANALYSIS_MODES)})")
+    if mode == "static" and translate_mode:
+        raise ValueError("El modo estático no admite traducción: requiere el LLM.")
+
+    trace = trace or Trace.create("analysis", keep=timings, mode=mode, translate=translate_mode)
+    try:
+        for event, data in traced_events(trace, _iter_cached_pipeline(code, translate_mode, use_cache, mode)):
+            if event == "done" and trace is not None:
+                trace.finish()
+                if timings:
+                    data = {**data, "timings": trace.to_dict()}
+            yield event, data
+    finally:
+        # Error o cliente desconectado: la traza se exporta igual (finish es idempotente)
+        if trace is not None:
+            trace.finish()
+
+def _iter_cached_pipeline(code, translate_mode, use_cache, mode):
+    """_iter_pipeline detrás de la caché de resultados."""
+    cache = get_result_cache() if use_cache else None
+    if cache is not None:
+        cache_key = result_cache_key(code, translate_mode, mode)
+        with span("result_cache") as cache_span:
+            cached = cache.get(cache_key)
+            cache_span.set(hit=cached is not None)
+        if cached is not None:
+            print(" > Resultado recuperado de la caché de análisis.")
+            yield "done", cached
+            return
+
+    for event, data in _iter_pipeline(code, translate_mode, mode):
+        if event == "done" and cache is not None and _is_cacheable(data):
+            cache.put(result_cache_key(code, translate_mode, mode, model=data.get("llm_model")), data)
+        yield event, data
+
+def _iter_pipeline(code, translate_mode, mode="full"):
+    """Pipeline sin caché: parsing, costos estáticos y etapas LLM."""
+    print(f"\n{'='*60}")
+    print(f"INICIANDO SISTEMA DE ANALISIS ALGORITMICO")
+    print(f"{'='*60}\n")
+
+    analysis_summary = _default_summary()
+    analysis_summary["mode"] = mode
+
+    try:
+        yield from _iter_stages(code, translate_mode, analysis_summary, mode)
+    except Exception as e:
+        print(f"\nERROR GENERAL: {e}")
+        traceback.print_exc()
+
+    yield "done", analysis_summary
+
+def _iter_stages(code, translate_mode, analysis_summary, mode="full"):
+    """Cuerpo del pipeline: completa analysis_summary y emite un evento por etapa."""
+    content = code or ""
+    if not content.strip():
+        print("Error: No se recibió código para analizar.")
+        return
+
+    # Cliente LLM compartido (sin coste de inicialización por petición).
+    # En modo estático no se crea: ni red ni SDK de Gemini.
+    llm_client = None
+    if mode == "full":
         try:
-            llm_client = LLMClient()
+            llm_client = get_llm_client()
         except Exception as e:
             print(f"Error conectando con LLM: {e}")
             analysis_summary["validation_details"] = f"Error de conexión: {e}"
-            return analysis_summary
+            return
 
-        full_pseudocode = content
+    full_pseudocode = content
 
-        # Traducción (Opcional)
-        if translate_mode:
-            print(f"--- 0. Traducción de Lenguaje Natural ---")
-            print(" > Solicitando traducción...")
+    # Traducción (Opcional)
+    if translate_mode:
+        print(f"--- 0. Traducción de Lenguaje Natural ---")
+        print(" > Solicitando traducción...")
+        with span("translate"):
             pseudocode = llm_client.translate_to_pseudocode(content)
-            print("\n--- Código Generado ---\n" + pseudocode + "\n-----------------------\n")
-            
-            try:
-                with open(filepath + ".generated.txt", 'w', encoding='utf-8') as f:
-                    f.write(pseudocode)
-            except: pass
-            full_pseudocode = pseudocode
-            analysis_summary["pseudocode"] = pseudocode
-
-        # 1. Parsing ANTLR
-        print(f"--- 1. Análisis Estructural (ANTLR) ---")
-        input_stream = InputStream(full_pseudocode)
-        lexer = PseudoCodeAnalyzerLexer(input_stream)
-        stream = CommonTokenStream(lexer)
-        parser = PseudoCodeAnalyzerParser(stream)
-        parser.removeErrorListeners()
-        tree = parser.program()
+        print("\n--- Código Generado ---\n" + pseudocode + "\n-----------------------\n")
+        full_pseudocode = pseudocode
+        analysis_summary["pseudocode"] = pseudocode
+
+    # 1. Parsing ANTLR
+    print(f"--- 1. Análisis Estructural (ANTLR) ---")
+    parsed = _parse_source(full_pseudocode)
+    syntax_errors, parse_mode = parsed.syntax_errors, parsed.mode
+    
+    if syntax_errors > 0:
+        print("Advertencia: Errores de sintaxis detectados.")
         
-        if parser.getNumberOfSyntaxErrors() > 0:
-            print("Advertencia: Errores de sintaxis detectados.")
+        # Auto-Reparación si no estamos ya en modo traducción (ni en modo estático)
+        if llm_client is not None and not translate_mode:
+            print("\n>>> INTENTO DE AUTO-REPARACIÓN CON IA <<<")
+            print("Detectando sintaxis inválida. Enviando a LLM para corrección...")
             
-            # Auto-Reparación si no estamos ya en modo traducción
-            if not translate_mode:
-                print("\n>>> INTENTO DE AUTO-REPARACIÓN CON IA <<<")
-                print("Detectando sintaxis inválida. Enviando a LLM para corrección...")
-                
-                try:
-                    # Usamos el contenido original 'content' para reparar
+            try:
+                # Usamos el contenido original 'content' para reparar
+                with span("repair"):
                     repaired_code = llm_client.translate_to_pseudocode(content)
-                    print("\n--- Código Reparado ---\n" + repaired_code + "\n-----------------------\n")
-                    
-                    # Actualizar referencias
-                    full_pseudocode = repaired_code
-                    analysis_summary["pseudocode"] = repaired_code
-                    
-                    # Añadir nota a la validación (se inicializa si está vacía)
-                    if not analysis_summary["validation_details"]:
-                        analysis_summary["validation_details"] = ""
-                    analysis_summary["validation_details"] += "\n\n[NOTA: El código original contenía errores y fue reparado automáticamente por la IA.]"
-                    
-                    # Re-parsing completo
-                    print(f"--- 1.1. Re-Análisis Estructural (ANTLR) ---")
-                    input_stream = InputStream(full_pseudocode)
-                    lexer = PseudoCodeAnalyzerLexer(input_stream)
-                    stream = CommonTokenStream(lexer)
-                    parser = PseudoCodeAnalyzerParser(stream)
-                    parser.removeErrorListeners()
-                    tree = parser.program()
-                    
-                    if parser.getNumberOfSyntaxErrors() == 0:
-                        print(" > Reparación exitosa. Continuando análisis...")
-                    else:
-                        print(" > Advertencia: La reparación no eliminó todos los errores.")
-                        
-                except Exception as e:
-                    print(f"Error durante auto-reparación: {e}")
-
-        # 2. Cálculo de Costos (Visitor)
-        print("\n--- 2. Cálculo de Costos (Visitor) ---")
-        
-        # Instancia sin argumentos (MathEngine es interno)
-        calculator = CostCalculator()
-        
-        try:
-            # Esto devuelve un objeto AnalysisResult
-            analysis_result = calculator.visit(tree)
-            
-            if analysis_result:
-                # Guardar complejidad final (ej: Θ(n))
-                analysis_summary["complexity_calculated"] = analysis_result.worst_case
-                analysis_summary["line_by_line"] = analysis_result.line_analysis
+                print("\n--- Código Reparado ---\n" + repaired_code + "\n-----------------------\n")
+                
+                # Actualizar referencias
+                full_pseudocode = repaired_code
+                analysis_summary["pseudocode"] = repaired_code
+                
+                # Añadir nota a la validación (se inicializa si está vacía)
+                if not analysis_summary["validation_details"]:
+                    analysis_summary["validation_details"] = ""
+                analysis_summary["validation_details"] += "\n\n[NOTA: El código original contenía errores y fue reparado automáticamente por la IA.]"
                 
-                if calculator.current_algorithm_name:
-                     analysis_summary["algorithm_name"] = calculator.current_algorithm_name
+                # Re-parsing completo
+                print(f"--- 1.1. Re-Análisis Estructural (ANTLR) ---")
+                parsed = _parse_source(full_pseudocode)
+                syntax_errors, parse_mode = parsed.syntax_errors, parsed.mode
                 
-                # Usamos el atributo recurrence_eq del objeto AnalysisResult
-                if hasattr(analysis_result, 'recurrence_eq') and analysis_result.recurrence_eq:
-                     analysis_summary["recurrence_relation"] = analysis_result.recurrence_eq
-                elif "T(" in str(analysis_result.worst_case): 
-                     # Fallback por si acaso quedó en el worst_case
-                     analysis_summary["recurrence_relation"] = analysis_result.worst_case
+                if syntax_errors == 0:
+                    print(" > Reparación exitosa. Continuando análisis...")
                 else:
-                     analysis_summary["recurrence_relation"] = "Algoritmo Iterativo"
+                    print(" > Advertencia: La reparación no eliminó todos los errores.")
+                    
+            except Exception as e:
+                print(f"Error durante auto-reparación: {e}")
 
-                # Extraer datos del Teorema Maestro si existen
-                if hasattr(analysis_result, 'master_theorem_data') and analysis_result.master_theorem_data:
-                    analysis_summary["master_theorem_data"] = analysis_result.master_theorem_data
-                    mt_data = analysis_result.master_theorem_data
-                
-                # Guardar explicacion didactica
-                if hasattr(analysis_result, 'explanation') and analysis_result.explanation:
-                    analysis_summary["explanation"] = analysis_result.explanation
-
-                if hasattr(analysis_result, 'master_theorem_data') and analysis_result.master_theorem_data:
-                    mt_data = analysis_result.master_theorem_data
-                    print(f"\n--- DETECTOR DEL TEOREMA MAESTRO ---")
-                    print(f"Tipo: {mt_data.get('type')}")
-                    if mt_data.get('type') == 'master_theorem':
-                        print(f" > a = {mt_data.get('a')}")
-                        print(f" > b = {mt_data.get('b')}")
-                        print(f" > f(n) = {mt_data.get('f_n')}")
-                        print(f" > Caso Detectado: {mt_data.get('case')}")
-                    elif mt_data.get('type') == 'linear_recurrence':
-                        print(f" > Subtipo: {mt_data.get('subtype')}")
-                        print(f" > a = {mt_data.get('a')}")
-                    elif mt_data.get('type') == 'characteristic_equation':
-                        print(f" > Método: Ecuación Característica")
-                        print(f" > Polinomio: {mt_data.get('polynomial')} = 0")
-                        print(f" > Raíces: {', '.join(mt_data.get('roots'))}")
-                        print(f" > Raíz Dominante: {mt_data.get('dominant_root')}")
-                    print("------------------------------------")
+    analysis_summary["syntax_errors"] = syntax_errors
+    analysis_summary["parse_mode"] = parse_mode
+    parse_data = {"syntax_errors": syntax_errors, "parse_mode": parse_mode}
+    if "pseudocode" in analysis_summary:
+        parse_data["pseudocode"] = analysis_summary["pseudocode"]
+    yield "parse", parse_data
 
-        except Exception as e:
-            print(f"Error en Visitor: {e}")
-            traceback.print_exc()
-
-        # Imprimir log en consola
-        if analysis_summary["line_by_line"]:
-            print("\n--- DETALLE DE COSTOS ---")
-            print(f"{'Línea':<8} | {'Costo'}")
-            print("-" * 40)
-            seen = set()
-            for item in sorted(analysis_summary["line_by_line"], key=lambda x: x['line']):
-                if item['line'] not in seen:
-                    print(f"{item['line']:<8} | {item['cost']}")
-                    seen.add(item['line'])
-            print("="*60)
-
-        # 3. Validación Teórica (LLM)
-        print("\n--- 3. Validación Teórica (LLM) ---")
-        llm_validation = llm_client.validate_complexity(full_pseudocode)
-        
-        # Intentar parsear JSON
-        import json
-        try:
-            # Limpiar posibles bloques de código markdown si el LLM los puso
-            clean_json = llm_validation.replace("```json", "").replace("```", "").strip()
-            validation_data = json.loads(clean_json)
-            
-            # Extraer campos
-            comp_llm = validation_data.get("complexity", "Desconocida")
-            method_llm = validation_data.get("method", "N/A")
-            reasoning_llm = validation_data.get("reasoning", [])
-            
-            # Formatear para visualización (validation_details)
-            formatted_details = f"**Complejidad:** {comp_llm}\n"
-            formatted_details += f"**Método:** {method_llm}\n"
-            formatted_details += "**Razonamiento:**\n"
-            if isinstance(reasoning_llm, list):
-                for r in reasoning_llm:
-                    formatted_details += f"- {r}\n"
-            else:
-                formatted_details += f"{reasoning_llm}\n"
+    # 2. Cálculo de Costos (Visitor)
+    _run_cost_calculator(parsed, analysis_summary)
 
-            # Comparación Inteligente: Estático vs LLM
-            static_comp = analysis_summary.get("complexity_calculated", "")
-            
-            # Normalización simple para comparación
-            def normalize_comp(c):
-                return c.replace("Theta", "").replace("O", "").replace("(", "").replace(")", "").replace("^", "**").strip()
-
-            if "Theta" in static_comp and "O" in comp_llm:
-                try:
-                    if normalize_comp(static_comp) == normalize_comp(comp_llm):
-                        # Coinciden en orden, preferimos la precisión de Theta
-                        analysis_summary["complexity_validated"] = static_comp
-                        formatted_details += f"\n**Nota de Consistencia:** El análisis matemático detectó un límite exacto ({static_comp}) que coincide con el límite superior de la IA ({comp_llm}). Se mantiene la notación más precisa."
-                    else:
-                        # Discrepan en orden
-                        analysis_summary["complexity_validated"] = comp_llm
-                        formatted_details += f"\n**Discrepancia:** El análisis matemático sugirió {static_comp} pero la IA validó {comp_llm}."
-                except:
-                     analysis_summary["complexity_validated"] = comp_llm
-            elif "O" in static_comp and "Theta" in comp_llm:
-                 # Static says O (implies branching/uncertainty), LLM says Theta.
-                 try:
-                     if normalize_comp(static_comp) == normalize_comp(comp_llm):
-                          analysis_summary["complexity_validated"] = static_comp # Keep O
-                          formatted_details += f"\n**Nota:** El análisis estático detectó múltiples caminos de ejecución, por lo que se prefiere la notación de límite superior ({static_comp}) sobre la estimación exacta de la IA."
-                     else:
-                          analysis_summary["complexity_validated"] = comp_llm 
-                 except:
-                      analysis_summary["complexity_validated"] = comp_llm
-            elif "Theta" in comp_llm:
-                analysis_summary["case_average"] = comp_llm
-                analysis_summary["complexity_validated"] = comp_llm
-            elif "O" in comp_llm:
-                analysis_summary["case_worst"] = comp_llm
-                if analysis_summary["complexity_validated"] == "Desconocida":
-                     analysis_summary["complexity_validated"] = comp_llm
-            elif "Omega" in comp_llm:
-                analysis_summary["case_best"] = comp_llm
+    yield "line_by_line", {"line_by_line": analysis_summary["line_by_line"]}
+    yield "complexity", _event_data(analysis_summary, "complexity")
 
-            analysis_summary["validation_details"] = formatted_details
-            print(f"JSON Parseado: {comp_llm} via {method_llm}")
+    # 3-5. Etapas LLM
+    if llm_client is not None:
+        yield from _iter_llm_events(llm_client, full_pseudocode, analysis_summary)
+    print("\nAnálisis finalizado.")
 
-        except json.JSONDecodeError:
-            print("Advertencia: No se pudo parsear JSON del LLM. Usando texto plano.")
-            analysis_summary["validation_details"] = llm_validation
-            
-            # Fallback a Regex (Lógica Original)
-            complejidades = re.findall(r'(O|Θ|Ω|Theta|Omega)\s*\(([^)]+)\)', llm_validation)
-            for tipo, valor in complejidades:
-                comp_str = f"{tipo}({valor})"
-                comp_str = comp_str.replace('Θ', 'Theta').replace('Ω', 'Omega')
-                
-                if "Theta" in comp_str:
-                    analysis_summary["case_average"] = comp_str
-                    analysis_summary["complexity_validated"] = comp_str
-                elif "O" in tipo:
-                    analysis_summary["case_worst"] = comp_str
-                    if analysis_summary["complexity_validated"] == "Desconocida":
-                        analysis_summary["complexity_validated"] = comp_str
-                elif "Omega" in comp_str:
-                    analysis_summary["case_best"] = comp_str
-        
-        # Si el LLM devolvió error, mostrarlo
-        if "Error" in llm_validation and analysis_summary["complexity_validated"] == "Desconocida":
-             analysis_summary["complexity_validated"] = llm_validation
-
-        # Lógica de respaldo para casos (si LLM falla o es inconsistente)
-        # Si tenemos una complejidad calculada y validada fuerte, usémosla
-        final_comp = analysis_summary.get("complexity_validated", "Desconocida")
-        if final_comp == "Desconocida" or "Error" in final_comp:
-            final_comp = analysis_summary.get("complexity_calculated", "Desconocida")
-            
-        # Si es recursivo (detectado por T(n) o explicación), los casos suelen ser iguales
-        is_recursive = "T(" in str(analysis_summary.get("recurrence_relation", ""))
-        if is_recursive and final_comp != "Desconocida":
-             # Sobreescribir si el LLM dio algo raro (ej: O(n) para Fibonacci)
-             analysis_summary["case_best"] = final_comp
-             analysis_summary["case_average"] = final_comp
-             analysis_summary["case_worst"] = final_comp
-
-        # 5. Generar Árbol de Recursión (Solo si es recursivo)
-        if is_recursive:
-            print("\n--- 5. Generando Árbol de Recursión y Pasos ---")
-            
-            # 5.1 Pasos de Resolución
-            if analysis_summary.get("recurrence_relation") != "N/A":
-                 print(" > Generando pasos de resolución...")
-                 steps = llm_client.solve_recurrence_steps(analysis_summary["recurrence_relation"])
-                 analysis_summary["recurrence_steps"] = steps
-
-            # 5.2 Árbol
-            recursion_tree_json = llm_client.generate_recursion_tree(full_pseudocode)
-            
-            # Intentar parsear JSON para asegurar que sea válido antes de enviarlo
-            try:
-                import json
-                clean_tree = recursion_tree_json.replace("```json", "").replace("```", "").strip()
-                analysis_summary["recursion_tree"] = json.loads(clean_tree)
-                print(" > Árbol generado correctamente.")
-            except:
-                print(" > Error parseando JSON del árbol. Se enviará como texto crudo (fallback).")
-                analysis_summary["recursion_tree"] = None # O manejarlo en frontend si es null
+if __name__ == "__main__":
+    import argparse
 
-        # 4. Diagrama de Seguimiento
-        print("\n--- 4. Generando Trace Table ---")
-        trace_diagram = llm_client.generate_trace_table(full_pseudocode)
-        analysis_summary["trace_diagram"] = trace_diagram
-        print("\nAnálisis finalizado.")
+    arg_parser = argparse.ArgumentParser(description="Analiza la complejidad de un pseudocódigo.")
+    arg_parser.add_argument("archivo", help="Archivo de pseudocódigo")
+    arg_parser.add_argument("--static", action="store_true",
+                            help="Solo análisis estático (ANTLR + MathEngine), sin LLM; funciona sin conexión")
+    args = arg_parser.parse_args()
 
+    try:
+        with open(args.archivo, 'r', encoding='utf-8') as f:
+            source = f.read()
     except Exception as e:
-        print(f"\nERROR GENERAL: {e}")
-        traceback.print_exc()
-    
-    return analysis_summary
-
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python main.py <archivo_pseudocodigo>")
+        print(f"Error leyendo archivo: {e}")
         sys.exit(1)
-    
-    filepath = sys.argv[1]
-    analyze_algorithm(filepath)
\ No newline at end of file
+
+    analyze_source(source, mode="static" if args.static else "full")
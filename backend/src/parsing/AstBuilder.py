@@ -0,0 +1,113 @@
+# src/parsing/AstBuilder.py
+
+from .PseudoCodeAnalyzerVisitor import PseudoCodeAnalyzerVisitor
+from .PseudoCodeAnalyzerParser import PseudoCodeAnalyzerParser
+from . import AstNodes as ast
+
+class AstBuilder(PseudoCodeAnalyzerVisitor):
+    """
+    Baja el árbol de ANTLR al AST compacto de AstNodes. Los textos que usa el
+    análisis (`getText()` de condiciones, cuerpos de while, destinos de
+    asignación) se extraen aquí una sola vez.
+
+    Con errores de sintaxis el árbol puede venir incompleto: las partes
+    ausentes quedan en None.
+    """
+    def visit(self, tree):
+        if tree is None:
+            return None
+        return super().visit(tree)
+
+    @staticmethod
+    def _pos(ctx):
+        start, stop = ctx.start, ctx.stop
+        if start is None:
+            return {}
+        return {"line": start.line, "token": start.tokenIndex,
+                "stop": stop.tokenIndex if stop is not None else None}
+
+    @staticmethod
+    def _text(node):
+        return node.getText() if node is not None else None
+
+    def visitProgram(self, ctx:PseudoCodeAnalyzerParser.ProgramContext):
+        return ast.Program(self.visit(ctx.algorithm_definition()), **self._pos(ctx))
+
+    def visitAlgorithm_definition(self, ctx:PseudoCodeAnalyzerParser.Algorithm_definitionContext):
+        return ast.Algorithm(self._text(ctx.ID()), self.visit(ctx.statement_list()), **self._pos(ctx))
+
+    def visitStatement_list(self, ctx:PseudoCodeAnalyzerParser.Statement_listContext):
+        body = []
+        for stmt in ctx.statement():
+            node = self.visit(stmt.getChild(0)) if stmt.getChildCount() else None
+            if node is not None:
+                body.append(node)
+        return tuple(body)
+
+    # --- SENTENCIAS ---
+    def visitFor_loop(self, ctx:PseudoCodeAnalyzerParser.For_loopContext):
+        return ast.For(
+            self._text(ctx.ID()),
+            self.visit(ctx.expression(0)),
+            self.visit(ctx.expression(1)),
+            self._body(ctx.statement_list()),
+            **self._pos(ctx),
+        )
+
+    def visitWhile_loop(self, ctx:PseudoCodeAnalyzerParser.While_loopContext):
+        body = ctx.statement_list()
+        return ast.While(self.visit(ctx.expression()), self._body(body), self._text(body) or "", **self._pos(ctx))
+
+    def visitRepeat_loop(self, ctx:PseudoCodeAnalyzerParser.Repeat_loopContext):
+        return ast.Repeat(self._body(ctx.statement_list()), self.visit(ctx.expression()), **self._pos(ctx))
+
+    def visitIf_statement(self, ctx:PseudoCodeAnalyzerParser.If_statementContext):
+        cond = ctx.expression()
+        else_body = self._body(ctx.statement_list(1)) if ctx.ELSE() else None
+        return ast.If(self.visit(cond), self._text(cond) or "", self._body(ctx.statement_list(0)), else_body,
+                      **self._pos(ctx))
+
+    def visitCall_statement(self, ctx:PseudoCodeAnalyzerParser.Call_statementContext):
+        args = tuple(self.visit(e) for e in ctx.expression())
+        return ast.Call(self._text(ctx.ID()), args, **self._pos(ctx))
+
+    def visitReturn_statement(self, ctx:PseudoCodeAnalyzerParser.Return_statementContext):
+        return ast.Return(self.visit(ctx.expression()), **self._pos(ctx))
+
+    def visitAssignment(self, ctx:PseudoCodeAnalyzerParser.AssignmentContext):
+        return ast.Assign(self._text(ctx.target_var()), self.visit(ctx.expression()), **self._pos(ctx))
+
+    def _body(self, statement_list):
+        return self.visit(statement_list) if statement_list is not None else ()
+
+    # --- EXPRESIONES ---
+    def visitExprAtom(self, ctx:PseudoCodeAnalyzerParser.ExprAtomContext):
+        atom = ctx.atom()
+        if atom is None:
+            return None
+        if atom.LPAREN():
+            args = tuple(self.visit(e) for e in atom.expression())
+            return ast.FuncCall(self._text(atom.ID()), args, **self._pos(ctx))
+        text = atom.getText()
+        if text.isdigit():
+            return ast.Number(int(text), **self._pos(ctx))
+        return ast.Var(text, **self._pos(ctx))
+
+    def visitExprParen(self, ctx): return ast.Unary("paren", self.visit(ctx.expression()), **self._pos(ctx))
+    def visitExprCeil(self, ctx): return ast.Unary("ceil", self.visit(ctx.expression()), **self._pos(ctx))
+    def visitExprFloor(self, ctx): return ast.Unary("floor", self.visit(ctx.expression()), **self._pos(ctx))
+    def visitExprNot(self, ctx): return ast.Unary("not", self.visit(ctx.expression()), **self._pos(ctx))
+
+    def _binary(self, ctx):
+        op = ctx.getChild(1).getText() if ctx.getChildCount() > 1 else None
+        return ast.BinOp(op, self.visit(ctx.expression(0)), self.visit(ctx.expression(1)), **self._pos(ctx))
+
+    visitExprMulDiv = _binary
+    visitExprAddSub = _binary
+    visitExprRelational = _binary
+    visitExprAnd = _binary
+    visitExprOr = _binary
+
+def build_ast(tree):
+    """Árbol de ANTLR -> nodo del AST (ast.Program para `program`; None si no hay árbol)."""
+    return AstBuilder().visit(tree)
@@ -0,0 +1,152 @@
+# src/parsing/AstNodes.py
+#
+# AST compacto del pseudocódigo. AstBuilder lo produce a partir del árbol de
+# ANTLR y CostCalculator lo recorre. Cada nodo usa __slots__ y guarda ya
+# extraído lo que el análisis necesita (textos, línea, subexpresiones), así
+# que ocupa poco, no depende del parser y se puede serializar con pickle
+# (ParseCache, pool de procesos del lote).
+#
+# Los nodos se comparten entre análisis (ParseCache): se tratan como
+# inmutables y las secuencias son tuplas.
+
+class Node:
+    # line: línea del primer token; token/stop: índices del primer y último
+    # token del nodo en el token stream
+    __slots__ = ("line", "token", "stop")
+
+    def __init__(self, line=None, token=None, stop=None):
+        self.line = line
+        self.token = token
+        self.stop = stop
+
+    @classmethod
+    def fields(cls):
+        """Campos propios del nodo (sin posición), en orden de declaración."""
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(n for n in getattr(klass, "__slots__", ()) if n not in Node.__slots__)
+        return names
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields())
+        return f"{type(self).__name__}({fields})"
+
+# --- PROGRAMA Y SENTENCIAS ---
+
+class Program(Node):
+    __slots__ = ("algorithm",)
+
+    def __init__(self, algorithm, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.algorithm = algorithm
+
+class Algorithm(Node):
+    __slots__ = ("name", "body")
+
+    def __init__(self, name, body, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.name = name
+        self.body = body # tupla de sentencias
+
+class For(Node):
+    __slots__ = ("var", "start", "end", "body")
+
+    def __init__(self, var, start, end, body, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.var = var
+        self.start = start
+        self.end = end
+        self.body = body
+
+class While(Node):
+    __slots__ = ("cond", "body", "body_text")
+
+    def __init__(self, cond, body, body_text, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.cond = cond
+        self.body = body
+        self.body_text = body_text # Texto del cuerpo sin espacios (heurística de iteraciones)
+
+class Repeat(Node):
+    __slots__ = ("body", "cond")
+
+    def __init__(self, body, cond, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.body = body
+        self.cond = cond
+
+class If(Node):
+    __slots__ = ("cond", "cond_text", "then_body", "else_body")
+
+    def __init__(self, cond, cond_text, then_body, else_body=None, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.cond = cond
+        self.cond_text = cond_text
+        self.then_body = then_body
+        self.else_body = else_body # None si no hay else
+
+class Call(Node):
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, args, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.name = name
+        self.args = args
+
+class Return(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.value = value
+
+class Assign(Node):
+    __slots__ = ("target", "value")
+
+    def __init__(self, target, value, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.target = target # Texto del destino: "x", "A[i]", "p.valor"
+        self.value = value
+
+# --- EXPRESIONES ---
+
+class Number(Node):
+    __slots__ = ("value",)
+
+    def __init__(self, value, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.value = value
+
+class Var(Node):
+    """Variable, acceso a arreglo o campo, T/F/NULL: se guarda el texto completo."""
+    __slots__ = ("text",)
+
+    def __init__(self, text, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.text = text
+
+class FuncCall(Node):
+    __slots__ = ("name", "args")
+
+    def __init__(self, name, args, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.name = name
+        self.args = args
+
+class Unary(Node):
+    """Paréntesis, techo ┌ ┐, piso └ ┘ o `not`."""
+    __slots__ = ("op", "operand")
+
+    def __init__(self, op, operand, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.op = op # "paren", "ceil", "floor" o "not"
+        self.operand = operand
+
+class BinOp(Node):
+    __slots__ = ("op", "left", "right")
+
+    def __init__(self, op, left, right, line=None, token=None, stop=None):
+        super().__init__(line, token, stop)
+        self.op = op # Texto del operador: "+", "div", "<=", "and"...
+        self.left = left
+        self.right = right
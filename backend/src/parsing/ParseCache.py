@@ -0,0 +1,63 @@
+# src/parsing/ParseCache.py
+
+import os
+import hashlib
+import threading
+
+from ..cache.MemoryCache import MemoryCache
+
+class ParseCache:
+    """
+    Caché de ASTs compactos (AstNodes) indexada por el hash del token stream.
+
+    Espacios y comentarios se descartan en el lexer (`-> skip`), así que dos
+    fuentes que solo difieren en indentación, saltos de línea o comentarios
+    producen la misma secuencia de tokens y comparten entrada: se ahorra el
+    parsing, que es la parte cara (tokenizar es necesario para la clave).
+
+    Los ASTs guardados se comparten entre análisis y se tratan como de solo
+    lectura. Los números de línea no forman parte de la clave: cada ParseResult
+    trae la tabla índice de token -> línea de la fuente actual.
+    """
+    def __init__(self, max_entries=256):
+        self.memory = MemoryCache(max_entries=max_entries)
+
+    @staticmethod
+    def make_key(tokens):
+        """Hash de (tipo, texto) de cada token, sin EOF."""
+        digest = hashlib.sha256()
+        for token in tokens:
+            if token.type == token.EOF:
+                break
+            digest.update(f"{token.type}\x1f{token.text}\x1e".encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        return self.memory.get(key)
+
+    def put(self, key, entry):
+        self.memory.put(key, entry)
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self):
+        return self.memory.stats()
+
+_parse_cache = None
+_parse_cache_ready = False
+_parse_cache_lock = threading.Lock()
+
+def get_parse_cache():
+    """
+    Caché compartida del proceso (PARSE_CACHE_SIZE ASTs). Con PARSE_CACHE_SIZE=0
+    devuelve None: sin caché no se calcula el hash del token stream.
+    """
+    global _parse_cache, _parse_cache_ready
+    if not _parse_cache_ready:
+        with _parse_cache_lock:
+            if not _parse_cache_ready:
+                max_entries = int(os.getenv("PARSE_CACHE_SIZE", "256"))
+                _parse_cache = ParseCache(max_entries=max_entries) if max_entries > 0 else None
+                _parse_cache_ready = True
+    return _parse_cache
@@ -0,0 +1,179 @@
+# src/parsing/ParseDriver.py
+
+import time
+import threading
+from antlr4 import CommonTokenStream, InputStream, PredictionMode
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from .PseudoCodeAnalyzerLexer import PseudoCodeAnalyzerLexer
+from .PseudoCodeAnalyzerParser import PseudoCodeAnalyzerParser
+from .ParseCache import ParseCache, get_parse_cache
+from .AstBuilder import build_ast
+
+class ParseResult:
+    """
+    Árbol de `program`, su AST compacto, errores de sintaxis y el modo de
+    predicción que lo produjo. Si el resultado sale de la ParseCache solo hay
+    AST (`tree` es None).
+    """
+    def __init__(self, tree, syntax_errors, mode, elapsed, lines=None, cached=False, ast=None):
+        self.tree = tree
+        self.ast = ast
+        self.syntax_errors = syntax_errors
+        self.mode = mode # "SLL" o "LL"
+        self.elapsed = elapsed
+        self.lines = lines # Línea de cada token (por índice) en la fuente parseada
+        self.cached = cached # True si el árbol salió de la ParseCache
+
+    def __repr__(self):
+        origin = ", cache" if self.cached else ""
+        return f"ParseResult(mode={self.mode}{origin}, errors={self.syntax_errors}, {self.elapsed * 1000:.1f}ms)"
+
+class _ParserPool:
+    """
+    Un lexer y un parser por hilo, reutilizados entre análisis: cada parse
+    solo cambia la entrada y reinicia su estado. Los hilos del executor de la
+    API (y los procesos del lote) conservan así sus instancias calientes.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.parses = 0
+        self.warmup_ms = None
+
+    def acquire(self, count=True):
+        pair = getattr(self._local, "pair", None)
+        if pair is None:
+            lexer = PseudoCodeAnalyzerLexer(InputStream(""))
+            parser = PseudoCodeAnalyzerParser(CommonTokenStream(lexer))
+            parser.removeErrorListeners()
+            pair = self._local.pair = (lexer, parser)
+            with self._lock:
+                self.created += 1
+        if count:
+            with self._lock:
+                self.parses += 1
+        return pair
+
+    def stats(self):
+        with self._lock:
+            return {"parsers_created": self.created, "parses": self.parses, "warmup_ms": self.warmup_ms}
+
+_pool = _ParserPool()
+
+def parser_pool_stats():
+    return _pool.stats()
+
+def prepare_thread():
+    """Crea de antemano el lexer/parser del hilo actual (para `initializer` de pools)."""
+    _pool.acquire(count=False)
+
+def warm_up(programs=None):
+    """
+    Parsea un corpus representativo (por defecto WARMUP_PROGRAMS más un
+    programa inválido) para poblar el caché DFA de ANTLR, que es compartido
+    por clase, y crear el lexer/parser del hilo actual. Devuelve los ms usados.
+    """
+    from .WarmupCorpus import WARMUP_PROGRAMS, WARMUP_INVALID_PROGRAM
+
+    programs = programs if programs is not None else WARMUP_PROGRAMS + [WARMUP_INVALID_PROGRAM]
+    start = time.perf_counter()
+    for source in programs:
+        parse_program(source, use_cache=False)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if _pool.warmup_ms is None:
+        _pool.warmup_ms = round(elapsed_ms, 1)
+    return elapsed_ms
+
+def parse_program(source, use_cache=True):
+    """
+    Parsea en dos etapas:
+
+    1. SLL + BailErrorStrategy: predicción más barata que LL completo, y al
+       primer error se aborta en lugar de intentar recuperarse.
+    2. Solo si la etapa 1 falla (sintaxis inválida o una decisión que SLL no
+       resuelve), se rebobina el token stream y se re-parsea en LL con la
+       estrategia de errores por defecto, que cuenta los errores igual que antes.
+
+    Si SLL tiene éxito el árbol es el mismo que daría LL, así que los
+    programas válidos (el caso común) pagan solo la etapa barata.
+
+    Antes de parsear se tokeniza todo y se consulta la ParseCache: si la misma
+    secuencia de tokens ya se parseó, se devuelve su AST sin parsear.
+    """
+    start = time.perf_counter()
+    return parse_tokens(tokenize(source), use_cache=use_cache, start=start)
+
+def tokenize(source):
+    """Tokeniza toda la fuente con el lexer del hilo. Devuelve el CommonTokenStream ya lleno."""
+    lexer, _ = _pool.acquire()
+    lexer.inputStream = InputStream(source) # Reinicia el lexer
+    stream = CommonTokenStream(lexer)
+    stream.fill()
+    return stream
+
+def parse_tokens(stream, use_cache=True, start=None):
+    """Parsea (o toma de la ParseCache) un token stream devuelto por `tokenize`."""
+    start = start if start is not None else time.perf_counter()
+    lines = tuple(token.line for token in stream.tokens)
+
+    cache = get_parse_cache() if use_cache else None
+    key = None
+    if cache is not None:
+        key = ParseCache.make_key(stream.tokens)
+        entry = cache.get(key)
+        if entry is not None:
+            program_ast, syntax_errors, mode = entry
+            return ParseResult(None, syntax_errors, mode, time.perf_counter() - start, lines,
+                               cached=True, ast=program_ast)
+
+    _, parser = _pool.acquire(count=False)
+    result = _parse_tokens(parser, stream)
+    result.ast = build_ast(result.tree)
+    result.elapsed = time.perf_counter() - start
+    result.lines = lines
+    if cache is not None:
+        cache.put(key, (result.ast, result.syntax_errors, result.mode))
+    return result
+
+def parse_statement(stream, first, last):
+    """
+    Parsea solo los tokens [first, last] de un stream ya tokenizado como una
+    `statement` (SLL + BailErrorStrategy, sin respaldo a LL). Devuelve el nodo
+    del AST, con los índices de token del stream completo, o None si esos
+    tokens no forman exactamente una sentencia válida.
+    """
+    _, parser = _pool.acquire()
+    parser.setTokenStream(stream) # Reinicia el parser (y rebobina el stream)
+    stream.seek(first)
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    try:
+        ctx = parser.statement()
+    except ParseCancellationException:
+        return None
+    if ctx.stop is None or ctx.stop.tokenIndex != last or ctx.getChildCount() != 1:
+        return None
+    return build_ast(ctx.getChild(0))
+
+def _parse_tokens(parser, stream):
+    """Las dos etapas de parse_program sobre un token stream ya tokenizado."""
+    parser.setTokenStream(stream) # Reinicia el parser
+
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    try:
+        tree = parser.program()
+        return ParseResult(tree, 0, "SLL", 0.0)
+    except ParseCancellationException:
+        pass
+
+    # Etapa 2: LL completo sobre los mismos tokens (no se vuelve a tokenizar)
+    stream.seek(0)
+    parser.reset()
+    parser._interp.predictionMode = PredictionMode.LL
+    parser._errHandler = DefaultErrorStrategy()
+    tree = parser.program()
+    return ParseResult(tree, parser.getNumberOfSyntaxErrors(), "LL", 0.0)
@@ -0,0 +1,100 @@
+# src/parsing/WarmupCorpus.py
+#
+# Programas representativos para calentar el parser al arrancar: entre todos
+# recorren todas las reglas de la gramática (clases, arreglos, ciclos,
+# condicionales, llamadas, retornos y cada nivel de precedencia de
+# `expression`), de modo que el caché DFA de ANTLR ya está poblado cuando
+# llega la primera petición real.
+
+WARMUP_PROGRAMS = [
+    # Iterativo: ciclos anidados, arreglos e If sin else
+    """BURBUJA(A[], n)
+begin
+    for i <- 1 to n-1 do
+    begin
+        for j <- 1 to n-i do
+        begin
+            If (A[j] > A[j+1]) then
+            begin
+                temp <- A[j];
+                A[j] <- A[j+1];
+                A[j+1] <- temp;
+            end;
+        end;
+    end;
+end""",
+
+    # While, If/else y operadores relacionales
+    """BUSQUEDA(A, n, x)
+begin
+    i <- 1;
+    encontrado <- 0;
+    while (i <= n and encontrado = 0) do
+    begin
+        If (A[i] = x) then
+        begin
+            encontrado <- 1;
+        end
+        else
+        begin
+            i <- i + 1;
+        end;
+    end;
+    return encontrado;
+end""",
+
+    # Recursión por llamada en expresión (Fibonacci / Factorial)
+    """Fibonacci(n)
+begin
+    If (n <= 1) then
+    begin
+        return n;
+    end
+    else
+    begin
+        return Fibonacci(n-1) + Fibonacci(n-2);
+    end;
+end""",
+
+    # Divide y vencerás con CALL, división y ciclo lineal
+    """MERGE_SORT(A, n)
+begin
+    If (n > 1) then
+    begin
+        mitad <- n / 2;
+        CALL MERGE_SORT(A, mitad);
+        CALL MERGE_SORT(A, mitad);
+        for i <- 1 to n do
+        begin
+            temp <- A[i];
+        end;
+    end;
+end""",
+
+    # Clases, arreglos globales, variables locales, repeat, campos y todos los operadores
+    """Clase Nodo {valor siguiente}
+M[100]
+COMPLETO(Clase Nodo p, A[], n)
+begin
+    x, y, z;
+    repeat
+        x <- ┌ n / 2 ┐ + └ n div 3 ┘ - (n mod 4) * 2;
+        y <- not (x >= n) or (x <> 0 and x < n);
+        p.valor <- x;
+        M[x] <- A[y] + 1;
+        n <- n - 1;
+    until (n <= 0 or x != y or T = F);
+    CALL COMPLETO(p, A, n - 1);
+    return NULL;
+end""",
+]
+
+# Programa con errores: calienta también la ruta de respaldo a LL
+WARMUP_INVALID_PROGRAM = """ROTO(n)
+begin
+    x <- ;
+    for i <- 1 to n do
+    begin
+        y <- y +;
+    end;
+end"""
@@ -1,5 +1,4 @@
-from src.main import analyze_algorithm
-import os
+from src.main import analyze_source
 
 code = """
 ALGORITMO Test(n)
@@ -10,10 +9,7 @@ ALGORITMO Test(n)
 FIN
 """
 
-with open("temp_test_logs.txt", "w") as f:
-    f.write(code)
-
-result = analyze_algorithm("temp_test_logs.txt")
+result = analyze_source(code)
 print("Logs:")
 for log in result['line_by_line']:
     print(f"Line {log['line']}: {log['cost']}")
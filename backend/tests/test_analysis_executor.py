@@ -0,0 +1,152 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+import gc
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution.AnalysisExecutor import AnalysisExecutor, QueueFullError
+
+def _slow_analysis(code):
+    time.sleep(0.3)
+    return {"algorithm_name": code}
+
+def test_event_loop_not_blocked():
+    executor = AnalysisExecutor(max_concurrent=2, max_queued=0)
+
+    async def scenario():
+        ticks = 0
+        task = asyncio.ensure_future(executor.submit(_slow_analysis, "A"))
+        # Mientras el análisis corre en el pool, el loop sigue atendiendo otras tareas
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        return ticks, task.result()
+
+    ticks, result = asyncio.run(scenario())
+    assert result == {"algorithm_name": "A"}
+    assert ticks > 5
+
+def test_backpressure_when_queue_full():
+    executor = AnalysisExecutor(max_concurrent=1, max_queued=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.submit(_slow_analysis, "A"))
+        second = asyncio.ensure_future(executor.submit(_slow_analysis, "B"))
+        await asyncio.sleep(0.05)
+        try:
+            await executor.submit(_slow_analysis, "C")
+            rejected = None
+        except QueueFullError as e:
+            rejected = e
+        return rejected, await first, await second
+
+    rejected, first, second = asyncio.run(scenario())
+    assert rejected is not None and rejected.retry_after >= 1
+    assert first["algorithm_name"] == "A" and second["algorithm_name"] == "B"
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["in_flight"] == 0
+
+def test_cancelled_request_keeps_its_slot_until_done():
+    executor = AnalysisExecutor(max_concurrent=1, max_queued=0)
+
+    async def scenario():
+        task = asyncio.ensure_future(executor.submit(_slow_analysis, "A"))
+        await asyncio.sleep(0.05)
+        task.cancel() # Cliente desconectado: el hilo sigue corriendo
+        await asyncio.sleep(0.05)
+        during = executor.stats()["in_flight"]
+        try:
+            await executor.submit(_slow_analysis, "B")
+            rejected = False
+        except QueueFullError:
+            rejected = True
+        await asyncio.sleep(0.4)
+        return during, rejected
+
+    during, rejected = asyncio.run(scenario())
+    assert during == 1 and rejected
+    assert executor.stats()["in_flight"] == 0
+
+def _slow_events(code):
+    for stage in ("parse", "complexity", "done"):
+        time.sleep(0.1)
+        yield stage, code
+
+def test_stream_yields_incrementally():
+    executor = AnalysisExecutor(max_concurrent=1, max_queued=0)
+
+    async def scenario():
+        received = []
+        events = executor.stream(_slow_events, "A")
+        # Sin cupo libre, un segundo stream se rechaza antes de empezar
+        try:
+            executor.stream(_slow_events, "B")
+            rejected = False
+        except QueueFullError:
+            rejected = True
+        async for event in events:
+            received.append((event, executor.stats()["in_flight"]))
+        return rejected, received
+
+    rejected, received = asyncio.run(scenario())
+    assert rejected
+    assert [event for event, _ in received] == [("parse", "A"), ("complexity", "A"), ("done", "A")]
+    assert all(in_flight == 1 for _, in_flight in received)
+    assert executor.stats()["in_flight"] == 0
+
+def test_abandoned_stream_closes_the_pipeline():
+    executor = AnalysisExecutor(max_concurrent=1, max_queued=0)
+    closed = threading.Event()
+
+    def events():
+        try:
+            yield "parse"
+            yield "complexity" # Aquí arrancarían las etapas LLM
+            yield "done"
+        finally:
+            closed.set()
+
+    async def scenario():
+        stream = executor.stream(events)
+        first = await stream.__anext__()
+        await stream.aclose() # Cliente desconectado
+        return first
+
+    assert asyncio.run(scenario()) == "parse"
+    assert closed.wait(timeout=2)
+    deadline = time.monotonic() + 2
+    while executor.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert executor.stats()["in_flight"] == 0
+
+def test_stream_closed_before_first_item_releases_slot():
+    executor = AnalysisExecutor(max_concurrent=1, max_queued=0)
+
+    async def scenario():
+        # Cliente desconectado antes de que empiece la respuesta
+        await executor.stream(lambda: iter([1, 2])).aclose()
+        after_close = executor.stats()["in_flight"]
+        # Un stream que nunca se recorre (ni se cierra) también devuelve el cupo
+        executor.stream(lambda: iter([1, 2]))
+        gc.collect()
+        after_drop = executor.stats()["in_flight"]
+        # El cupo quedó libre: otro stream se admite y se recorre completo
+        items = [item async for item in executor.stream(lambda: iter([1, 2]))]
+        return after_close, after_drop, items
+
+    assert asyncio.run(scenario()) == (0, 0, [1, 2])
+    assert executor.stats()["in_flight"] == 0
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_event_loop_not_blocked()
+    test_backpressure_when_queue_full()
+    test_cancelled_request_keeps_its_slot_until_done()
+    test_stream_yields_incrementally()
+    test_abandoned_stream_closes_the_pipeline()
+    test_stream_closed_before_first_item_releases_slot()
@@ -0,0 +1,183 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.main as main_module
+from src.main import analyze_source, iter_analysis_events
+
+def _read_test_file(name):
+    with open(os.path.join(os.path.dirname(__file__), name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+class FakeLLMClient:
+    """Cliente LLM falso: respuestas fijas, sin red."""
+    def __init__(self):
+        self.total_tokens_used = 0
+
+    def translate_to_pseudocode(self, text):
+        return text
+
+    def validate_complexity(self, code):
+        return '{"complexity": "Theta(n)", "method": "Iterativo", "reasoning": ["Un ciclo"]}'
+
+    def solve_recurrence_steps(self, eq):
+        return "T(n) = ..."
+
+    def generate_recursion_tree(self, code):
+        return '{"root": {"label": "f(1)", "children": []}}'
+
+    def generate_trace_table(self, code):
+        return "| Paso | Nivel_Pila | Función | Variables |"
+
+def test_analyze_source_in_memory():
+    code = """
+    SUMA(A, n)
+    begin
+        total <- 0;
+        for i <- 1 to n do
+        begin
+            total <- total + A[i];
+        end;
+        return total;
+    end
+    """
+
+    files_before = set(os.listdir(os.getcwd()))
+    original_factory = main_module.get_llm_client
+    main_module.get_llm_client = FakeLLMClient
+    try:
+        result = analyze_source(code)
+    finally:
+        main_module.get_llm_client = original_factory
+
+    assert result["algorithm_name"] == "SUMA"
+    assert "n" in result["complexity_calculated"]
+    assert result["line_by_line"]
+    assert result["trace_diagram"].startswith("| Paso")
+
+    # El pipeline no debe dejar archivos temporales en el directorio de trabajo
+    assert set(os.listdir(os.getcwd())) == files_before
+
+def test_analyze_source_uses_result_cache():
+    code = """
+    CACHEADO(n)
+    begin
+        for i <- 1 to n do
+        begin
+            x <- x + 1;
+        end;
+    end
+    """
+    calls = []
+
+    class CountingLLMClient(FakeLLMClient):
+        def validate_complexity(self, code):
+            calls.append(code)
+            return super().validate_complexity(code)
+
+    original_factory = main_module.get_llm_client
+    main_module.get_llm_client = CountingLLMClient
+    try:
+        first = analyze_source(code)
+        # Mismo código con espacios finales distintos: acierto de caché
+        second = analyze_source(code.replace(";", ";   "))
+    finally:
+        main_module.get_llm_client = original_factory
+
+    assert len(calls) == 1
+    assert first == second
+
+def test_result_cache_keys_on_answering_model():
+    code = """
+    RESPALDO(n)
+    begin
+        for i <- 1 to n do
+        begin
+            y <- y + 2;
+        end;
+    end
+    """
+
+    class FallbackLLMClient(FakeLLMClient):
+        model_name = "models/gemini-pro" # El preferido no estaba disponible
+
+    original_factory = main_module.get_llm_client
+    main_module.get_llm_client = FallbackLLMClient
+    try:
+        result = analyze_source(code)
+    finally:
+        main_module.get_llm_client = original_factory
+
+    cache = main_module.get_result_cache()
+    assert result["llm_model"] == "models/gemini-pro"
+    # No se sirve como resultado del modelo preferido
+    assert cache.get(main_module.result_cache_key(code, model=main_module.PREFERRED_MODELS[0])) is None
+    assert cache.get(main_module.result_cache_key(code, model="models/gemini-pro")) == result
+
+def test_analysis_events_arrive_in_order():
+    code = _read_test_file('FACTORIAL.txt')
+    original_factory = main_module.get_llm_client
+    main_module.get_llm_client = FakeLLMClient
+    try:
+        events = list(iter_analysis_events(code, use_cache=False))
+    finally:
+        main_module.get_llm_client = original_factory
+
+    names = [name for name, _ in events]
+    # Primero lo estático, en orden fijo; luego las etapas LLM según terminen
+    assert names[:4] == ["parse", "line_by_line", "complexity", "stages"]
+    assert names[-1] == "done"
+    pending = events[3][1]["pending"]
+    assert sorted(names[4:-1]) == sorted(pending)
+    assert "tree" in pending
+
+    # Los datos parciales coinciden con el resultado final
+    summary = events[-1][1]
+    partial = {}
+    for name, data in events[1:-1]:
+        if name != "stages":
+            partial.update(data)
+    for key, value in partial.items():
+        assert summary[key] == value
+    assert summary["recursion_tree"]["root"]["label"] == "f(1)"
+
+    print("Test Passed!")
+
+def test_static_mode_never_touches_llm():
+    def no_llm():
+        raise AssertionError("El modo estático no debe crear el cliente LLM")
+
+    original_factory = main_module.get_llm_client
+    main_module.get_llm_client = no_llm
+    try:
+        events = list(iter_analysis_events(_read_test_file('MERGE_SORT.txt'), use_cache=False, mode="static"))
+    finally:
+        main_module.get_llm_client = original_factory
+
+    assert [name for name, _ in events] == ["parse", "line_by_line", "complexity", "done"]
+    summary = events[-1][1]
+    assert summary["mode"] == "static"
+    assert summary["algorithm_name"] == "MERGE_SORT"
+    assert "T(" in summary["recurrence_relation"]
+    assert summary["master_theorem_data"]
+    assert summary["complexity_validated"] == "Desconocida"
+
+def test_static_mode_rejects_translation():
+    try:
+        analyze_source("x", translate_mode=True, mode="static")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Se esperaba ValueError")
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_analyze_source_in_memory()
+    test_analyze_source_uses_result_cache()
+    test_result_cache_keys_on_answering_model()
+    test_analysis_events_arrive_in_order()
+    test_static_mode_never_touches_llm()
+    test_static_mode_rejects_translation()
@@ -0,0 +1,63 @@
+import sys
+import os
+import pickle
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parsing import AstNodes as ast
+from src.parsing.ParseDriver import parse_program
+from src.analysis.CostCalculator import CostCalculator
+
+def _read_test_file(name):
+    with open(os.path.join(os.path.dirname(__file__), name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _analyze(tree):
+    result = CostCalculator().visit(tree)
+    return result.worst_case, result.line_analysis, result.recurrence_eq
+
+def test_lowering_extracts_text_and_lines():
+    source = """BUSCA(A, n)
+begin
+    i <- 1;
+    while (i <= n) do
+    begin
+        If (A[i] = n) then
+        begin
+            return i;
+        end;
+        i <- i * 2;
+    end;
+    return 0;
+end"""
+    program = parse_program(source, use_cache=False).ast
+    assert isinstance(program, ast.Program)
+    algorithm = program.algorithm
+    assert algorithm.name == "BUSCA"
+    assign, loop, ret = algorithm.body
+
+    assert isinstance(assign, ast.Assign) and assign.target == "i" and assign.line == 3
+    assert isinstance(loop, ast.While) and loop.line == 4
+    assert "i<-i*2" in loop.body_text
+    condition = loop.body[0]
+    assert isinstance(condition, ast.If) and condition.cond_text == "A[i]=n" and condition.else_body is None
+    assert isinstance(condition.cond, ast.BinOp) and condition.cond.op == "="
+    assert isinstance(ret.value, ast.Number) and ret.value.value == 0
+
+    # Nodos compactos: sin __dict__ por instancia
+    assert not hasattr(loop, "__dict__")
+
+def test_ast_matches_antlr_tree_and_survives_pickle():
+    for name in ("MERGE_SORT.txt", "FIBONACCI_TEST.txt", "BURBUJA.txt"):
+        result = parse_program(_read_test_file(name), use_cache=False)
+        from_tree = _analyze(result.tree)
+        from_ast = _analyze(result.ast)
+        from_pickle = _analyze(pickle.loads(pickle.dumps(result.ast)))
+        assert from_tree == from_ast == from_pickle, name
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_lowering_extracts_text_and_lines()
+    test_ast_matches_antlr_tree_and_survives_pickle()
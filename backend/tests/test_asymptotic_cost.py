@@ -0,0 +1,62 @@
+import sys
+import os
+import io
+import contextlib
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sympy import Rational, log, sqrt, Max, floor
+from src.analysis.AsymptoticCost import AsymptoticCost, N as n
+from src.analysis.CostCalculator import CostCalculator
+from src.analysis.AsymptoticCostCalculator import AsymptoticCostCalculator
+from src.parsing.ParseDriver import parse_program
+
+ITERATIVE = ["BURBUJA.txt", "BUBBLE_USER.txt", "BUSQUEDA_SEQ.txt", "SUMA_ARREGLO.txt"]
+RECURSIVE = ["MERGE_SORT.txt", "HANOI.txt"]
+
+def _analyze(calculator_class, name):
+    with open(os.path.join(os.path.dirname(__file__), name), 'r', encoding='utf-8') as f:
+        parsed = parse_program(f.read(), use_cache=False)
+    calculator = calculator_class(lines=parsed.lines)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = calculator.visit(parsed.ast)
+    return calculator, result
+
+def test_dominant_term_operations():
+    quadratic = AsymptoticCost(3, a=2)
+    linear = AsymptoticCost.from_expr(5 * n + 7)
+    assert linear == AsymptoticCost(5, a=1)
+    assert quadratic + linear == quadratic
+    assert quadratic + AsymptoticCost(1, a=2) == AsymptoticCost(4, a=2)
+    assert quadratic * linear == AsymptoticCost(15, a=3)
+    assert linear.max(AsymptoticCost(1, a=1, b=1)).same_class(AsymptoticCost(1, a=1, b=1))
+    assert AsymptoticCost(1, k=2).max(AsymptoticCost(100, a=10)).k == 2
+    assert not AsymptoticCost(0) and AsymptoticCost(0) + linear == linear
+
+    # Misma clase que la expresión exacta
+    assert AsymptoticCost.from_expr(n * log(n, 2) + 4 * n).same_class(AsymptoticCost(1, a=1, b=1))
+    assert AsymptoticCost.from_expr(sqrt(n) + Max(3, floor(n / 2))) == AsymptoticCost(Rational(1, 2), a=1)
+    assert AsymptoticCost.from_expr(2 ** (n + 1) + n ** 9) == AsymptoticCost(2, k=2)
+
+def test_matches_exact_engine():
+    for name in ITERATIVE:
+        exact_calc, exact = _analyze(CostCalculator, name)
+        calc, result = _analyze(AsymptoticCostCalculator, name)
+        assert not calc.fallback, name
+        assert result.worst_case == exact.worst_case, name
+        assert len(result.line_analysis) == len(exact.line_analysis), name
+
+    # Los recursivos se resuelven con el motor exacto
+    for name in RECURSIVE:
+        exact_calc, exact = _analyze(CostCalculator, name)
+        calc, result = _analyze(AsymptoticCostCalculator, name)
+        assert calc.fallback, name
+        assert result.recurrence_eq == exact.recurrence_eq, name
+        assert result.worst_case == exact.worst_case, name
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_dominant_term_operations()
+    test_matches_exact_engine()
@@ -0,0 +1,177 @@
+import sys
+import os
+import tempfile
+import time
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cache.MemoryCache import MemoryCache
+from src.cache.ResultCache import ResultCache
+from src import main
+from src.execution.BatchRunner import BatchRunner, load_sources
+from src.llm_integration.RateLimiter import RateLimiter
+
+TESTS_DIR = os.path.dirname(__file__)
+
+def _read(name):
+    with open(os.path.join(TESTS_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+class FakeLLMClient:
+    """Cliente LLM falso que cuenta las validaciones pedidas."""
+    def __init__(self):
+        self.validations = 0
+
+    def validate_complexity(self, code):
+        self.validations += 1
+        return '{"complexity": "Theta(n)", "method": "Iterativo", "reasoning": ["Un ciclo"]}'
+
+    def solve_recurrence_steps(self, eq):
+        return "T(n) = ..."
+
+    def generate_recursion_tree(self, code):
+        return '{"root": {"label": "f(1)", "children": []}}'
+
+    def generate_trace_table(self, code):
+        return "| Paso | Nivel_Pila | Función | Variables |"
+
+def test_load_sources_from_directory_and_jsonl():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "grupo1"))
+        for path in ("a.txt", os.path.join("grupo1", "b.txt"), "notas.md"):
+            with open(os.path.join(tmp, path), "w", encoding="utf-8") as f:
+                f.write("X(n)\nbegin\nend")
+        ids = [item_id for item_id, _ in load_sources(tmp)]
+        assert ids == ["a.txt", os.path.join("grupo1", "b.txt")]
+
+        jsonl = os.path.join(tmp, "fuentes.jsonl")
+        with open(jsonl, "w", encoding="utf-8") as f:
+            f.write('{"id": "e1", "code": "A(n) begin end"}\n\n{"code": "B(n) begin end"}\n')
+        assert load_sources(jsonl) == [("e1", "A(n) begin end"), ("3", "B(n) begin end")]
+
+def test_batch_deduplicates_and_completes_llm_stages():
+    burbuja = _read('BURBUJA.txt')
+    items = [
+        ("alumno1", burbuja),
+        ("alumno2", burbuja + "\n\n"), # Misma entrega con líneas vacías al final
+        ("alumno3", _read('MERGE_SORT.txt')),
+    ]
+    llm_client = FakeLLMClient()
+    cache = ResultCache(MemoryCache())
+    runner = BatchRunner(workers=2, llm_concurrency=2, llm_client=llm_client, result_cache=cache)
+    try:
+        records = {r["id"]: r for r in runner.run(items)}
+        # Segunda pasada: todo sale de la caché de resultados
+        again = list(runner.run(items))
+    finally:
+        runner.close()
+
+    assert set(records) == {"alumno1", "alumno2", "alumno3"}
+    assert records["alumno1"]["key"] == records["alumno2"]["key"]
+    # Misma clave que /analyze: un acierto de lote sirve a la API y viceversa
+    assert records["alumno1"]["key"] == main.result_cache_key(burbuja, False, "full")
+    assert records["alumno1"]["result"]["algorithm_name"] == "BURBUJA"
+    assert records["alumno3"]["result"]["recursion_tree"]["root"]["label"] == "f(1)"
+    assert "Theta(n)" in records["alumno1"]["result"]["validation_details"]
+    assert all(r["result"]["mode"] == "full" for r in records.values())
+    # Dos fuentes distintas => dos validaciones, aunque haya tres entregas
+    assert llm_client.validations == 2
+    assert all(r["cached"] for r in again) and len(again) == 3
+
+def test_batch_key_follows_cost_domain():
+    code = _read('BURBUJA.txt')
+    real_domain = main.COST_DOMAIN
+    main.COST_DOMAIN = "asymptotic"
+    runner = BatchRunner(workers=1, use_llm=False)
+    try:
+        record = next(runner.run([("a", code)]))
+        asymptotic_key = main.result_cache_key(code, False, "full")
+    finally:
+        runner.close()
+        main.COST_DOMAIN = real_domain
+    assert record["key"] == asymptotic_key
+    assert asymptotic_key != main.result_cache_key(code, False, "full")
+
+class SlowLLMClient(FakeLLMClient):
+    """Cada validación tarda: el lote queda con etapas LLM en cola."""
+    def validate_complexity(self, code):
+        time.sleep(0.3)
+        return super().validate_complexity(code)
+
+def test_abandoned_batch_cancels_pending_work():
+    sources = [_read(name) for name in ('BURBUJA.txt', 'MERGE_SORT.txt', 'HANOI.txt', 'SUMA_ARREGLO.txt')]
+    llm_client = SlowLLMClient()
+    runner = BatchRunner(workers=1, llm_concurrency=1, llm_client=llm_client, result_cache=ResultCache(MemoryCache()))
+    try:
+        records = runner.run([(str(i), code) for i, code in enumerate(sources)])
+        next(records)
+        records.close() # Cliente desconectado tras el primer resultado
+        time.sleep(1.0)
+    finally:
+        runner.close()
+    # A lo sumo la validación que ya estaba en curso al cerrar; el resto se canceló
+    assert llm_client.validations <= 2
+
+def _kill_workers(runner):
+    """Mata los workers del pool en cuanto arrancan (como un OOM kill a mitad del lote)."""
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        pool = runner._process_pool
+        processes = list(getattr(pool, "_processes", None) or {})
+        if processes:
+            for process in pool._processes.values():
+                process.kill()
+            return
+        time.sleep(0.01)
+
+def test_broken_process_pool_is_replaced():
+    code = _read('BURBUJA.txt')
+    runner = BatchRunner(workers=1, use_llm=False)
+    try:
+        killer = threading.Thread(target=_kill_workers, args=(runner,))
+        killer.start()
+        failed = next(runner.run([("a", code)]))
+        killer.join()
+        # El lote siguiente crea otro pool en vez de fallar elemento por elemento
+        recovered = next(runner.run([("a", code)]))
+
+        # Un pool que se rompió entre lotes también se reemplaza al enviar
+        broken, _ = runner._pools()
+        try:
+            broken.submit(os._exit, 1).result()
+        except Exception:
+            pass
+        after_idle_break = next(runner.run([("a", code)]))
+    finally:
+        runner.close()
+    assert "BrokenProcessPool" in failed["result"]["error"]
+    assert recovered["result"]["algorithm_name"] == "BURBUJA"
+    assert after_idle_break["result"]["algorithm_name"] == "BURBUJA"
+
+def test_rate_limiter_paces_calls():
+    now = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(rate_per_minute=60, burst=2, clock=lambda: now[0], sleep=fake_sleep)
+    for _ in range(4):
+        limiter.acquire()
+
+    # Ráfaga de 2 sin espera; luego una llamada por segundo
+    assert sleeps == [1.0, 1.0]
+    assert limiter.stats()["acquired"] == 4
+    assert RateLimiter(rate_per_minute=0).acquire() == 0.0
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_load_sources_from_directory_and_jsonl()
+    test_batch_deduplicates_and_completes_llm_stages()
+    test_abandoned_batch_cancels_pending_work()
+    test_broken_process_pool_is_replaced()
+    test_rate_limiter_paces_calls()
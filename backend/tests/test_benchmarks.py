@@ -0,0 +1,69 @@
+import sys
+import os
+import io
+import contextlib
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import bench_suite
+from src import main
+from src.main import analyze_static
+
+def test_corpus_grows_in_depth_and_size():
+    corpus = dict(bench_suite.load_corpus())
+    for name in ("FIBONACCI_TEST", "HANOI", "MATRIZ_TEST", "MERGE_SORT"):
+        assert name in corpus
+    with contextlib.redirect_stdout(io.StringIO()):
+        deepest = analyze_static(corpus["PROFUNDO_6"])
+        longest = analyze_static(corpus["LARGO_200"])
+    assert deepest["complexity_calculated"] == "Theta(n^6)"
+    assert longest["syntax_errors"] == 0
+
+def test_suite_measures_every_stage_with_fake_llm():
+    corpus = [(name, code) for name, code in bench_suite.load_corpus() if name in ("FIBONACCI_TEST", "PROFUNDO_2")]
+    real_get_llm_client = main.get_llm_client
+    results = bench_suite.run_suite(corpus, repeat=1)
+    assert main.get_llm_client is real_get_llm_client # Se restaura el cliente real
+    assert set(results) == set(bench_suite.STAGES)
+    for stage in ("lex", "parse", "cost", "e2e"):
+        assert set(results[stage]) == {"FIBONACCI_TEST", "PROFUNDO_2"}
+    # solve_recurrence solo aplica a los programas recursivos
+    assert set(results["solve"]) == {"FIBONACCI_TEST"}
+
+def test_compare_scales_baseline_and_flags_regressions():
+    baseline = {"calibration_ms": 10.0, "results": {"cost": {"A": 10.0, "B": 10.0}, "parse": {"A": 1.0}}}
+    results = {"cost": {"A": 25.0, "B": 35.0, "NUEVO": 100.0}, "parse": {"A": 1.4}}
+    # Máquina 1.5x más lenta: límite de cost = 10 * 1.5 * 2 + 0.5 = 30.5
+    regressions = bench_suite.compare(results, baseline, calibration_ms=15.0, tolerance=1.0)
+    assert [(stage, name) for stage, name, _, _ in regressions] == [("cost", "B")]
+    assert bench_suite.compare(results, baseline, calibration_ms=15.0, tolerance=2.0) == []
+
+def test_e2e_noise_is_not_a_regression():
+    # e2e / PROFUNDO_4 medido en 24.00 ms contra una línea base de ~11.45 ms escalada
+    baseline = {"calibration_ms": 10.0, "results": {"e2e": {"PROFUNDO_4": 11.45}, "cost": {"PROFUNDO_4": 11.45}}}
+    results = {"e2e": {"PROFUNDO_4": 24.0}, "cost": {"PROFUNDO_4": 24.0}}
+    regressions = bench_suite.compare(results, baseline, calibration_ms=10.0, tolerance=1.0)
+    assert [(stage, name) for stage, name, _, _ in regressions] == [("cost", "PROFUNDO_4")]
+    # Una regresión real (más del triple) en e2e sí se reporta
+    results["e2e"]["PROFUNDO_4"] = 40.0
+    assert ("e2e", "PROFUNDO_4") in [(stage, name) for stage, name, _, _ in
+                                     bench_suite.compare(results, baseline, calibration_ms=10.0, tolerance=1.0)]
+
+def test_baseline_covers_corpus():
+    baseline = bench_suite.load_baseline()
+    assert baseline is not None and baseline["calibration_ms"] > 0
+    names = [name for name, _ in bench_suite.load_corpus()]
+    for stage in ("lex", "parse", "cost", "e2e"):
+        assert sorted(baseline["results"][stage]) == sorted(names), stage
+    assert {"FIBONACCI_TEST", "HANOI", "MERGE_SORT"} <= set(baseline["results"]["solve"])
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_corpus_grows_in_depth_and_size()
+    test_suite_measures_every_stage_with_fake_llm()
+    test_compare_scales_baseline_and_flags_regressions()
+    test_e2e_noise_is_not_a_regression()
+    test_baseline_covers_corpus()
@@ -0,0 +1,55 @@
+import sys
+import os
+import io
+import contextlib
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sympy import sqrt
+from src.analysis.MathEngine import MathEngine
+from src.analysis.RecurrenceSolver import dominant_root, polynomial_roots, _aberth_roots
+
+def _solve(lags):
+    engine = MathEngine()
+    n, T = engine.n, engine.T
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engine._solve_characteristic_equation([c * T(n - lag) for lag, c in lags])
+
+def test_dominant_root_snaps_exact_values():
+    root, multiplicity, _, (expr, label) = dominant_root([1, -1, -1]) # Fibonacci
+    assert multiplicity == 1 and expr == (1 + sqrt(5)) / 2 and label == "1.618"
+    root, multiplicity, _, (expr, label) = dominant_root([1, -3, 3, -1]) # (r - 1)^3
+    assert multiplicity == 3 and expr == 1 and label == "1"
+    root, multiplicity, _, (expr, label) = dominant_root([1, -6, 12, -8]) # (r - 2)^3
+    assert multiplicity == 3 and expr == 2 and root == 2
+    _, multiplicity, _, (expr, label) = dominant_root([1, 0, -2])
+    assert multiplicity == 1 and expr == sqrt(2) and label == "√2"
+
+def test_aberth_matches_polynomial_roots():
+    coefficients = [1, -2, -1, 2] # (r - 1)(r + 1)(r - 2)
+    for roots in (polynomial_roots(coefficients), _aberth_roots(coefficients)):
+        assert sorted(round(r.real, 6) for r in roots) == [-1, 1, 2]
+
+def test_characteristic_equation_results():
+    assert _solve([(1, 1), (2, 1)])["complexity"] == "Θ(1.618^n)"
+    # Raíz repetida: factor polinómico en lugar de la base 1
+    assert _solve([(1, 3), (2, -3), (3, 1)])["complexity"] == "Θ(n^2)"
+    assert _solve([(1, 3), (2, -3), (3, 1)])["details"]["multiplicity"] == 3
+    # Raíces -1 y 1 con igual módulo: sin exp(I*pi*n)
+    assert _solve([(2, 1)])["complexity"] == "Θ(1)"
+
+def test_high_order_is_deterministic():
+    lags = [(lag, 1) for lag in range(1, 11)]
+    first = _solve(lags)
+    assert first["complexity"] == "Θ(1.999^n)"
+    assert len(first["details"]["roots"]) == 10
+    assert all(_solve(lags) == first for _ in range(3))
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_dominant_root_snaps_exact_values()
+    test_aberth_matches_polynomial_roots()
+    test_characteristic_equation_results()
+    test_high_order_is_deterministic()
@@ -0,0 +1,98 @@
+import sys
+import os
+import errno
+import socket
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cache.MemoryCache import MemoryCache
+from src.llm_integration.CircuitBreaker import CircuitBreaker
+from src.llm_integration.LLM_Client import LLMClient, _is_connectivity_error
+from src.llm_integration.ResponseCache import ResponseCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    # Pasado el reset_timeout se permite una sola llamada de prueba
+    clock.now = 11
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    # La prueba falla: vuelve a OPEN
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Nueva prueba exitosa: CLOSED
+    clock.now = 22
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+class OfflineModel:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, request_options=None):
+        self.calls += 1
+        raise ConnectionError("Failed to establish a new connection")
+
+def test_offline_calls_short_circuit():
+    previous_key = os.environ.get("GEMINI_API_KEY")
+    os.environ["GEMINI_API_KEY"] = "" # Evita configurar el SDK real
+    try:
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client = LLMClient(response_cache=ResponseCache(MemoryCache()), circuit_breaker=breaker)
+    finally:
+        if previous_key is None:
+            del os.environ["GEMINI_API_KEY"]
+        else:
+            os.environ["GEMINI_API_KEY"] = previous_key
+    client.model = OfflineModel()
+
+    for _ in range(5):
+        response = client.validate_complexity("ALGO(n) begin x <- 1; end")
+        assert response.startswith("Error")
+
+    # Solo los dos primeros intentos llegan a la "red"; el resto responde al instante
+    assert client.model.calls == 2
+    assert breaker.stats()["rejected"] == 3
+    assert "Modo Offline" in client.validate_complexity("otro")
+
+def test_only_network_failures_trip_the_breaker():
+    class ServiceUnavailable(Exception): pass # Como google.api_core.exceptions (sin importar el SDK)
+    class DeadlineExceeded(Exception): pass
+
+    assert _is_connectivity_error(ConnectionRefusedError("refused"))
+    assert _is_connectivity_error(socket.gaierror(-2, "Name or service not known"))
+    assert _is_connectivity_error(ServiceUnavailable("503 DNS resolution failed"))
+    assert _is_connectivity_error(OSError(errno.ENETUNREACH, "Network is unreachable"))
+    # Modelo lento o mensajes que solo mencionan la red: no es estar offline
+    assert not _is_connectivity_error(DeadlineExceeded("504 Deadline Exceeded"))
+    assert not _is_connectivity_error(TimeoutError("timed out"))
+    assert not _is_connectivity_error(ValueError("Connection parameters are invalid"))
+    assert not _is_connectivity_error(OSError(errno.ENOENT, "No such file"))
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_breaker_opens_and_half_opens()
+    test_offline_calls_short_circuit()
+    test_only_network_failures_trip_the_breaker()
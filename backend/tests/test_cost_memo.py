@@ -0,0 +1,83 @@
+import sys
+import os
+from collections import Counter
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parsing.ParseDriver import parse_program
+from src.analysis.CostCalculator import CostCalculator
+
+def _dispatch_counter(calculator):
+    """Cuenta cuántas veces se evalúa cada nodo (por identidad) en la calculadora."""
+    evaluated = Counter()
+    real_dispatch = calculator._dispatch
+
+    def dispatch(node):
+        evaluated[id(node)] += 1
+        return real_dispatch(node)
+
+    calculator._dispatch = dispatch
+    return evaluated
+
+def test_each_node_evaluated_once():
+    # Ningún argumento depende de n: el respaldo de visitCall vuelve al primero
+    source = """PARTE(A, n)
+begin
+    If (n <= 1) then
+    begin
+        return 0;
+    end;
+    x <- (n + 1) * (n + 1);
+    CALL PARTE(A, 2);
+    return x;
+end"""
+    calculator = CostCalculator()
+    evaluated = _dispatch_counter(calculator)
+    result = calculator.visit(parse_program(source, use_cache=False).ast)
+    stats = calculator.stats()
+
+    # Respaldo heredado: el tamaño es el primer argumento
+    assert "T(A)" in str(result.recurrence_eq)
+    # El respaldo reutiliza el valor ya calculado de A en vez de volver a evaluarlo
+    assert evaluated and max(evaluated.values()) == 1
+    assert stats["memo_hits"] > 0
+    assert sum(stats["visits"].values()) == sum(evaluated.values())
+
+def test_identical_loops_are_summed_once():
+    source = """DOBLE(A, n)
+begin
+    for i <- 1 to n do
+    begin
+        x <- x + A[i];
+    end;
+    for i <- 1 to n do
+    begin
+        x <- x + A[i];
+    end;
+end"""
+    calculator = CostCalculator()
+    summed = []
+    real_sum_loop = calculator.math.sum_loop
+    calculator.math.sum_loop = lambda *args: summed.append(args) or real_sum_loop(*args)
+    result = calculator.visit(parse_program(source, use_cache=False).ast)
+
+    assert len(set(summed)) == len(summed) # Ninguna suma se repite
+    assert calculator.stats()["memo_hits"] > 0
+    assert result.worst_case == CostCalculator().visit(parse_program(source, use_cache=False).ast).worst_case
+
+def test_memo_does_not_change_results():
+    with open(os.path.join(os.path.dirname(__file__), 'BURBUJA.txt'), 'r', encoding='utf-8') as f:
+        tree = parse_program(f.read(), use_cache=False).ast
+
+    first, second = CostCalculator(), CostCalculator()
+    assert first.visit(tree).worst_case == second.visit(tree).worst_case
+    # Calculadoras distintas no comparten memoización
+    assert first.stats() == second.stats()
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_each_node_evaluated_once()
+    test_identical_loops_are_summed_once()
+    test_memo_does_not_change_results()
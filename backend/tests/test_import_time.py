@@ -0,0 +1,83 @@
+import sys
+import os
+import ast
+import subprocess
+import importlib.util
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Presupuesto de `import src.main` (acumulado según -X importtime). Medido en
+# ~35 ms sin SymPy ni el parser; el margen cubre máquinas lentas de CI.
+IMPORT_BUDGET_MS = 150
+
+# Módulos que importar src.main no debe cargar (se difieren al primer uso)
+DEFERRED_MODULES = ("sympy", "mpmath", "antlr4", "dotenv", "google.generativeai",
+                    "src.parsing.PseudoCodeAnalyzerParser", "src.analysis.MathEngine")
+
+# Módulos de gráficas que gui_app solo importa al dibujar
+PLOTTING_MODULES = ("matplotlib", "numpy")
+
+def _run(code, importtime=False):
+    args = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    return subprocess.run(args, cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+def _import_times(stderr):
+    """{módulo: ms acumulados} a partir de la salida de -X importtime."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return times
+
+def test_main_import_is_within_budget():
+    times = _import_times(_run("import src.main", importtime=True).stderr)
+    assert times["src.main"] < IMPORT_BUDGET_MS, f"import src.main: {times['src.main']:.0f} ms"
+    for module in DEFERRED_MODULES:
+        assert module not in times, module
+
+def test_static_analysis_never_loads_llm_sdk():
+    code = (
+        "import sys, io, contextlib\n"
+        "from src.main import analyze_static\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    result = analyze_static(open('tests/BURBUJA.txt', encoding='utf-8').read())\n"
+        "print(result['complexity_calculated'])\n"
+        "print(','.join(m for m in ('google.generativeai', 'google.genai', 'dotenv') if m in sys.modules))\n"
+    )
+    complexity, loaded = _run(code).stdout.splitlines()[-2:]
+    assert "n^2" in complexity
+    assert loaded == ""
+
+def test_gui_defers_plotting_imports():
+    # Estático: funciona aunque customtkinter/matplotlib no estén instalados
+    with open(os.path.join(BACKEND_DIR, "gui_app.py"), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    top_level = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            top_level.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            top_level.add(node.module.split(".")[0])
+    for module in PLOTTING_MODULES:
+        assert module not in top_level, module
+
+    # Sin la GUI instalada no se puede medir la importación real
+    if importlib.util.find_spec("customtkinter") is not None:
+        times = _import_times(_run("import gui_app", importtime=True).stderr)
+        for module in PLOTTING_MODULES:
+            assert module not in times, module
+        # Lo que no es Tk (src.main, re...) entra en el mismo presupuesto
+        tk_ms = sum(times.get(name, 0) for name in ("customtkinter", "tkinter"))
+        assert times["gui_app"] - tk_ms < IMPORT_BUDGET_MS, f"import gui_app (sin Tk): {times['gui_app'] - tk_ms:.0f} ms"
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_main_import_is_within_budget()
+    test_static_analysis_never_loads_llm_sdk()
+    test_gui_defers_plotting_imports()
@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.execution.IncrementalSession import IncrementalSession
+from src.main import analyze_static
+
+FIELDS = ("algorithm_name", "complexity_calculated", "recurrence_relation", "line_by_line", "explanation")
+
+def _read_test_file(name):
+    with open(os.path.join(os.path.dirname(__file__), name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _assert_matches_full_analysis(summary, source):
+    expected = analyze_static(source)
+    for field in FIELDS:
+        assert summary[field] == expected[field], field
+
+def test_edit_reparses_only_the_statement():
+    source = _read_test_file("BURBUJA.txt")
+    session = IncrementalSession()
+
+    first = session.update(source)
+    assert first["incremental"]["reparse"] == "full"
+
+    # Cambio dentro del If: se re-parsea solo esa sentencia y se reusan sus hermanas
+    edited = source.replace("temp <- A[j];", "temp <- A[j] + 1;")
+    second = session.update(edited)
+    assert second["incremental"]["reparse"] == "statement"
+    assert second["incremental"]["reused_statements"] >= 1
+    _assert_matches_full_analysis(second, edited)
+
+    # Líneas nuevas al inicio: mismos tokens, costos reutilizados con las líneas corridas
+    shifted = "\n\n" + edited
+    third = session.update(shifted)
+    assert third["incremental"]["reparse"] == "none"
+    assert third["incremental"]["recomputed_statements"] == 0
+    _assert_matches_full_analysis(third, shifted)
+
+def test_typing_sequence_matches_full_analysis():
+    source = _read_test_file("MERGE_SORT.txt")
+    lines = source.split("\n")
+    insert_at = max(i for i, line in enumerate(lines) if line.strip() == "begin") + 1
+    session = IncrementalSession()
+    session.update(source)
+
+    # Estados intermedios inválidos incluidos: se vuelve al parsing completo
+    statement = "x <- x + n;"
+    for end in range(1, len(statement) + 1):
+        typed = "\n".join(lines[:insert_at] + ["        " + statement[:end]] + lines[insert_at:])
+        summary = session.update(typed)
+        _assert_matches_full_analysis(summary, typed)
+        assert summary["syntax_errors"] == analyze_static(typed)["syntax_errors"]
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_edit_reparses_only_the_statement()
+    test_typing_sequence_matches_full_analysis()
@@ -0,0 +1,81 @@
+import sys
+import os
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.llm_integration.LLM_Client as llm_module
+from src.cache.MemoryCache import MemoryCache
+from src.llm_integration.CircuitBreaker import CircuitBreaker
+from src.llm_integration.LLM_Client import LLMClient, get_llm_client
+from src.llm_integration.ResponseCache import ResponseCache
+
+class FakeModelInfo:
+    def __init__(self, name):
+        self.name = name
+        self.supported_generation_methods = ['generateContent']
+
+class FakeResponse:
+    text = "Theta(n)"
+
+class FakeGenerativeModel:
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, prompt, request_options=None):
+        return FakeResponse()
+
+class FakeGenAI:
+    """Sustituye al SDK: cuenta cuántas veces se listan los modelos."""
+    def __init__(self):
+        self.list_calls = 0
+        self.GenerativeModel = FakeGenerativeModel
+
+    def configure(self, api_key):
+        pass
+
+    def list_models(self, request_options=None):
+        self.list_calls += 1
+        return [FakeModelInfo('models/gemini-pro'), FakeModelInfo('models/gemini-1.5-flash')]
+
+def test_shared_client_is_singleton():
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(get_llm_client())) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert all(c is clients[0] for c in clients)
+
+def test_model_resolved_once_on_first_use():
+    fake = FakeGenAI()
+    original_genai = llm_module.genai
+    previous_key = os.environ.get("GEMINI_API_KEY")
+    llm_module.genai = fake
+    os.environ["GEMINI_API_KEY"] = "clave-de-prueba"
+    try:
+        client = LLMClient(response_cache=ResponseCache(MemoryCache()), circuit_breaker=CircuitBreaker())
+        # Crear el cliente no hace llamadas de red
+        assert fake.list_calls == 0
+
+        threads = [threading.Thread(target=client.validate_complexity, args=(f"ALGO{i}(n)",)) for i in range(6)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        assert fake.list_calls == 1
+        assert client.model_name == 'models/gemini-1.5-flash'
+
+        # Refresco en segundo plano (ej. al arrancar la API)
+        client.resolve_model_async().join()
+        assert fake.list_calls == 2
+    finally:
+        llm_module.genai = original_genai
+        if previous_key is None:
+            del os.environ["GEMINI_API_KEY"]
+        else:
+            os.environ["GEMINI_API_KEY"] = previous_key
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_shared_client_is_singleton()
+    test_model_resolved_once_on_first_use()
@@ -0,0 +1,89 @@
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cache.MemoryCache import MemoryCache
+from src.cache.SQLiteCache import SQLiteCache
+from src.llm_integration.LLM_Client import LLMClient
+from src.llm_integration.ResponseCache import ResponseCache
+
+class FakeUsage:
+    total_token_count = 120
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = FakeUsage()
+
+class FakeModel:
+    """Modelo falso que cuenta las llamadas a la 'red'."""
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, request_options=None):
+        self.calls += 1
+        return FakeResponse("T(n) = n log n")
+
+def _offline_client(cache):
+    previous_key = os.environ.get("GEMINI_API_KEY")
+    os.environ["GEMINI_API_KEY"] = "" # Evita configurar el SDK real
+    try:
+        client = LLMClient(response_cache=cache)
+    finally:
+        if previous_key is None:
+            del os.environ["GEMINI_API_KEY"]
+        else:
+            os.environ["GEMINI_API_KEY"] = previous_key
+    client.model = FakeModel()
+    client.model_name = "models/gemini-1.5-flash"
+    return client
+
+def test_repeated_subprompt_hits_cache():
+    cache = ResponseCache(MemoryCache(max_entries=16))
+    client = _offline_client(cache)
+
+    first = client.solve_recurrence_steps("T(n) = 2T(n/2) + n")
+    second = client.solve_recurrence_steps("T(n) = 2T(n/2) + n")
+    other = client.solve_recurrence_steps("T(n) = T(n-1) + 1")
+
+    assert first == second == "T(n) = n log n"
+    assert other == "T(n) = n log n"
+    assert client.model.calls == 2
+    assert client.total_tokens_used == 240
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["tokens_saved"] == 120
+
+def test_fingerprint_includes_system_instruction():
+    a = ResponseCache.fingerprint("gemini-1.5-flash", "Experto", "prompt")
+    b = ResponseCache.fingerprint("models/gemini-1.5-flash", "Experto", "prompt")
+    c = ResponseCache.fingerprint("gemini-1.5-flash", "Generador", "prompt")
+    assert a == b
+    assert a != c
+
+def test_persistent_backend():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "llm.db")
+
+        disk = SQLiteCache(db_path, table="llm_responses")
+        client = _offline_client(ResponseCache(MemoryCache(), disk))
+        client.validate_complexity("ALGO(n) begin x <- 1; end")
+        disk.close()
+
+        # Proceso "nuevo": memoria vacía, la respuesta sale de SQLite
+        disk = SQLiteCache(db_path, table="llm_responses")
+        client = _offline_client(ResponseCache(MemoryCache(), disk))
+        client.validate_complexity("ALGO(n) begin x <- 1; end")
+        assert client.model.calls == 0
+        disk.close()
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_repeated_subprompt_hits_cache()
+    test_fingerprint_includes_system_instruction()
+    test_persistent_backend()
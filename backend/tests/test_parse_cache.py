@@ -0,0 +1,100 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parsing import ParseCache as ParseCacheModule
+from src.parsing.ParseCache import ParseCache, get_parse_cache
+from src.parsing.ParseDriver import parse_program
+from src.main import analyze_static
+
+SOURCE = """SUMA_CACHE(A, n)
+begin
+    s <- 0;
+    for i <- 1 to n do
+    begin
+        s <- s + A[i];
+    end;
+    return s;
+end"""
+
+# Mismos tokens: otra indentación, líneas en blanco y comentarios
+REFORMATTED = """// Suma de un arreglo
+
+SUMA_CACHE(A, n)
+begin
+  s <- 0; // acumulador
+
+  for i <- 1 to n do
+  begin
+      s <- s + A[i];
+  end;
+  return s;
+end"""
+
+def test_whitespace_and_comments_hit_cache():
+    cache = get_parse_cache()
+    first = parse_program(SOURCE)
+    hits = cache.stats()["hits"]
+
+    second = parse_program(REFORMATTED)
+    assert second.cached
+    assert second.ast is first.ast and second.tree is None
+    assert cache.stats()["hits"] == hits + 1
+
+    # Cambiar un token sí produce otro árbol
+    other = parse_program(SOURCE.replace("s + A[i]", "s + 2 * A[i]"))
+    assert not other.cached and other.ast is not first.ast
+
+def test_cached_tree_reports_current_lines():
+    original = analyze_static(SOURCE)
+    reformatted = analyze_static(REFORMATTED)
+
+    assert reformatted["complexity_calculated"] == original["complexity_calculated"]
+    lines = lambda summary: sorted(item["line"] for item in summary["line_by_line"])
+    # `s <- 0` pasa de la línea 3 a la 5, el for de la 4 a la 7, etc.
+    assert lines(original) == [3, 4, 6, 8]
+    assert lines(reformatted) == [5, 7, 9, 11]
+
+def test_lru_eviction():
+    cache = ParseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None # El menos usado recientemente
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_size_zero_disables_cache():
+    real = ParseCacheModule._parse_cache, ParseCacheModule._parse_cache_ready
+    real_size = os.environ.get("PARSE_CACHE_SIZE")
+    real_make_key = ParseCache.make_key
+    hashed = []
+    os.environ["PARSE_CACHE_SIZE"] = "0"
+    ParseCacheModule._parse_cache, ParseCacheModule._parse_cache_ready = None, False
+    ParseCache.make_key = staticmethod(lambda tokens: hashed.append(tokens) or real_make_key(tokens))
+    try:
+        assert get_parse_cache() is None
+        first = parse_program(SOURCE)
+        second = parse_program(SOURCE)
+    finally:
+        ParseCache.make_key = staticmethod(real_make_key)
+        ParseCacheModule._parse_cache, ParseCacheModule._parse_cache_ready = real
+        if real_size is None:
+            os.environ.pop("PARSE_CACHE_SIZE", None)
+        else:
+            os.environ["PARSE_CACHE_SIZE"] = real_size
+
+    assert not first.cached and not second.cached
+    assert hashed == [] # Sin caché no se calcula la clave
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_whitespace_and_comments_hit_cache()
+    test_cached_tree_reports_current_lines()
+    test_lru_eviction()
+    test_size_zero_disables_cache()
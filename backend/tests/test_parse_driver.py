@@ -0,0 +1,67 @@
+import sys
+import os
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from antlr4 import CommonTokenStream, InputStream
+from src.parsing.PseudoCodeAnalyzerLexer import PseudoCodeAnalyzerLexer
+from src.parsing.PseudoCodeAnalyzerParser import PseudoCodeAnalyzerParser
+from src.parsing.ParseDriver import parse_program, parser_pool_stats, warm_up
+
+def _parse_ll(source):
+    parser = PseudoCodeAnalyzerParser(CommonTokenStream(PseudoCodeAnalyzerLexer(InputStream(source))))
+    parser.removeErrorListeners()
+    tree = parser.program()
+    return parser, tree
+
+def test_valid_program_parses_in_sll():
+    with open(os.path.join(os.path.dirname(__file__), 'MERGE_SORT.txt'), 'r', encoding='utf-8') as f:
+        source = f.read()
+
+    result = parse_program(source, use_cache=False)
+    parser, tree = _parse_ll(source)
+
+    assert result.mode == "SLL"
+    assert result.syntax_errors == 0
+    # Mismo árbol que con LL completo
+    assert result.tree.toStringTree(recog=parser) == tree.toStringTree(recog=parser)
+
+def test_invalid_program_falls_back_to_ll():
+    source = "ROTO(n)\nbegin\n    x <- ;\n    for i <- 1 to n do\n    begin\n        y <- y + 1;\n    end;\nend"
+
+    result = parse_program(source, use_cache=False)
+    parser, _ = _parse_ll(source)
+
+    assert result.mode == "LL"
+    # Los errores se cuentan igual que antes (recuperación por defecto)
+    assert result.syntax_errors == parser.getNumberOfSyntaxErrors() > 0
+    assert result.tree is not None
+
+def test_parser_reused_per_thread():
+    warm_up()
+    created = parser_pool_stats()["parsers_created"]
+
+    first = parse_program("A(n)\nbegin\n    x <- n + 1;\nend", use_cache=False)
+    first_text = first.tree.getText()
+    second = parse_program("B(n)\nbegin\n    for i <- 1 to n do\n    begin\n        y <- i;\n    end;\nend", use_cache=False)
+
+    # Mismo hilo: se reutilizan las instancias y los árboles anteriores siguen intactos
+    assert parser_pool_stats()["parsers_created"] == created
+    assert first.tree.getText() == first_text
+    assert second.mode == "SLL" and "B(n)" in second.tree.getText()
+
+    # Otro hilo: obtiene su propio lexer/parser
+    thread = threading.Thread(target=parse_program, args=("C(n)\nbegin\n    x <- 1;\nend",))
+    thread.start()
+    thread.join()
+    assert parser_pool_stats()["parsers_created"] == created + 1
+    assert parser_pool_stats()["warmup_ms"] is not None
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_valid_program_parses_in_sll()
+    test_invalid_program_falls_back_to_ll()
+    test_parser_reused_per_thread()
@@ -0,0 +1,73 @@
+import sys
+import os
+import io
+import contextlib
+import multiprocessing
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cache.MemoryCache import MemoryCache
+from src.cache.ResultCache import ResultCache
+from src.execution.ProcessBackend import ProcessAnalysisBackend
+from src.main import analyze_static
+
+TESTS_DIR = os.path.dirname(__file__)
+
+def _read(name):
+    with open(os.path.join(TESTS_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+class FakeLLMClient:
+    """Cliente LLM falso que cuenta las validaciones pedidas."""
+    def __init__(self):
+        self.validations = 0
+
+    def validate_complexity(self, code):
+        self.validations += 1
+        return '{"complexity": "Theta(n log n)", "method": "Teorema Maestro", "reasoning": ["Divide y vencerás"]}'
+
+    def solve_recurrence_steps(self, eq):
+        return "T(n) = ..."
+
+    def generate_recursion_tree(self, code):
+        return '{"root": {"label": "f(n)", "children": []}}'
+
+    def generate_trace_table(self, code):
+        return "| Paso | Nivel_Pila | Función | Variables |"
+
+def test_static_results_match_in_process_analysis():
+    backend = ProcessAnalysisBackend(workers=2, max_tasks_per_child=2)
+    try:
+        backend.start(wait=True)
+        assert len(multiprocessing.active_children()) >= 2
+        # 2 análisis por worker: los 5 pasan por al menos un reemplazo de proceso
+        for name in ("BURBUJA.txt", "MERGE_SORT.txt", "FIBONACCI_TEST.txt", "HANOI.txt", "MATRIZ_TEST.txt"):
+            code = _read(name)
+            with contextlib.redirect_stdout(io.StringIO()):
+                expected = analyze_static(code)
+            assert backend.analyze_static(code) == expected, name
+        assert backend.stats()["submitted"] == 5 and backend.stats()["failed"] == 0
+    finally:
+        backend.close()
+
+def test_full_mode_runs_llm_stages_in_caller_and_caches():
+    cache = ResultCache(MemoryCache())
+    llm_client = FakeLLMClient()
+    backend = ProcessAnalysisBackend(workers=1, result_cache=cache)
+    code = _read("MERGE_SORT.txt")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = backend.analyze_source(code, mode="full", llm_client=llm_client)
+            second = backend.analyze_source(code, mode="full", llm_client=llm_client)
+    finally:
+        backend.close()
+    assert first["mode"] == "full" and first["complexity_validated"] != "Desconocida"
+    assert second == first and llm_client.validations == 1
+    assert backend.stats()["submitted"] == 1
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_static_results_match_in_process_analysis()
+    test_full_mode_runs_llm_stages_in_caller_and_caches()
@@ -0,0 +1,108 @@
+import sys
+import os
+import io
+import contextlib
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sympy import Max, log
+from src.analysis.MathEngine import MathEngine
+from src.analysis.RecurrenceSolver import RecurrenceSolver, KNOWN_MASTER, KNOWN_LINEAR
+from src.analysis.AsymptoticCost import AsymptoticCost
+
+def test_canonical_forms():
+    engine = MathEngine()
+    n, T = engine.n, engine.T
+
+    # El caso base (rama sin T del Max) no entra en la recurrencia
+    form = RecurrenceSolver.canonicalize(Max(0, 2*n + 2*T(n/2) + 4) + 3, n, T)
+    assert form == ("master", 2, 2, 2*n + 7)
+    assert RecurrenceSolver.canonicalize(Max(2, T(n - 2) + T(n - 1) + 1) + 3, n, T) == ("linear", ((1, 1), (2, 1)), 4)
+    assert RecurrenceSolver.canonicalize(T(n - 1) + T(n/2), n, T) is None
+    assert RecurrenceSolver.canonicalize(n*T(n - 1) + 1, n, T) is None
+    assert RecurrenceSolver.canonicalize(n + 1, n, T) is None
+
+def test_tables_match_exact_solvers():
+    engine = MathEngine()
+    n, T = engine.n, engine.T
+    solver = RecurrenceSolver()
+    for (a, b, degree, log_power), case in KNOWN_MASTER.items():
+        f_n = n**degree * log(n)**log_power + 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            exact = engine._master_theorem(a, b, f_n)
+        assert exact["details"]["case"] == case, (a, b, degree, log_power)
+        # La clasificación por clase de f(n) (formas fuera de la tabla) coincide
+        assert RecurrenceSolver._classify(AsymptoticCost.from_expr(f_n, n), float(log(a, b))) == case
+        assert solver.master_case(a, b, f_n, n)[0] == case
+    for lags, result in KNOWN_LINEAR.items():
+        with contextlib.redirect_stdout(io.StringIO()):
+            exact = engine._solve_characteristic_equation([c * T(n - lag) for lag, c in lags])
+        assert exact == result, lags
+
+def test_results_are_cached():
+    engine = MathEngine()
+    n, T = engine.n, engine.T
+    engine.recurrences = RecurrenceSolver()
+
+    first = engine.solve_recurrence(5*T(n/3) + n**2 + n)
+    assert first["details"]["case"] == 3 and first["complexity"] == n**2 + n
+    misses = engine.recurrences.misses
+    second = engine.solve_recurrence(5*T(n/3) + 4*n**2)
+    assert second["details"]["case"] == 3 and second["complexity"] == 4*n**2
+    assert engine.recurrences.misses == misses and engine.recurrences.hits >= 1
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tribonacci = engine.solve_recurrence(T(n - 1) + T(n - 2) + T(n - 3))
+    again = engine.solve_recurrence(T(n - 3) + T(n - 2) + T(n - 1) + 7)
+    assert again == tribonacci
+    again["details"]["lags"].append(99) # Los resultados entregados son copias
+    assert engine.solve_recurrence(T(n - 1) + T(n - 2) + T(n - 3))["details"]["lags"] == [1, 2, 3]
+def test_linear_recurrences_account_for_f():
+    engine = MathEngine()
+    n, T = engine.n, engine.T
+    engine.recurrences = RecurrenceSolver()
+    fmt = engine.format_complexity
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Raíz dominante 1: cada nivel aporta f(n)
+        assert fmt(engine.solve_recurrence(T(n - 1) + 3)["complexity"]) == "Theta(n)"
+        assert fmt(engine.solve_recurrence(T(n - 1) + n)["complexity"]) == "Theta(n^2)"
+        assert fmt(engine.solve_recurrence(T(n - 2) + n**2)["complexity"]) == "Theta(n^3)"
+        # La homogénea domina a f(n) polinómica
+        assert engine.solve_recurrence(2*T(n - 1) + 1)["complexity"] == "Θ(2^n)"
+        assert engine.solve_recurrence(T(n - 1) + T(n - 2) + n)["complexity"] == "Θ(1.618^n)"
+        # f(n) exponencial: domina o comparte base con la raíz
+        assert fmt(engine.solve_recurrence(T(n - 1) + 3**n)["complexity"]) == "Theta((3)^n)"
+        assert fmt(engine.solve_recurrence(2*T(n - 1) + 2**n)["complexity"]) == "Theta(n (2)^n)"
+        # Sin f(n): solo la parte homogénea
+        assert engine.solve_recurrence(T(n - 1))["complexity"] == "Θ(1)"
+
+    # n * FACTORIAL(n-1): n es un valor, no multiplica el costo de la llamada
+    from src.main import analyze_static
+    with open(os.path.join(os.path.dirname(__file__), "FACTORIAL.txt"), "r", encoding="utf-8") as f:
+        code = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        factorial = analyze_static(code)
+    assert "n*T" not in factorial["recurrence_relation"]
+    assert factorial["complexity_calculated"] in ("O(n)", "Theta(n)")
+
+def test_extended_master_case_two():
+    engine = MathEngine()
+    n, T = engine.n, engine.T
+    engine.recurrences = RecurrenceSolver()
+    result = engine.solve_recurrence(2*T(n/2) + n*log(n))
+    assert result["details"]["case"] == 2 and result["details"]["log_power"] == "1"
+    assert engine.format_complexity(result["complexity"]) == "Theta(n log n^2)"
+    assert RecurrenceSolver().master_case(4, 2, n**2*log(n)**3, n)[::2] == (2, 3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        exact = engine._master_theorem(2, 2, n*log(n)**2 + n)
+    assert exact["details"]["case"] == 2 and exact["complexity"] == n*log(n, 2)**3
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_canonical_forms()
+    test_tables_match_exact_solvers()
+    test_results_are_cached()
+    test_linear_recurrences_account_for_f()
+    test_extended_master_case_two()
@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cache.MemoryCache import MemoryCache
+from src.cache.SQLiteCache import SQLiteCache
+from src.cache.ResultCache import ResultCache
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")       # 'a' pasa a ser el más reciente
+    cache.put("c", 3)    # se desaloja 'b'
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    short = MemoryCache(max_entries=10, ttl=0.05)
+    short.put("x", "valor")
+    assert short.get("x") == "valor"
+    time.sleep(0.1)
+    assert short.get("x") is None
+
+def test_key_normalization():
+    code = "Algo(n)\nbegin\n    x <- 1;\nend"
+    messy = "Algo(n)   \r\nbegin\r\n    x <- 1;\t\r\nend\n\n"
+    assert ResultCache.make_key(code, False, "v1") == ResultCache.make_key(messy, False, "v1")
+    assert ResultCache.make_key(code, False, "v1") != ResultCache.make_key(code, True, "v1")
+    assert ResultCache.make_key(code, False, "v1") != ResultCache.make_key(code, False, "v2")
+
+def test_sqlite_tier_survives_restart():
+    summary = {"algorithm_name": "HANOI", "line_by_line": [{"line": 3, "cost": "OE: 1 -> 1"}]}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "cache.db")
+        key = ResultCache.make_key("HANOI(n)", False, "v1")
+
+        first = ResultCache(MemoryCache(), SQLiteCache(db_path, table="analysis_results"))
+        first.put(key, summary)
+        first.disk.close()
+
+        # Nueva instancia (memoria vacía): el resultado sale del disco
+        second = ResultCache(MemoryCache(), SQLiteCache(db_path, table="analysis_results"))
+        cached = second.get(key)
+        assert cached == summary
+        assert second.memory.get(key) == summary
+
+        # Modificar la copia devuelta no altera la caché
+        cached["algorithm_name"] = "OTRO"
+        assert second.get(key)["algorithm_name"] == "HANOI"
+        second.disk.close()
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_memory_cache_lru_and_ttl()
+    test_key_normalization()
+    test_sqlite_tier_survives_restart()
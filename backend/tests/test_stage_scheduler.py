@@ -0,0 +1,114 @@
+import sys
+import os
+import time
+import threading
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm_integration.StageScheduler import StageScheduler
+
+def _slow(value, delay):
+    def stage():
+        time.sleep(delay)
+        return value
+    return stage
+
+def _broken():
+    raise RuntimeError("API caída")
+
+def test_stages_run_concurrently():
+    scheduler = StageScheduler(max_workers=4)
+    start = time.monotonic()
+    results = scheduler.run({
+        "validation": _slow("v", 0.3),
+        "steps": _slow("s", 0.3),
+        "tree": _slow("t", 0.3),
+        "trace": _slow("x", 0.3),
+    })
+    elapsed = time.monotonic() - start
+
+    assert {name: r.value for name, r in results.items()} == {"validation": "v", "steps": "s", "tree": "t", "trace": "x"}
+    # En serie serían 1.2s
+    assert elapsed < 0.9
+
+def test_partial_results_on_failure_and_timeout():
+    scheduler = StageScheduler(max_workers=4)
+    results = scheduler.run(
+        {"validation": _slow("ok", 0.05), "trace": _broken, "tree": _slow("tarde", 2.0)},
+        timeouts={"tree": 0.2},
+    )
+
+    assert results["validation"].ok and results["validation"].value == "ok"
+    assert not results["trace"].ok and "API caída" in results["trace"].error
+    assert not results["tree"].ok and "Timeout" in results["tree"].error
+
+def test_timeout_starts_when_stage_starts():
+    # Un solo hilo: la segunda etapa espera en cola más que su timeout, pero
+    # su propia ejecución cabe en él
+    scheduler = StageScheduler(max_workers=1)
+    results = scheduler.run(
+        {"validation": _slow("v", 0.3), "trace": _slow("t", 0.05)},
+        timeouts={"validation": 1.0, "trace": 0.2},
+    )
+    assert results["validation"].ok and results["trace"].ok
+    assert results["trace"].elapsed < 0.2
+
+def test_abandoned_stages_do_not_starve_later_analyses():
+    release = threading.Event()
+
+    def hung():
+        release.wait(5)
+        return "tarde"
+
+    scheduler = StageScheduler(max_workers=2)
+    try:
+        first = scheduler.run({"validation": hung}, timeouts={"validation": 0.1})
+        assert "Timeout" in first["validation"].error
+        stats = scheduler.stats()
+        assert stats["abandoned_running"] == 1 and stats["pool_replacements"] == 1
+
+        # El hilo colgado sigue ocupado, pero las etapas nuevas van a un pool nuevo
+        second = scheduler.run({"validation": _slow("v", 0.05), "trace": _slow("t", 0.05)},
+                               timeouts={"validation": 0.5, "trace": 0.5})
+        assert all(r.ok for r in second.values())
+    finally:
+        release.set()
+    time.sleep(0.1)
+    assert scheduler.stats()["abandoned_running"] == 0
+    assert scheduler.stats()["timeouts"] == 1
+
+def test_pool_replacement_does_not_fail_concurrent_submits():
+    # Muchas peticiones a la vez: unas expiran (y reemplazan el pool) mientras
+    # otras lanzan etapas; ninguna debe encontrarse con un pool ya cerrado
+    scheduler = StageScheduler(max_workers=2)
+    release = threading.Event()
+    errors = []
+
+    def request():
+        try:
+            for _ in range(20):
+                results = scheduler.run({"hang": lambda: release.wait(0.05), "fast": lambda: "ok"},
+                                        timeouts={"hang": 0.001, "fast": 5})
+                assert results["fast"].value == "ok", results["fast"]
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+
+    assert errors == []
+    assert scheduler.stats()["pool_replacements"] > 0
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_stages_run_concurrently()
+    test_partial_results_on_failure_and_timeout()
+    test_timeout_starts_when_stage_starts()
+    test_abandoned_stages_do_not_starve_later_analyses()
+    test_pool_replacement_does_not_fail_concurrent_submits()
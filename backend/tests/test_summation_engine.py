@@ -0,0 +1,47 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sympy import Sum, Symbol, symbols, log, simplify, Max
+from src.analysis.SummationEngine import SummationEngine
+
+n = symbols('n', integer=True, positive=True)
+k = symbols('k', integer=True)
+
+def _check(body, start, end):
+    engine = SummationEngine()
+    closed = engine.sum_loop(body, 'k', start, end)
+    assert not closed.has(Sum), closed
+    assert simplify(closed - Sum(body, (k, start, end)).doit()) == 0, closed
+    return closed
+
+def test_closed_forms_match_sympy():
+    _check(k**3 + 2*k + 5, 1, n) # Faulhaber
+    _check(k**20, 1, n) # Fuera de lo habitual, dentro de la tabla
+    _check(k**25, 0, n) # Se amplía la tabla a demanda
+    _check(1/k, 1, n) # Armónica
+    _check(3 * 2**k * k**2, 0, n - 1) # Polinomio por geométrica
+    _check(k * 3**(k - 1), 2, n)
+    _check(4 * k * log(n, 2), 1, n) # Factores logarítmicos constantes respecto a k
+    _check(k**2, Symbol('i'), n) # Límites simbólicos
+
+def test_nested_loops_and_fallback():
+    engine = SummationEngine()
+    # Las variables llegan sin supuestos desde CostCalculator (Symbol("j"))
+    inner = engine.sum_loop(Symbol('j') + 1, 'j', 1, Symbol('i'))
+    outer = engine.sum_loop(inner, 'i', 1, n)
+    assert not outer.has(Symbol('i')) and not outer.has(symbols('i', integer=True))
+    assert simplify(outer - (n**3/6 + n**2 + 5*n/6)) == 0
+
+    # Cuerpos no estándar: se dejan como Sum de SymPy
+    fallback = engine.sum_loop(log(k) + Max(k, 2) + 1, 'k', 1, n)
+    assert fallback.has(Sum)
+    assert engine.fallback_terms == 2
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_closed_forms_match_sympy()
+    test_nested_loops_and_fallback()
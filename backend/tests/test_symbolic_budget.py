@@ -0,0 +1,76 @@
+import sys
+import os
+import io
+import time
+import threading
+import contextlib
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parsing.ParseDriver import parse_program
+from src.analysis.CostCalculator import CostCalculator
+from src.analysis.SymbolicBudget import SymbolicBudget
+
+def _spin():
+    while True:
+        sum(range(1000))
+
+def test_timeout_returns_fallback():
+    budget = SymbolicBudget(0.05)
+    budget.start()
+    start = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert budget.run("spin", _spin, lambda: "aprox") == "aprox"
+    assert time.monotonic() - start < 1
+    assert budget.degraded == ["spin"] and budget.approximate
+
+    # Vencido el plazo, las operaciones siguientes van directo al respaldo
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert budget.run("otra", lambda: "exacto", lambda: "aprox") == "aprox"
+    budget.start()
+    assert budget.run("otra", lambda: "exacto", lambda: "aprox") == "exacto"
+    assert not budget.approximate
+
+def test_timeout_in_worker_thread():
+    budget = SymbolicBudget(0.05)
+    results = []
+
+    def worker():
+        budget.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results.append(budget.run("spin", _spin, lambda: "aprox"))
+        # El hilo sigue utilizable tras la interrupción
+        budget.start()
+        results.append(budget.run("libre", lambda: "sigue vivo", lambda: None))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert results == ["aprox", "sigue vivo"]
+
+def test_unstarted_budget_has_no_limit():
+    budget = SymbolicBudget(0.01)
+    assert budget.run("lento", lambda: time.sleep(0.03) or "exacto", lambda: "aprox") == "exacto"
+    assert budget.remaining() is None
+
+def test_exhausted_budget_degrades_analysis():
+    with open(os.path.join(os.path.dirname(__file__), "MERGE_SORT.txt"), encoding="utf-8") as f:
+        parsed = parse_program(f.read())
+    calculator = CostCalculator(lines=parsed.lines)
+    calculator.math.budget.seconds = 1e-9
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = calculator.visit(parsed.ast)
+    assert result.approximate
+    assert result.worst_case.startswith("O(") and "n" in result.worst_case
+    assert "simplify" in calculator.stats()["symbolic_timeouts"]
+    assert "aproximación" in result.explanation
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_timeout_returns_fallback()
+    test_timeout_in_worker_thread()
+    test_unstarted_budget_has_no_limit()
+    test_exhausted_budget_degrades_analysis()
@@ -0,0 +1,176 @@
+import sys
+import os
+import io
+import json
+import tempfile
+import contextlib
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import main
+from src.execution import Tracing
+from src.execution.Tracing import Trace, activate, span
+from src.cache.ResultCache import get_result_cache
+from src.cache.MemoryCache import MemoryCache
+from src.llm_integration.CircuitBreaker import CircuitBreaker
+from src.llm_integration.LLM_Client import LLMClient
+from src.llm_integration.ResponseCache import ResponseCache
+
+TESTS_DIR = os.path.dirname(__file__)
+
+class FakeLLMClient:
+    """Cliente LLM sin red: respuestas fijas."""
+    def validate_complexity(self, code):
+        return '{"complexity": "O(2^n)", "method": "Test", "reasoning": ["Respuesta fija"]}'
+
+    def solve_recurrence_steps(self, eq):
+        return "T(n) = ..."
+
+    def generate_recursion_tree(self, code):
+        return '{"root": {"label": "f(n)", "children": []}}'
+
+    def generate_trace_table(self, code):
+        return "| Paso |"
+
+def _read(name):
+    with open(os.path.join(TESTS_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+def _spans(timings):
+    return {s["name"]: s for s in timings["spans"]}
+
+def test_spans_nest_and_noop_without_trace():
+    with span("sin_traza") as noop:
+        noop.set(ignored=True) # Sin traza activa no hace nada
+
+    trace = Trace("analysis")
+    with activate(trace):
+        with span("outer") as outer:
+            with span("inner", n=1):
+                pass
+            outer.set(done=True)
+    trace.finish()
+
+    spans = _spans(trace.to_dict())
+    assert spans["outer"]["parent_id"] == trace.root.span_id
+    assert spans["inner"]["parent_id"] == spans["outer"]["span_id"]
+    assert spans["inner"]["attributes"] == {"n": 1}
+    assert spans["outer"]["attributes"] == {"done": True}
+    assert Tracing.current_trace() is None
+
+def test_static_timings_are_returned_but_not_cached():
+    code = _read("BURBUJA.txt")
+    with contextlib.redirect_stdout(io.StringIO()):
+        plain = main.analyze_source(code, mode="static", use_cache=False)
+        result = main.analyze_source(code, mode="static", use_cache=False, timings=True)
+    assert "timings" not in plain
+    spans = _spans(result["timings"])
+    assert {"parse", "visit"} <= set(spans)
+    assert spans["parse"]["attributes"]["syntax_errors"] == 0
+    assert "memo_hits" in spans["visit"]["attributes"]
+    assert result["timings"]["total_ms"] >= spans["visit"]["duration_ms"]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.analyze_source(code, mode="static", timings=True)
+        cached = main.analyze_source(code, mode="static", timings=True)
+    assert _spans(cached["timings"])["result_cache"]["attributes"] == {"hit": True}
+    assert "timings" not in get_result_cache().get(main.result_cache_key(code, False, "static"))
+
+def test_llm_stages_and_solve_are_traced():
+    real_get_llm_client = main.get_llm_client
+    main.get_llm_client = lambda: FakeLLMClient()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = main.analyze_source(_read("FIBONACCI_TEST.txt"), use_cache=False, timings=True)
+    finally:
+        main.get_llm_client = real_get_llm_client
+
+    timings = result["timings"]
+    spans = _spans(timings)
+    # Las etapas corren en el pool del StageScheduler: la traza llega por el contexto
+    for name in ("stage.validation", "stage.steps", "stage.tree", "stage.trace", "solve"):
+        assert name in spans, name
+    root_id = {s["parent_id"] for s in timings["spans"]} - {s["span_id"] for s in timings["spans"]}
+    assert spans["stage.validation"]["parent_id"] in root_id
+    assert spans["solve"]["parent_id"] == spans["visit"]["span_id"]
+    assert {s["attributes"].get("stage") for s in timings["spans"] if s["name"] == "json_parse"} == {"validation", "tree"}
+
+def test_otlp_payload_and_json_export():
+    trace = Trace("analysis", mode="static")
+    with activate(trace):
+        with span("parse", cached=False, syntax_errors=0):
+            pass
+        try:
+            with span("visit"):
+                raise ValueError("fallo")
+        except ValueError:
+            pass
+
+    payload = trace.to_otlp()
+    otlp_spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in otlp_spans] == ["analysis", "parse", "visit"]
+    assert all(s["traceId"] == trace.trace_id for s in otlp_spans)
+    assert "parentSpanId" not in otlp_spans[0]
+    assert {"key": "cached", "value": {"boolValue": False}} in otlp_spans[1]["attributes"]
+    assert otlp_spans[2]["status"]["code"] == 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "traces.jsonl")
+        real_export, real_log = Tracing.TRACE_EXPORT, Tracing.TRACE_JSON_LOG
+        Tracing.TRACE_EXPORT, Tracing.TRACE_JSON_LOG = {"json"}, log_path
+        try:
+            trace.finish()
+            trace.finish() # Se exporta una sola vez
+        finally:
+            Tracing.TRACE_EXPORT, Tracing.TRACE_JSON_LOG = real_export, real_log
+        with open(log_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["trace_id"] == trace.trace_id and record["mode"] == "static"
+    assert [s["name"] for s in record["spans"]] == ["parse", "visit"]
+
+def test_llm_error_returns_mark_the_span():
+    previous_key = os.environ.get("GEMINI_API_KEY")
+    os.environ["GEMINI_API_KEY"] = "" # Sin SDK real: el cliente queda sin modelo
+    try:
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        client = LLMClient(response_cache=ResponseCache(MemoryCache()), circuit_breaker=breaker)
+    finally:
+        if previous_key is None:
+            del os.environ["GEMINI_API_KEY"]
+        else:
+            os.environ["GEMINI_API_KEY"] = previous_key
+
+    trace = Trace("analysis")
+    with activate(trace):
+        unconfigured = client.validate_complexity("ALGO(n) begin x <- 1; end")
+        client.model = object() # "Configurado", pero con el breaker abierto
+        breaker.record_failure()
+        offline = client.validate_complexity("OTRO(n) begin x <- 2; end")
+    trace.finish()
+
+    errors = [s["attributes"].get("error") for s in trace.to_dict()["spans"] if s["name"] == "llm"]
+    assert errors == [unconfigured, offline]
+    assert "no configurado" in unconfigured and "Modo Offline" in offline
+
+def test_abandoned_stream_still_finishes_trace():
+    trace = Trace("analysis", mode="static")
+    events = main.iter_analysis_events(_read("BURBUJA.txt"), use_cache=False, mode="static", trace=trace)
+    with contextlib.redirect_stdout(io.StringIO()):
+        first_event, _ = next(events)
+        events.close() # Cliente desconectado antes de "done"
+    assert first_event != "done"
+    assert trace.root.end is not None
+    assert Tracing.current_trace() is None
+
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_spans_nest_and_noop_without_trace()
+    test_static_timings_are_returned_but_not_cached()
+    test_llm_stages_and_solve_are_traced()
+    test_otlp_payload_and_json_export()
+    test_llm_error_returns_mark_the_span()
+    test_abandoned_stream_still_finishes_trace()
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import Editor from '@monaco-editor/react';
 import axios from 'axios';
 import { Play, Upload, FileCode, Network, Share2 } from 'lucide-react';
@@ -8,6 +8,10 @@ import TreeModal from './components/TreeModal';
 import './App.css';
 import ComplexityChart from './components/ComplexityChart';
 
+// Campos que entrega el análisis en vivo (solo estáticos). Al actualizarse
+// reemplazan al resultado anterior: lo que dio el LLM era de otro código.
+const LIVE_FIELDS = ['algorithm_name', 'complexity_calculated', 'recurrence_relation', 'line_by_line',
+  'master_theorem_data', 'explanation', 'syntax_errors'];
 
 
 function App() {
@@ -25,22 +29,84 @@ begin
 end`);
   const [loading, setLoading] = useState(false);
   const [results, setResults] = useState(null);
+  const [pendingStages, setPendingStages] = useState([]); // Etapas LLM aún en curso
+  const [staticMode, setStaticMode] = useState(false); // Solo análisis estático (sin IA)
+  const [liveMode, setLiveMode] = useState(false); // Costos estáticos mientras se escribe
+  const liveSession = useRef(null); // session_id de /analyze/live
+  const liveRequest = useRef(0); // Contador de pedidos: solo se aplica la respuesta más reciente
   const [error, setError] = useState(null);
   const [showTreeModal, setShowTreeModal] = useState(false);
   const [activeView, setActiveView] = useState('lines'); // lines, cases, recurrence, info, trace, environments
 
+  useEffect(() => {
+    if (!liveMode || loading) return;
+    // Espera a que se deje de escribir un momento antes de pedir el análisis
+    const timer = setTimeout(async () => {
+      const request = ++liveRequest.current;
+      try {
+        const res = await axios.post('http://localhost:8000/analyze/live', {
+          code,
+          session_id: liveSession.current
+        });
+        liveSession.current = res.data.session_id;
+        if (request !== liveRequest.current) return; // Llegó tarde: ya hay un pedido más nuevo
+        const update = {};
+        LIVE_FIELDS.forEach(field => { if (field in res.data) update[field] = res.data[field]; });
+        setResults(update);
+      } catch (err) {
+        console.error(err); // En vivo no se muestra el error: el botón Analizar sigue disponible
+      }
+    }, 400);
+    return () => clearTimeout(timer);
+  }, [code, liveMode, loading]);
+
   const handleAnalyze = async () => {
+    liveRequest.current += 1; // Descarta respuestas en vivo aún en camino
     setLoading(true);
     setError(null);
     setResults(null);
+    setPendingStages([]);
     try {
-      const response = await axios.post('http://localhost:8000/analyze', {
-        code,
-        translate: false
+      // La respuesta llega en NDJSON: una línea por etapa del análisis, así que
+      // los costos estáticos se muestran sin esperar a las etapas del LLM.
+      const response = await fetch('http://localhost:8000/analyze/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ code, translate: false, mode: staticMode ? 'static' : 'full' })
       });
 
-      const data = response.data;
+      if (!response.ok) {
+        const retryAfter = response.headers.get('Retry-After');
+        throw new Error(retryAfter
+          ? `Servidor ocupado. Intenta de nuevo en ${retryAfter}s.`
+          : `Error del servidor (${response.status})`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop(); // Línea incompleta: se completa con el siguiente bloque
+        lines.filter(line => line.trim()).forEach(line => handleStreamEvent(JSON.parse(line)));
+      }
 
+    } catch (err) {
+      setError(err.message || 'Error al conectar con el servidor');
+      console.error(err);
+    } finally {
+      setLoading(false);
+      setPendingStages([]);
+    }
+  };
+
+  const handleStreamEvent = ({ event, data }) => {
+    if (event === 'stages') {
+      setPendingStages(data.pending);
+    } else if (event === 'done') {
       // Check for API errors in the response content
       if (data.complexity_validated && typeof data.complexity_validated === 'string' && data.complexity_validated.includes("Error API")) {
         // Extract the error message
@@ -52,12 +118,10 @@ end`);
       } else {
         setResults(data);
       }
-
-    } catch (err) {
-      setError(err.message || 'Error al conectar con el servidor');
-      console.error(err);
-    } finally {
-      setLoading(false);
+    } else {
+      // Resultado parcial: se mezcla con lo recibido hasta ahora
+      setResults(prev => ({ ...(prev || {}), ...data }));
+      setPendingStages(prev => prev.filter(stage => stage !== event));
     }
   };
 
@@ -364,6 +428,25 @@ end`
           )}
         </button>
 
+        <label style={{ display: 'flex', alignItems: 'center', gap: '6px', color: 'var(--text-secondary)', fontSize: '0.9rem', cursor: 'pointer' }}>
+          <input
+            type="checkbox"
+            checked={staticMode}
+            onChange={(e) => setStaticMode(e.target.checked)}
+            disabled={loading}
+          />
+          Solo análisis estático (sin IA)
+        </label>
+
+        <label style={{ display: 'flex', alignItems: 'center', gap: '6px', color: 'var(--text-secondary)', fontSize: '0.9rem', cursor: 'pointer' }}>
+          <input
+            type="checkbox"
+            checked={liveMode}
+            onChange={(e) => setLiveMode(e.target.checked)}
+          />
+          Análisis en vivo
+        </label>
+
         {results && results.master_theorem_data && (
           <button
             className="btn btn-secondary btn-tree-visualizer"
@@ -391,7 +474,8 @@ end`
       <section className="results-section-full">
         <ResultsPanel
           data={results}
-          loading={loading}
+          loading={loading && !results}
+          pendingStages={pendingStages}
           error={error}
           activeView={activeView}
           setActiveView={setActiveView}
@@ -162,7 +162,16 @@ const TreeNode = ({ node }) => {
     );
 };
 
-const RecursionTree = ({ data }) => {
+const RecursionTree = ({ data, loading = false }) => {
+    if (loading) {
+        return (
+            <div style={{ padding: '2rem', display: 'flex', flexDirection: 'column', alignItems: 'center', color: 'var(--text-secondary)' }}>
+                <div className="spinner"></div>
+                <p style={{ marginTop: '1rem' }}>Generando el árbol de recursión...</p>
+            </div>
+        );
+    }
+
     if (!data || !data.root) {
         return (
             <div style={{ padding: '2rem', textAlign: 'center', color: 'var(--text-secondary)' }}>
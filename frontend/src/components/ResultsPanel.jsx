@@ -2,7 +2,16 @@ import React, { useState } from 'react';
 import { Activity, List, BarChart2, AlertCircle, CheckCircle, FunctionSquare, Info, Table, Bot } from 'lucide-react';
 import RecursionTree from './RecursionTree';
 
-const ResultsPanel = ({ data, loading, error, activeView, setActiveView }) => {
+// Marcador para una etapa del LLM que todavía no llega por el stream
+const PendingStage = ({ message }) => (
+    <div style={{ padding: '2rem', display: 'flex', flexDirection: 'column', alignItems: 'center', color: 'var(--text-secondary)' }}>
+        <div className="spinner"></div>
+        <p style={{ marginTop: '1rem' }}>{message}</p>
+    </div>
+);
+
+const ResultsPanel = ({ data, loading, error, activeView, setActiveView, pendingStages = [] }) => {
+    const isPending = (stage) => pendingStages.includes(stage);
 
     if (loading) {
         return (
@@ -279,6 +288,7 @@ const ResultsPanel = ({ data, loading, error, activeView, setActiveView }) => {
                                 </div>
 
                                 {/* Pasos de Resolución */}
+                                {isPending('steps') && <PendingStage message="Resolviendo la recurrencia paso a paso..." />}
                                 {data.recurrence_steps && (
                                     <div style={{ marginTop: '1.5rem', textAlign: 'left' }}>
                                         <h4 style={{ color: 'var(--text-secondary)', marginBottom: '0.5rem', fontSize: '0.9rem' }}>Resolución Paso a Paso:</h4>
@@ -375,7 +385,9 @@ const ResultsPanel = ({ data, loading, error, activeView, setActiveView }) => {
                         </div>
 
                         <div className="trace-table-container">
-                            {traceData ? (
+                            {isPending('trace') ? (
+                                <PendingStage message="Generando la prueba de escritorio..." />
+                            ) : traceData ? (
                                 <table className="trace-table">
                                     <thead>
                                         <tr>
@@ -485,7 +497,9 @@ const ResultsPanel = ({ data, loading, error, activeView, setActiveView }) => {
                                 Análisis Detallado de la IA
                             </h4>
                             <div style={{ lineHeight: '1.6', color: '#e9d5ff' }}>
-                                {(() => {
+                                {isPending('validation') ? (
+                                    <PendingStage message="Esperando la validación del modelo..." />
+                                ) : (() => {
                                     const text = data.validation_details || data.explanation || "No hay validación disponible.";
 
                                     try {
@@ -551,7 +565,7 @@ const ResultsPanel = ({ data, loading, error, activeView, setActiveView }) => {
                     <div className="view-content fade-in">
                         <h3 className="section-title">Ambientes Recursivos</h3>
                         <div style={{ marginTop: '1rem' }}>
-                            <RecursionTree data={data.recursion_tree} />
+                            <RecursionTree data={data.recursion_tree} loading={isPending('tree')} />
                         </div>
                     </div>
                 )}